@@ -0,0 +1,119 @@
+# app/api/archives.py
+#
+# Browse archived disc images (seekable .iso.zst or plain .iso) in the
+# OTHER output directory without unpacking them.
+
+from pathlib import Path
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
+
+from app.api.auth import require_auth
+from app.core.archive import image_size, open_image, open_volume
+from app.core.configmanager import config
+from app.core.volume.iso9660 import IsoError
+from app.core.volume.udf import UdfError
+
+router = APIRouter()
+
+MAX_RANGE = 64 * 1024 * 1024
+_SUFFIXES = (".iso", ".iso.zst")
+
+
+def _root() -> Path:
+    return Path(config.get("OTHER", "outputdirectory") or "~/TKAutoRipper/output/ISO").expanduser()
+
+
+def _archive(name: str) -> Path:
+    path = _root() / name
+    if "/" in name or name.startswith(".") or not name.endswith(_SUFFIXES) or not path.is_file():
+        raise HTTPException(status_code=404, detail="Archive not found")
+    return path
+
+
+def _volume(name: str):
+    try:
+        return open_volume(_archive(name))
+    except (IsoError, UdfError, ValueError, RuntimeError) as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+def _disposition(name: str) -> str:
+    """attachment header safe for any name: ASCII fallback plus RFC 5987 UTF-8."""
+    fallback = "".join(c if c.isascii() and c.isprintable() and c not in '"\\;' else "_" for c in name)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(name, safe='')}"
+
+
+# ──────────────────────────────────────────────────────────
+@router.get("/api/archives", dependencies=[Depends(require_auth)])
+def list_archives():
+    root = _root()
+    if not root.is_dir():
+        return []
+    return [
+        {"name": p.name, "size": p.stat().st_size}
+        for p in sorted(root.iterdir())
+        if p.is_file() and p.name.endswith(_SUFFIXES)
+    ]
+
+
+@router.get("/api/archives/{name}/ls", dependencies=[Depends(require_auth)])
+def list_files(name: str, path: str = "/"):
+    volume = _volume(name)
+    try:
+        entries = volume.listdir(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Path not found")
+    except (IsoError, UdfError) as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    finally:
+        volume.fp.close()
+    return {
+        "label": volume.label,
+        "entries": [{"name": e.name, "path": e.path, "dir": e.is_dir, "size": e.size} for e in entries],
+    }
+
+
+@router.get("/api/archives/{name}/file", dependencies=[Depends(require_auth)])
+def get_file(name: str, path: str):
+    volume = _volume(name)
+    try:
+        entry = volume.find(path)
+    except (IsoError, UdfError) as exc:
+        volume.fp.close()
+        raise HTTPException(status_code=422, detail=str(exc))
+    if entry is None or entry.is_dir:
+        volume.fp.close()
+        raise HTTPException(status_code=404, detail="File not found")
+
+    def stream():
+        try:
+            yield from volume.iter_file(entry)
+        finally:
+            volume.fp.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/octet-stream",
+        headers={
+            "Content-Length": str(entry.size),
+            "Content-Disposition": _disposition(entry.name),
+        },
+    )
+
+
+@router.get("/api/archives/{name}/range", dependencies=[Depends(require_auth)])
+def get_range(name: str, offset: int = 0, length: int = 2048):
+    if offset < 0 or not 0 < length <= MAX_RANGE:
+        raise HTTPException(status_code=400, detail="Invalid range")
+    try:
+        fp = open_image(_archive(name))
+    except (ValueError, RuntimeError) as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    with fp:
+        size = image_size(fp)
+        fp.seek(offset)
+        data = fp.read(length)
+    return Response(data, media_type="application/octet-stream",
+                    headers={"X-Image-Size": str(size)})
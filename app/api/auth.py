@@ -1,5 +1,5 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, status
 
 from fastapi.security import HTTPBasic, HTTPBasicCredentials, HTTPBearer, HTTPAuthorizationCredentials
 import jwt
@@ -60,12 +60,8 @@ from fastapi.security import HTTPAuthorizationCredentials
 
 bearer_scheme_opt = HTTPBearer(auto_error=False)
 
-def require_auth(
-    request: Request,
-    bearer: HTTPAuthorizationCredentials | None = Depends(bearer_scheme_opt),
-):
-    # Accept either Bearer header or cookie
-    token = bearer.credentials if bearer else request.cookies.get("access_token")
+def verify_token(token: str | None) -> str:
+    """Username from a session JWT; HTTPException(401) if missing or invalid."""
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
@@ -75,4 +71,21 @@ def require_auth(
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+def require_auth(
+    request: Request,
+    bearer: HTTPAuthorizationCredentials | None = Depends(bearer_scheme_opt),
+):
+    # Accept either Bearer header or cookie
+    token = bearer.credentials if bearer else request.cookies.get("access_token")
+    return verify_token(token)
+
+
+def websocket_user(ws: WebSocket) -> str | None:
+    """Session user of a WebSocket handshake (cookie), or None."""
+    try:
+        return verify_token(ws.cookies.get("access_token"))
+    except HTTPException:
+        return None
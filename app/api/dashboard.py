@@ -0,0 +1,45 @@
+# app/api/dashboard.py
+#
+# One push channel for the dashboard: a snapshot on connect, then deltas
+# (see app.core.dashboard).  The page falls back to polling the REST
+# endpoints when the socket can't be opened.
+
+import asyncio
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from app.api.auth import websocket_user
+from app.core.dashboard import dashboard_hub
+
+router = APIRouter()
+
+
+@router.websocket("/ws/dashboard")
+async def dashboard_ws(ws: WebSocket):
+    if websocket_user(ws) is None:
+        return await ws.close(code=1008)
+    await ws.accept()
+
+    client = await dashboard_hub.subscribe()
+
+    async def send() -> None:
+        while True:
+            await ws.send_text(await client.next())
+
+    async def receive() -> None:
+        # nothing is expected from the client; this only notices it leaving
+        while (await ws.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.ensure_future(send()), asyncio.ensure_future(receive())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            try:
+                task.result()
+            except (WebSocketDisconnect, RuntimeError):
+                pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        dashboard_hub.unsubscribe(client)
@@ -10,7 +10,8 @@ from ..core.configmanager import config
 from ..api.auth import require_auth
 from ..core.job.tracker import job_tracker
 from ..core.drive.manager import drive_tracker
-from ..core.job.runner import JobRunner
+from ..core.events import event_bus
+from ..core.job.queue import job_queue
 
 router = APIRouter()
 security = HTTPBasic()
@@ -55,14 +56,12 @@ def insert_drive(payload: dict):
         disc_label=disc_label,
         temp_dir=temp_dir,
         output_dir=output_dir,
-        steps_total=1  # placeholder; real runner may update this
+        disc_size=payload.get("disc_size"),
     )
     drive_tracker.assign_job(drive, job.job_id)
+    job_queue.submit(job)
 
-    runner = JobRunner(job)
-    runner.run()
-
-    return {"status": "Job started", "job_id": job.job_id}
+    return {"status": "Job queued", "job_id": job.job_id}
 
 
 @router.post("/api/drives/remove", dependencies=[Depends(require_auth)])
@@ -99,6 +98,11 @@ def list_drives():
         for d in drive_tracker.get_all_drives()
     ]
 
+# disc detection delivers the same payloads over the event bus
+event_bus.subscribe("drive.inserted", insert_drive)
+event_bus.subscribe("drive.ejected", remove_drive)
+
+
 class DriveEjectRequest(BaseModel):
     path: str
 
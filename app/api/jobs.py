@@ -1,9 +1,9 @@
 # app/api/jobs.py
 #
-# Adds resumable-jobs discovery + resume endpoint.
+# Live jobs, the job queue, job history from the job store,
+# resumable-job discovery and the resume endpoint.
 
-from pathlib import Path
-from typing import List
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
@@ -11,7 +11,9 @@ from fastapi.responses import HTMLResponse
 from app.api.auth import require_auth
 from app.core.job.tracker import job_tracker
 from app.core.job.job import Job
-from app.core.job.runner import JobRunner
+from app.core.job.queue import attach_drive, current_resource, job_queue
+from app.core.job.scheduler import RESOURCE_DRIVE
+from app.core.job.store import is_resumable, job_store
 from app.core.templates import templates
 
 router = APIRouter()
@@ -31,6 +33,30 @@ def job_details_page(request: Request, job_id: str):
 def list_jobs():
     return [j.to_dict() for j in job_tracker.list_jobs()]
 
+# ───── HISTORY (job store) ───────────────────────────────
+# registered before /api/jobs/{job_id} so the literal paths win
+@router.get("/api/jobs/history", dependencies=[Depends(require_auth)])
+def job_history(status: Optional[str] = None, drive: Optional[str] = None,
+                disc_type: Optional[str] = None, limit: int = 100, offset: int = 0):
+    return job_store.query(status, drive, disc_type, min(max(limit, 1), 1000), max(offset, 0))
+
+@router.get("/api/jobs/history/{job_id}", dependencies=[Depends(require_auth)])
+def job_history_details(job_id: str):
+    data = job_store.get(job_id)
+    if not data:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job": data, "steps": job_store.steps(job_id), "history": job_store.history(job_id)}
+
+# ───── QUEUE ─────────────────────────────────────────────
+@router.get("/api/jobs/queue", dependencies=[Depends(require_auth)])
+def list_queue():
+    return job_queue.snapshot()
+
+# ───── RESUMABLE JOB DISCOVERY ───────────────────────────
+@router.get("/api/jobs/resumable", dependencies=[Depends(require_auth)])
+def list_resumable_jobs():
+    return job_store.resumable()
+
 # single live job
 @router.get("/api/jobs/{job_id}", dependencies=[Depends(require_auth)])
 def get_job(job_id: str):
@@ -39,37 +65,26 @@ def get_job(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
     return job.to_dict()
 
-# ───── RESUMABLE JOB DISCOVERY ───────────────────────────
-RESUME_ROOT = Path("~/TKAutoRipper/temp").expanduser()
-
-def _find_resume_files() -> List[Path]:
-    return list(RESUME_ROOT.glob("*/.resume.json"))
-
-@router.get("/api/jobs/resumable", dependencies=[Depends(require_auth)])
-def list_resumable_jobs():
-    jobs = []
-    for file_path in _find_resume_files():
-        try:
-            job = Job.from_resume_file(file_path)
-            # Only resumable if first step completed
-            if job.steps and job.steps[0]["completed"]:
-                jobs.append(job.to_dict())
-        except Exception:
-            continue
-    return jobs
-
 # ───── RESUME ENDPOINT ───────────────────────────────────
 @router.post("/api/jobs/{job_id}/resume", dependencies=[Depends(require_auth)])
 def resume_job(job_id: str):
-    resume_file = RESUME_ROOT / job_id / ".resume.json"
-    if not resume_file.exists():
+    live = job_tracker.get_job(job_id)
+    if live and live.job_status not in ("Failed", "Cancelled"):
+        raise HTTPException(status_code=409, detail=f"Job is {live.job_status}")
+
+    data = job_store.get(job_id)
+    if not data or not is_resumable(data):
         raise HTTPException(status_code=404, detail="No resume info")
 
-    job = Job.from_resume_file(resume_file)
+    job = Job.from_dict(data)
+    if current_resource(job) == RESOURCE_DRIVE or job.step_index == 0:
+        # continues a disc read (e.g. a rescue dump): same drive, same disc
+        problem = attach_drive(job, job_store.drive_of(job_id))
+        if problem:
+            raise HTTPException(status_code=409, detail=f"Can't resume: {problem}")
     job.job_status = "Queued"
     job_tracker.add_job(job)
-
-    runner = JobRunner(job)
-    runner.run()
+    job_store.save(job, event="Resumed")
+    job_queue.submit(job)
 
     return {"status": "resumed", "job_id": job_id}
@@ -0,0 +1,137 @@
+# app/api/metrics.py
+#
+# /metrics in the Prometheus text format (scrape with a bearer token).
+# Live state – jobs, drives, scheduler slots, the job queue, WebSocket
+# subscribers – is read from its owners at scrape time; see
+# app.core.metrics for the counters and histograms the runner updates.
+
+import time
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.api.auth import require_auth
+from app.core.dashboard import dashboard_hub
+from app.core.drive.manager import drive_tracker
+from app.core.job.queue import job_queue
+from app.core.job.scheduler import scheduler
+from app.core.job.tracker import job_tracker
+from app.core.logstream import log_hub
+from app.core.metrics import http_request_seconds, registry
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+ACTIVE_STATUSES = ("Queued", "Running")
+
+jobs = registry.gauge("tkautoripper_jobs", "Jobs known to this process by status", ("status",))
+job_progress = registry.gauge(
+    "tkautoripper_job_progress_percent", "Overall progress of active jobs", ("job_id", "disc_type")
+)
+step_rate = registry.gauge(
+    "tkautoripper_step_rate_bytes_per_second", "Throughput of the running step of active jobs",
+    ("job_id", "disc_type"),
+)
+encode_fps = registry.gauge(
+    "tkautoripper_encode_fps", "Frames per second of running encodes", ("job_id", "disc_type")
+)
+drives = registry.gauge("tkautoripper_drives", "Tracked drives by state", ("state",))
+slots_active = registry.gauge("tkautoripper_scheduler_active", "Busy slots per resource class", ("resource",))
+slots_capacity = registry.gauge("tkautoripper_scheduler_capacity", "Slots per resource class", ("resource",))
+queue_depth = registry.gauge(
+    "tkautoripper_scheduler_waiting", "Jobs queued for a slot per resource class", ("resource",)
+)
+job_queue_depth = registry.gauge(
+    "tkautoripper_job_queue", "Jobs waiting for admission by reason", ("reason",)
+)
+subscribers = registry.gauge(
+    "tkautoripper_websocket_subscribers", "Connected WebSocket clients", ("channel",)
+)
+
+
+def _collect_jobs() -> None:
+    counts = {status: 0 for status in (*ACTIVE_STATUSES, "Finished", "Failed", "Cancelled")}
+    for gauge in (job_progress, step_rate, encode_fps):
+        gauge.clear()                       # finished jobs drop out
+    for job in job_tracker.list_jobs():
+        counts[job.status] = counts.get(job.status, 0) + 1
+        if job.status not in ACTIVE_STATUSES:
+            continue
+        labels = {"job_id": job.job_id, "disc_type": job.disc_type}
+        job_progress.set(job.progress, **labels)
+        stats = job.step_stats
+        if stats.get("rate"):
+            step_rate.set(stats["rate"], **labels)
+        if stats.get("fps"):
+            encode_fps.set(stats["fps"], **labels)
+    for status, n in counts.items():
+        jobs.set(n, status=status)
+
+
+def _collect_drives() -> None:
+    counts = {"idle": 0, "busy": 0, "blacklisted": 0}
+    for drive in drive_tracker.get_all_drives():
+        state = "blacklisted" if drive.blacklisted else "busy" if drive.job_id else "idle"
+        counts[state] += 1
+    for state, n in counts.items():
+        drives.set(n, state=state)
+
+
+def _collect_scheduler() -> None:
+    for resource, stats in scheduler.stats().items():
+        slots_active.set(stats["active"], resource=resource)
+        slots_capacity.set(stats["capacity"], resource=resource)
+        queue_depth.set(stats["waiting"], resource=resource)
+
+
+def _collect_queue() -> None:
+    job_queue_depth.clear()
+    for reason, n in job_queue.stats().items():
+        job_queue_depth.set(n, reason=reason)
+
+
+def _collect_subscribers() -> None:
+    subscribers.set(log_hub.stats()["subscribers"], channel="logs")
+    subscribers.set(dashboard_hub.stats()["subscribers"], channel="dashboard")
+
+
+for _collector in (_collect_jobs, _collect_drives, _collect_scheduler, _collect_queue, _collect_subscribers):
+    registry.on_collect(_collector)
+
+
+@router.get("/metrics", dependencies=[Depends(require_auth)])
+def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+# ── request latency ──────────────────────────────────────────
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware timing HTTP requests.  Requests are labelled by
+    route template (/api/jobs/{job_id}), not by path, to bound the series.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                method=scope["method"], route=route, status=status,
+            )
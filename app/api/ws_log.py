@@ -1,33 +1,69 @@
+import asyncio
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import asyncio, functools
+
 from app.core.job.tracker import job_tracker
+from app.core.logstream import log_hub
 
 router = APIRouter()
 
+# how long to wait for output before sending a progress-only frame
+IDLE_INTERVAL = 1.0
+
+
+def _frame(job, line=None) -> dict:
+    return {
+        "type": "log",
+        "line": line,
+        "progress": job.progress,
+        "status": job.status,
+        "step": job.step_description,
+    }
+
+
 @router.websocket("/ws/jobs/{job_id}")
 async def job_ws(ws: WebSocket, job_id: str):
     await ws.accept()
-    job = job_tracker.get_job(job_id)                 
-    if not job or not job.runner:
+    job = job_tracker.get_job(job_id)
+    if not job:
         return await ws.close()
 
-    loop = asyncio.get_event_loop()
-    q: asyncio.Queue = asyncio.Queue()
+    sub = log_hub.subscribe(job, asyncio.get_running_loop())
+
+    async def send() -> None:
+        last_state = None
+        while True:
+            finished = sub.finished             # read first: lines before finish() are still queued
+            lines, dropped = await sub.next(IDLE_INTERVAL)
+            if dropped:
+                await ws.send_json(_frame(job, f"… {dropped} line(s) skipped"))
+            for line in lines:
+                await ws.send_json(_frame(job, line))
+            if finished:
+                await ws.send_json(_frame(job))     # final state
+                await ws.close()
+                return
 
-    def handle_output(line: str):
-        loop.call_soon_threadsafe(q.put_nowait, {     # ✅
-            "type": "log",
-            "line": line,
-            "progress": job.progress,
-            "status": job.status,
-            "step": job.step_description,
-        })
+            # progress frames are coalesced: only send the state when it moved
+            state = (job.progress, job.status, job.step_description)
+            if not lines and state != last_state:
+                await ws.send_json(_frame(job))
+            last_state = state
 
-    job.runner.on_output = handle_output
+    async def receive() -> None:
+        # nothing is expected from the client; this only notices it leaving
+        while (await ws.receive())["type"] != "websocket.disconnect":
+            pass
 
+    tasks = [asyncio.ensure_future(send()), asyncio.ensure_future(receive())]
     try:
-        while True:
-            msg = await q.get()
-            await ws.send_json(msg)
-    except WebSocketDisconnect:
-        pass
\ No newline at end of file
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            try:
+                task.result()
+            except (WebSocketDisconnect, RuntimeError):
+                pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        log_hub.unsubscribe(sub)
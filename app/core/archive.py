@@ -0,0 +1,157 @@
+# app/core/archive.py
+"""
+Read archived disc images without inflating them.
+
+Works on seekable .iso.zst archives (OTHER.seekable) and plain .iso files,
+with a UDF file system (most DVD / Blu-ray images) or ISO9660.
+
+    python -m app.core.archive pack [-l LEVEL] [-T THREADS] < image > out.iso.zst
+    python -m app.core.archive info    ARCHIVE
+    python -m app.core.archive ls      ARCHIVE [PATH] [-r]
+    python -m app.core.archive cat     ARCHIVE PATH            > file
+    python -m app.core.archive range   ARCHIVE OFFSET LENGTH   > bytes
+    python -m app.core.archive extract ARCHIVE PATH DEST
+"""
+
+from __future__ import annotations
+
+import argparse
+import struct
+import sys
+from pathlib import Path
+from typing import BinaryIO, Union
+
+from app.core.integration.zstd.seekable import SeekableZstdCompressor, SeekableZstdReader
+from app.core.volume.iso9660 import IsoEntry, IsoVolume
+from app.core.volume.udf import UdfEntry, UdfError, UdfVolume
+
+Volume = Union[UdfVolume, IsoVolume]
+Entry = Union[UdfEntry, IsoEntry]
+
+
+def open_image(path: Path) -> BinaryIO:
+    """Seekable file object over the raw (uncompressed) image."""
+    path = Path(path)
+    if path.suffix == ".zst":
+        return SeekableZstdReader.open(path)
+    return open(path, "rb")
+
+
+def open_volume(path: Path) -> Volume:
+    """The image's UDF tree, else its ISO9660 one (raises IsoError for neither)."""
+    fp = open_image(path)
+    try:
+        try:
+            return UdfVolume(fp)
+        except (UdfError, struct.error, IndexError, ValueError):
+            pass                                # no (usable) UDF: bridge or plain ISO9660
+        return IsoVolume(fp)
+    except BaseException:
+        fp.close()
+        raise
+
+
+def image_size(fp: BinaryIO) -> int:
+    return fp.size if isinstance(fp, SeekableZstdReader) else fp.seek(0, 2)
+
+
+def read_range(path: Path, offset: int, length: int) -> bytes:
+    with open_image(path) as fp:
+        fp.seek(offset)
+        return fp.read(length)
+
+
+def extract(volume: Volume, entry: Entry, dest: Path) -> None:
+    if entry.is_dir:
+        dest.mkdir(parents=True, exist_ok=True)
+        for child in volume.listdir(entry.path):
+            extract(volume, child, dest / child.name)
+        return
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with open(dest, "wb") as out:
+        for chunk in volume.iter_file(entry):
+            out.write(chunk)
+
+
+# ============================================================
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.core.archive")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("pack", help="stdin → seekable zstd on stdout")
+    p.add_argument("-l", "--level", type=int, default=3)
+    p.add_argument("-T", "--threads", type=int, default=1)
+
+    p = sub.add_parser("info")
+    p.add_argument("archive", type=Path)
+
+    p = sub.add_parser("ls")
+    p.add_argument("archive", type=Path)
+    p.add_argument("path", nargs="?", default="/")
+    p.add_argument("-r", "--recursive", action="store_true")
+
+    p = sub.add_parser("cat")
+    p.add_argument("archive", type=Path)
+    p.add_argument("path")
+
+    p = sub.add_parser("range")
+    p.add_argument("archive", type=Path)
+    p.add_argument("offset", type=int)
+    p.add_argument("length", type=int)
+
+    p = sub.add_parser("extract")
+    p.add_argument("archive", type=Path)
+    p.add_argument("path")
+    p.add_argument("dest", type=Path)
+
+    args = ap.parse_args(argv)
+    out = sys.stdout.buffer
+
+    if args.cmd == "pack":
+        SeekableZstdCompressor(args.level, args.threads).compress(sys.stdin.buffer, out)
+        out.flush()
+        return 0
+
+    if args.cmd == "range":
+        out.write(read_range(args.archive, args.offset, args.length))
+        return 0
+
+    volume = open_volume(args.archive)
+
+    if args.cmd == "info":
+        fp = volume.fp
+        print(f"file system:  {'udf' if isinstance(volume, UdfVolume) else 'iso9660'}")
+        print(f"label:        {volume.label}")
+        print(f"volume size:  {volume.volume_size}")
+        print(f"image size:   {image_size(fp)}")
+        if isinstance(fp, SeekableZstdReader):
+            print(f"frames:       {fp.frame_count}")
+        return 0
+
+    if args.cmd == "ls":
+        entries = volume.walk(args.path) if args.recursive else volume.listdir(args.path)
+        for entry in entries:
+            print(f"{'d' if entry.is_dir else '-'} {entry.size:>12}  {entry.path}")
+        return 0
+
+    entry = volume.find(args.path)
+    if entry is None:
+        print(f"{args.path}: not found", file=sys.stderr)
+        return 1
+
+    if args.cmd == "cat":
+        for chunk in volume.iter_file(entry):
+            out.write(chunk)
+        return 0
+
+    if args.cmd == "extract":
+        extract(volume, entry, args.dest)
+        return 0
+    return 2
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except BrokenPipeError:
+        sys.exit(0)
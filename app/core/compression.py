@@ -0,0 +1,138 @@
+# app/core/compression.py
+"""
+In-process compression engine for ISO outputs.
+
+make_compressor() returns an object with a compress(src, dst) method that
+streams a binary source into a binary sink using the thread budget it was
+given, and reports a CompressionStats.  The tool-specific engines live in
+their integration modules (zstd / bz2); this module holds what they share.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# (bytes_in, bytes_out) → None
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class CompressionStats:
+    algorithm: str
+    level: Optional[int] = None
+    threads: int = 1
+    bytes_in: int = 0
+    bytes_out: int = 0
+    started: float = field(default_factory=time.monotonic)
+    seconds: float = 0.0
+
+    def finish(self) -> "CompressionStats":
+        self.seconds = time.monotonic() - self.started
+        return self
+
+    @property
+    def ratio(self) -> float:
+        return self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Input bytes per second."""
+        elapsed = self.seconds or (time.monotonic() - self.started)
+        return self.bytes_in / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "algorithm": self.algorithm,
+            "level": self.level,
+            "threads": self.threads,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.ratio, 4),
+            "seconds": round(self.seconds, 2),
+            "throughput": round(self.throughput),
+        }
+
+
+class CountingWriter:
+    """File wrapper that counts bytes written (compressed output size)."""
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self.fp = fp
+        self.count = 0
+
+    def write(self, data) -> int:
+        n = self.fp.write(data)
+        self.count += len(data) if n is None else n
+        return len(data) if n is None else n
+
+    def flush(self) -> None:
+        self.fp.flush()
+
+
+def read_chunks(src: BinaryIO, size: int = CHUNK_SIZE):
+    while True:
+        chunk = src.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+# ============================================================
+def make_compressor(
+    algorithm: str,
+    threads: int,
+    level: Optional[int] = None,
+    long_window: int = 0,
+    seekable: bool = False,
+):
+    """
+    algorithm – "zstd" | "bz2"
+    threads   – budget granted by the scheduler (never "all cores")
+    level     – None → the engine's default
+    seekable  – zstd only: independent frames plus a seek table
+                (long_window does not apply across frames)
+    """
+    algorithm = algorithm.lower()
+    if algorithm == "zstd" and seekable:
+        from app.core.integration.zstd.seekable import SeekableZstdCompressor
+        return SeekableZstdCompressor(level=3 if level is None else level, threads=threads)
+    if algorithm == "zstd":
+        from app.core.integration.zstd.linux import ZstdCompressor
+        return ZstdCompressor(level=3 if level is None else level, threads=threads, long_window=long_window)
+    if algorithm == "bz2":
+        from app.core.integration.bz2.linux import ParallelBzip2Compressor
+        return ParallelBzip2Compressor(level=9 if level is None else level, threads=threads)
+    raise ValueError(f"Unsupported compression: {algorithm}")
+
+
+def pick_zstd_level(
+    sample: bytes,
+    target_rate: float,
+    threads: int,
+    levels=(1, 3, 6, 9, 12, 15, 19),
+    headroom: float = 1.25,
+) -> int:
+    """
+    Highest zstd level whose estimated multi-threaded throughput on
+    *sample* stays above *target_rate* (bytes/s, e.g. the drive's read
+    rate) with some headroom.  Levels are tried fastest first and the
+    search stops at the first one that is too slow.
+    """
+    from app.core.integration.zstd.linux import compress_sample
+
+    chosen = levels[0]
+    for level in levels:
+        started = time.perf_counter()
+        if compress_sample(sample, level) is None:
+            return 3                        # no in-process zstd: keep the default
+        elapsed = time.perf_counter() - started
+        # the sample is too small to spread over workers, scale linearly
+        rate = len(sample) / max(elapsed, 1e-6) * max(1, threads) * 0.8
+        if rate < target_rate * headroom:
+            break
+        chosen = level
+    return chosen
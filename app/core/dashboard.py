@@ -0,0 +1,205 @@
+# app/core/dashboard.py
+"""
+Dashboard state push.
+
+The dashboard used to poll four endpoints every few seconds per open tab.
+Instead, DriveTracker and JobTracker tell the hub when something changed;
+the hub re-reads only the dirty topics (after a short debounce, so a burst
+of progress updates becomes one message), diffs them against what it last
+sent and broadcasts the deltas, encoded once, to every subscriber.
+
+    {"type": "snapshot", "data": {"drives": [...], "jobs": [...], ...}}
+    {"type": "delta", "topic": "jobs", "upsert": [...], "remove": [ids]}
+    {"type": "delta", "topic": "system", "data": {...}}
+
+System info comes from the background sampler, which marks its topic
+dirty after every sample.  Nothing runs while nobody is subscribed.  A
+subscriber that can't keep up is resynchronised with a fresh snapshot
+instead of queueing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core.drive.drive import Drive
+from app.core.drive.manager import drive_tracker
+from app.core.job.job import Job
+from app.core.job.store import job_store
+from app.core.job.tracker import job_tracker
+from app.core.systeminfo import get_system_info, system_sampler
+
+TOPICS = ("drives", "jobs", "resumable", "system")
+KEYS = {"drives": "path", "jobs": "job_id", "resumable": "job_id"}
+
+DEBOUNCE = 0.2                      # coalesce bursts of changes
+QUEUE_MESSAGES = 64
+
+
+def drive_dict(drive: Drive) -> Dict[str, Any]:
+    return {
+        "path": drive.path,
+        "model": drive.model,
+        "capability": drive.capability,
+        "job_id": drive.job_id or None,
+        "disc_label": drive.disc_label or None,
+        "blacklisted": drive.blacklisted,
+    }
+
+
+def job_summary(job: Job) -> Dict[str, Any]:
+    """What a dashboard job tile shows (no log, no step list)."""
+    return {
+        "job_id": job.job_id,
+        "disc_label": job.disc_label,
+        "disc_type": job.disc_type,
+        "drive": job.drive,
+        "status": job.status,
+        "progress": job.progress,
+        "step": job.step_description,
+        "step_index": job.step_index,
+        "steps_total": len(job.steps),
+    }
+
+
+# ============================================================
+class DashboardClient:
+    def __init__(self, hub: "DashboardHub") -> None:
+        self.hub = hub
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=QUEUE_MESSAGES)
+        self.overflowed = False
+
+    def offer(self, message: str) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def next(self) -> str:
+        """Next JSON message; a full snapshot after falling behind."""
+        message = await self.queue.get()
+        if self.overflowed:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.overflowed = False
+            return self.hub.snapshot()
+        return message
+
+
+# ============================================================
+class DashboardHub:
+    def __init__(self) -> None:
+        self._clients: Set[DashboardClient] = set()
+        self._state: Dict[str, Any] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ── any thread ───────────────────────────────────────────
+    def mark_dirty(self, topic: str) -> None:
+        loop = self._loop
+        if loop is None or not self._clients:
+            return                          # nobody listening: nothing to do
+        with self._lock:
+            if topic in self._dirty:
+                return                      # a wake-up is already on its way
+            self._dirty.add(topic)
+        try:
+            loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass                            # loop closed
+
+    # ── event loop ───────────────────────────────────────────
+    async def subscribe(self) -> DashboardClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._wake, self._task = loop, asyncio.Event(), None
+        if not self._clients:
+            # nothing was tracked while idle: start from scratch
+            self._state = {}
+            await self._refresh(TOPICS)
+        client = DashboardClient(self)
+        self._clients.add(client)
+        client.offer(self.snapshot())
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._publish())
+        return client
+
+    def unsubscribe(self, client: DashboardClient) -> None:
+        self._clients.discard(client)
+
+    def snapshot(self) -> str:
+        data = {
+            topic: list(value.values()) if topic in KEYS else value
+            for topic, value in self._state.items()
+        }
+        return json.dumps({"type": "snapshot", "data": data})
+
+    def stats(self) -> Dict[str, int]:
+        return {"subscribers": len(self._clients)}
+
+    # ---------------------------------------------------------
+    async def _publish(self) -> None:
+        while self._clients:
+            await self._wake.wait()
+            self._wake.clear()
+            await asyncio.sleep(DEBOUNCE)
+            with self._lock:
+                topics, self._dirty = self._dirty, set()
+            try:
+                for message in await self._refresh(topics):
+                    for client in list(self._clients):
+                        client.offer(message)
+            except Exception as exc:
+                logging.warning(f"Dashboard refresh failed: {exc}")
+
+    async def _refresh(self, topics: Iterable[str]) -> List[str]:
+        """Re-read *topics*; returns the encoded delta messages."""
+        messages = []
+        for topic in TOPICS:
+            if topic not in topics:
+                continue
+            if topic == "drives":
+                rows = [drive_dict(d) for d in drive_tracker.get_all_drives()]
+            elif topic == "jobs":
+                rows = [job_summary(j) for j in job_tracker.list_jobs()]
+            elif topic == "resumable":
+                rows = await asyncio.to_thread(job_store.resumable)
+            else:
+                # only the very first call waits for a sample
+                data = await asyncio.to_thread(get_system_info)
+                if data != self._state.get("system"):
+                    self._state["system"] = data
+                    messages.append(json.dumps({"type": "delta", "topic": topic, "data": data}))
+                continue
+
+            key = KEYS[topic]
+            old = self._state.get(topic, {})
+            new = {row[key]: row for row in rows}
+            upsert = [row for k, row in new.items() if old.get(k) != row]
+            remove = [k for k in old if k not in new]
+            self._state[topic] = new
+            if upsert or remove:
+                messages.append(json.dumps(
+                    {"type": "delta", "topic": topic, "upsert": upsert, "remove": remove}
+                ))
+        return messages
+
+
+dashboard_hub = DashboardHub()
+
+
+def _job_changed(job_id: str) -> None:
+    dashboard_hub.mark_dirty("jobs")
+    dashboard_hub.mark_dirty("resumable")
+
+
+drive_tracker.add_listener(lambda: dashboard_hub.mark_dirty("drives"))
+job_tracker.add_listener(_job_changed)
+system_sampler.add_listener(lambda: dashboard_hub.mark_dirty("system"))
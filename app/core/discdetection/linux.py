@@ -1,96 +1,235 @@
-import subprocess
-import os
-import time
+# app/core/discdetection/linux.py
+"""
+Disc insert/eject detection.
+
+udev events come from drive discovery (app.core.drive.detector), which
+already watches the udev socket for optical drives.  Each drive gets
+its own detection task on a small asyncio loop: a disc insert starts a
+debounce timer (restarted by further events from the same drive while
+it spins up), then the disc is probed and the job API told about it
+over the event bus (app.core.events).
+Drives never wait on each other – a slow or dead drive only stalls its
+own task, and every probe has a timeout.
+
+udev events can get lost, so idle drives are also polled every
+MEDIA_POLL seconds (CDROM_DRIVE_STATUS, no disc access): a disc that
+shows up without an insert event is probed like any other.
+
+Probing reuses what udev already found (filesystem, label, media flags)
+and reads the rest straight off the disc: size with one ioctl, label
+and root directory from the UDF/ISO9660 descriptors (app.core.volume),
+so unmounted video discs are recognised and no subprocess runs.
+"""
+
+import asyncio
+import fcntl
 import logging
+import os
+import re
+import struct
+import threading
 from pathlib import Path
-from ..api_helpers import post_api  # Local helper for HTTPS
-from ..configmanager import config
-
-
-def monitor_cdrom():
-    """Monitors for disc insertions and removals and interacts with backend API accordingly."""
-
-    process = subprocess.Popen(["udevadm", "monitor", "--property"],
-                               stdout=subprocess.PIPE, text=True)
-    drive = None
+from typing import Dict, Optional, Tuple
+
+from ..drive.detector import drive_discovery
+from ..drive.manager import drive_tracker
+from ..events import EventError, event_bus
+from ..volume.probe import VolumeInfo, probe_path
+
+DEBOUNCE = 5.0              # seconds of quiet after the last event before probing
+PROBE_TIMEOUT = 30.0
+MEDIA_POLL = 30.0           # seconds between media checks of idle drives
+BLKGETSIZE64 = 0x80081272
+CDROM_DRIVE_STATUS = 0x5326
+CDS_DISC_OK = 4
+
+
+# ------------------------------------------------------------
+def _unescape(value: str) -> str:
+    r"""udev's *_ENC values escape unsafe bytes as \xNN."""
+    raw = re.sub(rb"\\x([0-9a-fA-F]{2})", lambda m: bytes([int(m.group(1), 16)]), value.encode())
+    return raw.decode(errors="replace")
+
+
+def _disc_size(drive: str) -> int:
+    fd = os.open(drive, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        return struct.unpack("Q", fcntl.ioctl(fd, BLKGETSIZE64, b"\0" * 8))[0]
+    except OSError:
+        return os.lseek(fd, 0, os.SEEK_END)     # image files in tests/benchmarks
+    finally:
+        os.close(fd)
+
+
+def _has_disc(drive: str) -> Optional[bool]:
+    """Whether the tray holds a readable disc (None if the drive can't tell)."""
+    try:
+        fd = os.open(drive, os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return None
+    try:
+        return fcntl.ioctl(fd, CDROM_DRIVE_STATUS, 0) == CDS_DISC_OK
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def _mount_point(drive: str) -> Optional[str]:
+    real = os.path.realpath(drive)
+    try:
+        with open("/proc/self/mounts", encoding="utf-8") as fp:
+            for line in fp:
+                source, target = line.split()[:2]
+                if source in (drive, real):
+                    return target.replace("\\040", " ")
+    except OSError:
+        pass
+    return None
+
+
+def classify_disc(fs_type: str, disc_size: int, volume: Optional[VolumeInfo],
+                  mount_point: Optional[str] = None) -> str:
+    def has_folder(folder: str) -> bool:
+        if volume is not None:
+            return volume.has(folder)
+        return Path(mount_point, folder).exists() if mount_point else False
+
+    if fs_type in ["udf", "iso9660"]:
+        if disc_size < 1 * 1024**3:
+            return "cd_rom"
+        elif 1 * 1024**3 <= disc_size <= 25 * 1024**3:
+            return "dvd_video" if has_folder("VIDEO_TS") else "dvd_rom"
+        else:
+            return "bluray_video" if has_folder("BDMV") else "bluray_rom"
+    elif fs_type == "":
+        return "cd_audio"
+    return "unknown"
+
+
+def _read_disc(drive: str) -> Tuple[int, Optional[VolumeInfo]]:
+    return _disc_size(drive), probe_path(drive)
+
+
+async def probe_disc(drive: str, props: Dict[str, str]) -> Dict[str, object]:
+    """disc_type, disc_label and disc_size (bytes) of the disc in *drive*."""
+    loop = asyncio.get_running_loop()
+    disc_size, volume = await loop.run_in_executor(None, _read_disc, drive)
+
+    fs_type = props.get("ID_FS_TYPE") or (volume.fs_type if volume else "")
+    label = _unescape(props["ID_FS_LABEL_ENC"]) if "ID_FS_LABEL_ENC" in props else props.get("ID_FS_LABEL")
+    label = label or (volume.label if volume else None)
+
+    # the volume's root directory decides video vs data; the mount point
+    # is only consulted when the volume couldn't be read
+    mount_point = None if volume else _mount_point(drive)
+    disc_type = classify_disc(fs_type.lower(), disc_size, volume, mount_point)
+    return {"disc_type": disc_type, "disc_label": label or "unknown", "disc_size": disc_size}
+
+
+# ============================================================
+class DiscDetector:
+    def __init__(self, debounce: float = DEBOUNCE, probe_timeout: float = PROBE_TIMEOUT) -> None:
+        self.debounce = debounce
+        self.probe_timeout = probe_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._tasks: Dict[str, asyncio.Task] = {}       # drive → pending detection
+        self._media: Dict[str, bool] = {}               # drive → disc seen (events or polls)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="disc-detection", daemon=True)
+        self._thread.start()
+        drive_discovery.add_listener(self._on_udev_event)
+        drive_discovery.start()
+        asyncio.run_coroutine_threadsafe(self._poll(), self._loop)
+
+    def stop(self) -> None:
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # called on the drive-discovery thread
+    def _on_udev_event(self, action: str, props: Dict[str, str]) -> None:
+        if self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._dispatch, action, props)
+
+    # ------------------------------------------------------
+    def _dispatch(self, action: str, props: Dict[str, str]) -> None:
+        drive = props["DEVNAME"]
+        if action == "remove":
+            self._cancel(drive)
+            self._media.pop(drive, None)
+        elif props.get("DISK_EJECT_REQUEST") == "1":
+            self._cancel(drive)
+            self._media[drive] = False
+            logging.info(f"📤 Eject button pressed on {drive}")
+            self._loop.create_task(self._publish("drive.ejected", {"drive": drive}))
+        elif props.get("ID_CDROM_MEDIA") == "1":
+            self._cancel(drive)                         # restart the debounce
+            self._media[drive] = True
+            self._tasks[drive] = self._loop.create_task(self._detect(drive))
+        else:
+            self._media[drive] = False
+
+    async def _poll(self) -> None:
+        """Fallback for lost udev events: probe discs that appeared unannounced."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(MEDIA_POLL)
+            for drive in drive_tracker.get_all_drives():
+                path = drive.path
+                if drive.job_id or path in self._tasks:
+                    continue
+                present = await loop.run_in_executor(None, _has_disc, path)
+                if present is None:
+                    continue
+                seen, self._media[path] = self._media.get(path), present
+                if present and seen is False:           # first poll only records the state
+                    logging.info(f"🔄 Disc in {path} appeared without a udev event; probing it")
+                    self._tasks[path] = loop.create_task(self._detect(path, polled=True))
+
+    def _cancel(self, drive: str) -> None:
+        task = self._tasks.pop(drive, None)
+        if task and not task.done():
+            task.cancel()
+
+    async def _detect(self, drive: str, polled: bool = False) -> None:
+        try:
+            await asyncio.sleep(self.debounce)
+            # a polled disc has no event behind it: cached properties describe the last one
+            props = {} if polled else drive_discovery.properties(drive)
+            if polled:
+                if not await asyncio.get_running_loop().run_in_executor(None, _has_disc, drive):
+                    return
+            elif props.get("ID_CDROM_MEDIA") != "1":
+                return                                  # disc gone again
+            logging.info(f"📥 Disc inserted in {drive}")
+            disc = await asyncio.wait_for(probe_disc(drive, props), self.probe_timeout)
+            logging.info(f"📀 {disc['disc_type'].upper()} detected in {drive}")
+            await self._publish("drive.inserted", {"drive": drive, **disc})
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logging.error(f"❌ Detection timed out on {drive}")
+        except Exception as e:
+            logging.error(f"❌ Detection or job creation failed: {e}")
+        finally:
+            if self._tasks.get(drive) is asyncio.current_task():
+                del self._tasks[drive]
 
-    for line in iter(process.stdout.readline, ""):
-        line = line.strip()
+    async def _publish(self, topic: str, payload: dict) -> None:
+        try:
+            await event_bus.publish(topic, payload)
+        except EventError as e:
+            logging.error(f"❌ Could not deliver {topic} for {payload['drive']}: {e}")
 
-        if line == "":
-            drive = None
-            continue
 
-        if line.startswith("DEVNAME="):
-            drive = line.split("=")[1]
+disc_detector = DiscDetector()
 
-        if "DISK_EJECT_REQUEST=1" in line and drive:
-            print("ejectnotice")
-            print("ejectdrive:" + str(drive))
-            logging.info(f"📤 Eject button pressed on {drive}")
-            try:
-                post_api("/api/drives/remove", {"drive": drive})
-            except Exception as e:
-                logging.warning(f"⚠️ Could not notify backend of eject: {e}")
 
-        # Handle disc insertion
-        elif "ID_CDROM_MEDIA=1" in line and drive:
-            logging.info(f"📥 Disc inserted in {drive}")
-            time.sleep(5)  # debounce
-            udev_output = subprocess.check_output(
-                ["udevadm", "info", "--query=property", f"--name={drive}"],
-                text=True
-            )
-            if "ID_CDROM_MEDIA=1" in udev_output:
-
-                try:
-                    fs_type = subprocess.run(
-                        ["blkid", "-o", "value", "-s", "TYPE", drive],
-                        capture_output=True, text=True
-                    ).stdout.strip().lower()
-
-                    size_out = subprocess.run(
-                        ["blockdev", "--getsize64", drive],
-                        capture_output=True, text=True
-                    ).stdout.strip()
-                    disc_size = int(size_out) if size_out.isdigit() else 0
-
-                    label_out = subprocess.run(
-                        ["blkid", "-o", "value", "-s", "LABEL", drive],
-                        capture_output=True, text=True
-                    ).stdout.strip()
-                    disc_label = label_out or "unknown"
-
-                    # Try to find mount point using lsblk
-                    mount_point = subprocess.run(
-                        ["lsblk", "-no", "MOUNTPOINT", drive],
-                        capture_output=True, text=True
-                    ).stdout.strip()
-
-                    def has_folder(folder: str) -> bool:
-                        return Path(mount_point, folder).exists() if mount_point else False
-
-                    if fs_type in ["udf", "iso9660"]:
-                        if disc_size < 1 * 1024**3:
-                            disc_type = "cd_rom"
-                        elif 1 * 1024**3 <= disc_size <= 25 * 1024**3:
-                            disc_type = "dvd_video" if has_folder("VIDEO_TS") else "dvd_rom"
-                        elif disc_size > 25 * 1024**3:
-                            disc_type = "bluray_video" if has_folder("BDMV") else "bluray_rom"
-                        else:
-                            disc_type = "unknown"
-                    elif fs_type == "":
-                        disc_type = "cd_audio"
-                    else:
-                        disc_type = "unknown"
-
-                    logging.info(f"📀 {disc_type.upper()} detected in {drive}")
-
-                    post_api("/api/drives/insert", {
-                        "drive": drive,
-                        "disc_type": disc_type,
-                        "disc_label": disc_label
-                    })
-
-                except Exception as e:
-                    logging.error(f"❌ Detection or job creation failed: {e}")
+def monitor_cdrom():
+    """Starts disc insert/eject detection in the background."""
+    disc_detector.start()
@@ -0,0 +1,107 @@
+# app/core/diskspace.py
+"""
+Disk-space helpers: fallocate(2) preallocation and per-volume free space.
+
+Python only offers os.posix_fallocate(), which glibc emulates by writing
+zeros where the filesystem can't allocate – slow for a 50 GB image and
+no better than writing it.  fallocate(2) is called through ctypes
+instead; it fails with EOPNOTSUPP on such filesystems and callers just
+write without a preallocation.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Optional
+
+FALLOC_FL_KEEP_SIZE = 0x01
+
+_fallocate = None
+
+
+def _load() -> Optional[Callable[..., int]]:
+    global _fallocate
+    if _fallocate is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+            func = getattr(libc, "fallocate64", None) or libc.fallocate
+            func.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+            func.restype = ctypes.c_int
+            _fallocate = func
+        except (OSError, AttributeError):
+            _fallocate = False                  # no libc fallocate (not Linux)
+    return _fallocate or None
+
+
+def preallocate(fd: int, length: int, keep_size: bool = True) -> bool:
+    """
+    Reserve *length* bytes of disk for *fd*.  With keep_size the file
+    size is left alone, so writers appending to it see no difference;
+    trim() frees what wasn't used.  False if the space couldn't be
+    reserved; the caller writes anyway.
+    """
+    func = _load()
+    if func is None or length <= 0:
+        return False
+    if func(fd, FALLOC_FL_KEEP_SIZE if keep_size else 0, 0, length) == 0:
+        return True
+    # EOPNOTSUPP, or ENOSPC for an estimate larger than what is left
+    logging.debug(f"fallocate of {length} bytes failed: {os.strerror(ctypes.get_errno())}")
+    return False
+
+
+def trim(fd: int) -> None:
+    """Free blocks preallocated past the end of the file."""
+    os.ftruncate(fd, os.fstat(fd).st_size)
+
+
+# ------------------------------------------------------------
+def existing(path: Path) -> Path:
+    """*path* or its closest existing parent (directories made later)."""
+    path = Path(path).expanduser()
+    while not path.exists() and path != path.parent:
+        path = path.parent
+    return path
+
+
+def volume_id(path: Path) -> int:
+    return os.stat(existing(path)).st_dev
+
+
+def free_bytes(path: Path) -> int:
+    """Bytes an unprivileged writer can still use on *path*'s filesystem."""
+    st = os.statvfs(existing(path))
+    return st.f_bavail * st.f_frsize
+
+
+def total_bytes(path: Path) -> int:
+    st = os.statvfs(existing(path))
+    return st.f_blocks * st.f_frsize
+
+
+def disk_usage(path: Path) -> int:
+    """Allocated bytes of a file or directory tree (preallocations included)."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return 0
+    if not os.path.isdir(path):
+        return st.st_blocks * 512
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += disk_usage(entry.path)
+                else:
+                    try:
+                        total += entry.stat(follow_symlinks=False).st_blocks * 512
+                    except OSError:
+                        pass
+    except OSError:
+        pass
+    return total
@@ -3,10 +3,6 @@ import platform
 system = platform.system().lower()
 
 if system == "linux":
-    import linux
-elif system == "darwin":
-    import mac
-elif system == "windows":
-    import windows
+    from .linux import drive_discovery
 else:
-    raise NotImplementedError(f"SystemInfo not supported on platform: {system}")
+    drive_discovery = None      # drives are registered on first disc insert
@@ -1,64 +1,266 @@
+# app/core/drive/detector/linux.py
+"""
+Event-driven optical drive discovery.
+
+A daemon thread listens on the udev netlink socket (the one `udevadm
+monitor --udev` reads), so drives are registered/unregistered within
+milliseconds of udev processing the hot-plug.  Every udev message
+already carries the device's full property set (ID_MODEL, ID_CDROM_*…),
+which is cached per device; for drives found any other way the
+properties are read once from the udev database in /run/udev/data.
+
+A slow reconciliation pass over /sys/block catches anything the socket
+missed (overflow, no netlink in a container); without netlink it is the
+only source and runs every few seconds.
+
+Listeners (disc detection) get every optical block event as
+callback(action, properties) on the discovery thread.
+"""
+
+from __future__ import annotations
+
+import errno
+import logging
 import os
-import time
+import socket
+import struct
 import subprocess
-from typing import List, Optional
-from app.core.drive.manager import drive_tracker  # ← local relative import
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+from app.core.configmanager import config
+from app.core.drive.manager import drive_tracker
 from app.core.job.tracker import job_tracker
 
-def _get_drive_model(dev: str) -> str:
+NETLINK_KOBJECT_UEVENT = 15
+UDEV_GROUP = 2                           # post-processed events (kernel = 1)
+UDEV_MAGIC = 0xFEEDCAFE
+# struct udev_monitor_netlink_header: prefix[8], magic (big-endian), then
+# header_size, properties_off, properties_len (host order), hashes, tag bloom
+UDEV_PREFIX = struct.Struct(">8sI")
+UDEV_OFFSETS = struct.Struct("=III")
+UDEV_DATA = "/run/udev/data"
+SYS_BLOCK = "/sys/block"
+SCSI_CDROM_MAJOR = 11
+RECV_BUFFER = 1 << 20
+
+DEFAULT_RECONCILE = 60.0                 # with netlink events
+FALLBACK_RECONCILE = 5.0                 # polling only
+
+Properties = Dict[str, str]
+
+
+# ============================================================
+# udev properties
+# ============================================================
+def parse_udev_message(data: bytes) -> Optional[Properties]:
+    """Properties of a libudev netlink message (None for anything else)."""
+    if not data.startswith(b"libudev\0") or len(data) < UDEV_PREFIX.size + UDEV_OFFSETS.size:
+        return None
+    _, magic = UDEV_PREFIX.unpack_from(data)
+    if magic != UDEV_MAGIC:
+        return None
+    _, offset, length = UDEV_OFFSETS.unpack_from(data, UDEV_PREFIX.size)
+    props: Properties = {}
+    for field in data[offset:offset + length].split(b"\0"):
+        key, sep, value = field.partition(b"=")
+        if sep:
+            props[key.decode(errors="replace")] = value.decode(errors="replace")
+    return props
+
+
+def _read_udev_db(dev: str) -> Properties:
+    """Properties of *dev* from the udev database ({} if unavailable)."""
     try:
-        result = subprocess.run(["udevadm", "info", "--query=all", "--name", dev],
-                                capture_output=True, text=True, check=True)
-        for line in result.stdout.splitlines():
-            if "ID_MODEL=" in line:
-                return line.split("=", 1)[1].strip()
-    except Exception:
-        pass
-    return "Unknown"
+        rdev = os.stat(dev).st_rdev
+        with open(f"{UDEV_DATA}/b{os.major(rdev)}:{os.minor(rdev)}", encoding="utf-8",
+                  errors="replace") as fp:
+            return dict(
+                line[2:].rstrip("\n").split("=", 1)
+                for line in fp if line.startswith("E:") and "=" in line
+            )
+    except OSError:
+        return {}
+
 
-def _get_drive_capability(dev: str) -> List[str]:
+def _query_udevadm(dev: str) -> Properties:
     try:
-        result = subprocess.run(["udevadm", "info", "--query=all", "--name", dev],
+        result = subprocess.run(["udevadm", "info", "--query=property", "--name", dev],
                                 capture_output=True, text=True, check=True)
-        caps = set()
-        for line in result.stdout.splitlines():
-            if "ID_CDROM_DVD" in line:
-                caps.add("DVD")
-            if "ID_CDROM_CD" in line:
-                caps.add("CD")
-            if "ID_CDROM_BD" in line:
-                caps.add("BLURAY")
-        return sorted(caps)
     except Exception:
-        return []
+        return {}
+    return dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+
+
+def is_optical(props: Properties) -> bool:
+    return props.get("SUBSYSTEM", "block") == "block" and (
+        props.get("ID_CDROM") == "1" or props.get("MAJOR") == str(SCSI_CDROM_MAJOR)
+    )
+
 
-def poll_for_drives(interval: int = 5):
-    """Poll /dev/sr* and sync with DriveTracker."""
-    while True:
-        current_devs = {f"/dev/{dev}" for dev in os.listdir("/dev") if dev.startswith("sr")}
+def drive_model(props: Properties) -> str:
+    return props.get("ID_MODEL") or "Unknown"
 
-        # Add new drives
-        for dev in current_devs:
+
+def drive_capability(props: Properties) -> List[str]:
+    caps = set()
+    for key, value in props.items():
+        if value != "1":
+            continue
+        if key.startswith("ID_CDROM_DVD"):
+            caps.add("DVD")
+        elif key.startswith("ID_CDROM_CD"):
+            caps.add("CD")
+        elif key.startswith("ID_CDROM_BD"):
+            caps.add("BLURAY")
+    return sorted(caps)
+
+
+# ============================================================
+class DriveDiscovery:
+    def __init__(self, reconcile_interval: Optional[float] = None) -> None:
+        self.reconcile_interval = reconcile_interval
+        self._properties: Dict[str, Properties] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, Properties], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------
+    def add_listener(self, callback: Callable[[str, Properties], None]) -> None:
+        """callback(action, properties) for every add/change/remove of an optical drive."""
+        self._listeners.append(callback)
+
+    def properties(self, dev: str) -> Properties:
+        """Cached udev properties of *dev*; looked up once, then kept current by events."""
+        with self._lock:
+            props = self._properties.get(dev)
+        if props is None:
+            props = _read_udev_db(dev) or _query_udevadm(dev)
+            with self._lock:
+                self._properties[dev] = props
+        return props
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="drive-discovery", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ------------------------------------------------------
+    def _open_socket(self) -> Optional[socket.socket]:
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+            sock.bind((0, UDEV_GROUP))
+            sock.settimeout(1.0)                # lets stop() end the loop
+            return sock
+        except (OSError, AttributeError) as exc:
+            logging.warning(f"⚠️ udev events unavailable ({exc}); polling for drives instead")
+            return None
+
+    def _loop(self) -> None:
+        sock = self._open_socket()
+        interval = self.reconcile_interval or float(
+            config.get("Advanced", "drivereconcileinterval") or DEFAULT_RECONCILE
+        )
+        if sock is None:
+            interval = min(interval, FALLBACK_RECONCILE)
+
+        next_reconcile = 0.0
+        try:
+            while not self._stop.is_set():
+                if time.monotonic() >= next_reconcile:
+                    self._reconcile()
+                    next_reconcile = time.monotonic() + interval
+                if sock is None:
+                    self._stop.wait(max(0.0, next_reconcile - time.monotonic()))
+                    continue
+                try:
+                    data = sock.recv(65536)
+                except socket.timeout:
+                    continue
+                except OSError as exc:
+                    if exc.errno == errno.ENOBUFS:  # events lost: resync now
+                        next_reconcile = 0.0
+                        continue
+                    raise
+                props = parse_udev_message(data)
+                if props and is_optical(props) and props.get("DEVNAME"):
+                    self._handle(props.get("ACTION", "change"), props)
+        except Exception as exc:
+            logging.error(f"❌ Drive discovery stopped: {exc}")
+        finally:
+            if sock is not None:
+                sock.close()
+
+    def _handle(self, action: str, props: Properties) -> None:
+        dev = props["DEVNAME"]
+        if action == "remove":
+            with self._lock:
+                self._properties.pop(dev, None)
+            self._drive_removed(dev)
+        else:
+            with self._lock:
+                self._properties[dev] = props
+            if not drive_tracker.get_drive(dev):
+                self._drive_added(dev, props)
+
+        for callback in list(self._listeners):
+            try:
+                callback(action, props)
+            except Exception as exc:
+                logging.warning(f"DriveDiscovery listener failed: {exc}")
+
+    # ------------------------------------------------------
+    def _present(self) -> Set[str]:
+        try:
+            return {f"/dev/{name}" for name in os.listdir(SYS_BLOCK) if name.startswith("sr")}
+        except OSError:
+            return set()
+
+    def _reconcile(self) -> None:
+        present = self._present()
+        for dev in present:
             if not drive_tracker.get_drive(dev):
-                model = _get_drive_model(dev)
-                cap = _get_drive_capability(dev)
-                drive_tracker.register_drive(path=dev, model=model, capability=cap)
-                print(f"📦 Registered drive: {dev} ({model}) [{cap}]")
-
-        # Remove stale drives
-        tracked_devs = {d.path for d in drive_tracker.get_all_drives()}
-        for dev in tracked_devs - current_devs:
-            d = drive_tracker.get_drive(dev)
-            if d:
-                if d.job_id:
-                    job = job_tracker.get_job(d.job_id)
-                    if job and job.runner:
-                        job.runner.cancel()
-                        print(f"❌ Cancelled job {d.job_id} due to drive removal: {dev}")
-                    else:
-                        print(f"⚠️ Could not find runner for job {d.job_id} during unplug of {dev}")
-                drive_tracker.unregister_drive(dev)
-                print(f"🗑️ Unregistered unplugged drive: {dev}")
-
-
-        time.sleep(interval)
+                self._drive_added(dev, self.properties(dev))
+                continue
+            # a lost or unparsable uevent: replay media changes from the udev database
+            with self._lock:
+                cached = self._properties.get(dev)
+            fresh = _read_udev_db(dev)
+            if cached is not None and fresh and fresh.get("ID_CDROM_MEDIA") != cached.get("ID_CDROM_MEDIA"):
+                fresh["DEVNAME"] = dev
+                logging.info(f"🔄 Media change on {dev} missed by udev events; replaying it")
+                self._handle("change", fresh)
+        for drive in drive_tracker.get_all_drives():
+            if drive.path.startswith("/dev/sr") and drive.path not in present:
+                with self._lock:
+                    self._properties.pop(drive.path, None)
+                self._drive_removed(drive.path)
+
+    def _drive_added(self, dev: str, props: Properties) -> None:
+        model, cap = drive_model(props), drive_capability(props)
+        drive_tracker.register_drive(path=dev, model=model, capability=cap)
+        logging.info(f"📦 Registered drive: {dev} ({model}) {cap}")
+
+    def _drive_removed(self, dev: str) -> None:
+        drive = drive_tracker.unregister_drive(dev)
+        if not drive:
+            return
+        if drive.job_id:
+            job = job_tracker.get_job(drive.job_id)
+            if job and job.runner:
+                job.runner.cancel()
+                logging.info(f"❌ Cancelled job {drive.job_id} due to drive removal: {dev}")
+            else:
+                logging.warning(f"⚠️ Could not find runner for job {drive.job_id} during unplug of {dev}")
+        logging.info(f"🗑️ Unregistered unplugged drive: {dev}")
+
+
+drive_discovery = DriveDiscovery()
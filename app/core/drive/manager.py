@@ -1,7 +1,7 @@
 # app/core/drive/manager.py
 
 import threading
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from app.core.drive.drive import Drive
 import logging
 
@@ -9,17 +9,34 @@ class DriveTracker:
     def __init__(self):
         self.drives: Dict[str, Drive] = {}
         self.lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+
+    # ------------------------------------------------------
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """callback() runs after every change to the tracked drives."""
+        self._listeners.append(callback)
+
+    def notify(self) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as exc:
+                logging.warning(f"DriveTracker listener failed: {exc}")
 
     def register_drive(self, path: str, model: str, capability: List[str], disc_label: Optional[str] = None) -> Drive:
         with self.lock:
             drive = Drive(path=path, model=model, capability=capability or ["Unknown"], disc_label=disc_label)
             self.drives[path] = drive
-            return drive
+        self.notify()
+        return drive
 
-    def unregister_drive(self, path: str):
-        """Completely removes a drive from tracking."""
-        if path in self.drives:
-            del self.drives[path]
+    def unregister_drive(self, path: str) -> Optional[Drive]:
+        """Completely removes a drive from tracking; returns it (None if untracked)."""
+        with self.lock:
+            drive = self.drives.pop(path, None)
+        if drive:
+            self.notify()
+        return drive
 
     def get_drive(self, path: str) -> Optional[Drive]:
         return self.drives.get(path)
@@ -27,31 +44,36 @@ class DriveTracker:
     def assign_job(self, path: str, job_id: str) -> bool:
         with self.lock:
             drive = self.drives.get(path)
-            if drive and drive.is_available:
-                drive.job_id = job_id
-                return True
-            return False
+            if not drive or not drive.is_available:
+                return False
+            drive.job_id = job_id
+        self.notify()
+        return True
 
     def release_drive(self, path: str) -> bool:
         with self.lock:
             drive = self.drives.get(path)
-            if drive:
-                drive.job_id = None
-                return True
-            return False
+            if not drive:
+                return False
+            drive.job_id = None
+        self.notify()
+        return True
 
     def blacklist_drive(self, path: str):
         with self.lock:
             if path in self.drives:
                 self.drives[path].blacklisted = True
+        self.notify()
 
     def unblacklist_drive(self, path: str):
         with self.lock:
             if path in self.drives:
                 self.drives[path].blacklisted = False
+        self.notify()
 
     def get_all_drives(self) -> List[Drive]:
-        return list(self.drives.values())
+        with self.lock:
+            return list(self.drives.values())
 
 
 drive_tracker = DriveTracker()
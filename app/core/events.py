@@ -0,0 +1,162 @@
+# app/core/events.py
+"""
+Event bus between disc detection and the job API.
+
+Detection publishes events ("drive.inserted", "drive.ejected"); the API
+subscribes handlers.  Within one process the handler is called directly
+(in an executor, it creates jobs); a detector running as a separate
+process reaches the server over a Unix-domain socket instead of HTTPS.
+
+Delivery is acknowledged: publish() returns once a handler has run and
+retries transport failures (no server, timeout, connection lost before
+the ack) with backoff.  A handler that raises is final – retrying it
+would only repeat its side effects – and is reported as EventRejected.
+Every event carries an id and the receiving side remembers recent ids,
+so a retry whose first attempt did get through (ack lost) isn't handled
+twice.
+
+Wire format: one JSON object per line each way,
+    → {"id": …, "topic": …, "payload": {…}}
+    ← {"id": …, "ok": true, "result": …} | {"id": …, "ok": false, "retry": bool, "error": "…"}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .configmanager import config
+
+DEFAULT_SOCKET = "~/TKAutoRipper/run/events.sock"
+ATTEMPTS = 6
+BACKOFF = 0.25                  # seconds, doubled per attempt (≈ 16 s in total)
+ACK_TIMEOUT = 30.0
+SEEN_IDS = 1024
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+
+class EventError(RuntimeError):
+    pass
+
+
+class EventRejected(EventError):
+    """The handler ran and failed; the event is not retried."""
+
+
+def socket_path() -> Path:
+    return Path(config.get("Advanced", "eventsocket") or DEFAULT_SOCKET).expanduser()
+
+
+# ============================================================
+class EventBus:
+    def __init__(self) -> None:
+        self._handlers: Dict[str, Handler] = {}
+        self._results: "OrderedDict[str, asyncio.Future]" = OrderedDict()  # event id → handler run
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # ── receiving side ────────────────────────────────────
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """handler(payload) handles *topic*; its return value is the ack result."""
+        self._handlers[topic] = handler
+
+    async def deliver(self, event_id: str, topic: str, payload: Dict[str, Any]) -> Any:
+        """Runs the handler once per event id; raises EventRejected if it fails."""
+        run = self._results.get(event_id)           # retry of an event handled or in progress
+        if run is None:
+            handler = self._handlers.get(topic)
+            if handler is None:
+                raise EventError(f"no handler for {topic}")
+            run = self._results[event_id] = asyncio.get_running_loop().run_in_executor(None, handler, payload)
+            while len(self._results) > SEEN_IDS:
+                self._results.popitem(last=False)
+        try:
+            return await asyncio.shield(run)        # a dropped connection doesn't cancel the handler
+        except Exception as exc:
+            self._results.pop(event_id, None)       # failed: a retry runs it again
+            raise EventRejected(f"{topic} handler failed: {exc}") from exc
+
+    async def serve(self, path: Optional[Path] = None) -> None:
+        """Accepts events from detector processes on a Unix socket."""
+        path = path or socket_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.is_socket():
+            path.unlink()                           # left over from a previous run
+        self._server = await asyncio.start_unix_server(self._connection, path=str(path))
+        os.chmod(path, 0o600)
+        logging.info(f"📨 Event socket listening on {path}")
+
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                event = None
+                try:
+                    event = json.loads(line)
+                    result = await self.deliver(event["id"], event["topic"], event.get("payload") or {})
+                    reply = {"id": event["id"], "ok": True, "result": result}
+                except (EventError, ValueError, KeyError) as exc:
+                    reply = {"id": event.get("id") if isinstance(event, dict) else None,
+                             "ok": False, "retry": not isinstance(exc, (EventRejected, ValueError, KeyError)),
+                             "error": str(exc)}
+                writer.write(json.dumps(reply, default=str).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    # ── publishing side ───────────────────────────────────
+    async def publish(self, topic: str, payload: Dict[str, Any]) -> Any:
+        """
+        Delivers the event – to the local handler if this process has one,
+        else over the event socket – retrying until acknowledged.  Raises
+        EventRejected at once if the handler failed, EventError when every
+        attempt failed to get through.
+        """
+        event_id = uuid.uuid4().hex
+        delay = BACKOFF
+        for attempt in range(1, ATTEMPTS + 1):
+            try:
+                if topic in self._handlers:
+                    return await self.deliver(event_id, topic, payload)
+                return await asyncio.wait_for(self._send(event_id, topic, payload), ACK_TIMEOUT)
+            except EventRejected:
+                raise
+            except (EventError, OSError, ValueError, asyncio.TimeoutError) as exc:
+                if attempt == ATTEMPTS:
+                    raise EventError(f"{topic} not delivered after {ATTEMPTS} attempts: {exc}") from exc
+                logging.warning(f"⚠️ Delivering {topic} failed ({exc}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def _send(self, event_id: str, topic: str, payload: Dict[str, Any]) -> Any:
+        reader, writer = await asyncio.open_unix_connection(str(socket_path()))
+        try:
+            writer.write(json.dumps({"id": event_id, "topic": topic, "payload": payload}).encode() + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+        finally:
+            writer.close()
+        if not line:
+            raise EventError("connection closed before ack")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            if reply.get("retry", True):
+                raise EventError(reply.get("error") or "not handled")
+            raise EventRejected(reply.get("error") or "rejected")
+        return reply.get("result")
+
+
+event_bus = EventBus()
@@ -1,8 +1,16 @@
+import shlex
 from pathlib import Path
 from typing import List
+
+
 def build_iso_dump_cmd(device: str, output_path: Path) -> List[str]:
+    """
+    The shell pipeline the native reader (dd/reader.py) replaced; kept for
+    its benchmark and for debugging drives by hand.
+    """
+    q = shlex.quote
     return [
         "sh",
         "-c",
-        f"pv -pter {device} | dd bs=2048 of={output_path} status=progress"
+        f"pv -pterb {q(str(device))} | dd bs=2048 of={q(str(output_path))} status=progress"
     ]
@@ -0,0 +1,280 @@
+"""
+Bad-sector-aware imaging (ddrescue style).
+
+The state of every byte of the disc lives in a map of extents that is
+persisted next to the image in GNU ddrescue's mapfile format, so an
+interrupted dump – cancelled, crashed or failed – continues where it
+stopped, and `ddrescue` / `ddrescueview` can read the map too.
+
+Passes:
+  1. copy    – large reads over untried areas; a failed block is marked
+               non-trimmed and the reader jumps ahead (doubling the jump
+               on consecutive errors) so the drive doesn't grind on a
+               scratch.  Areas jumped over stay untried.
+  2. sweep   – the same over what pass 1 jumped over, without jumping.
+  3. trim    – failed blocks are re-read one sector at a time; sectors
+               that still fail are marked bad.
+  4+ retry   – bad sectors are retried *retries* times.
+
+Unreadable sectors are left as zeros in the image.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .reader import BLOCK_SIZE, BlockDeviceReader, ReadStats, SparseWriter
+
+SECTOR = 2048
+
+# ddrescue block states
+NON_TRIED = "?"
+NON_TRIMMED = "*"
+BAD = "-"
+FINISHED = "+"
+
+# ddrescue "current status" per pass
+_PHASE = {1: "?", 2: "?", 3: "*"}
+
+MIN_SKIP = 64 * 1024
+MAX_SKIP = 64 * 1024 * 1024
+SAVE_INTERVAL = 5.0                 # seconds between mapfile writes
+
+# (done, total, bad) → None; raise to abort
+RescueProgress = Callable[[int, int, int], None]
+
+
+# ============================================================
+class RescueMap:
+    """Sorted, non-overlapping (pos, size, status) extents covering the disc."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.extents: List[List] = [[0, size, NON_TRIED]] if size else []
+        self.current_pos = 0
+        self.current_pass = 1
+
+    # ---------------------------------------------------------
+    def mark(self, pos: int, size: int, status: str) -> None:
+        end = min(pos + size, self.size)
+        if end <= pos:
+            return
+        starts = [e[0] for e in self.extents]
+        first = max(0, bisect.bisect_right(starts, pos) - 1)
+        last = bisect.bisect_left(starts, end)
+
+        replaced: List[List] = []
+        for p, s, st in self.extents[first:last]:
+            if p < pos:
+                replaced.append([p, pos - p, st])
+            if p + s > end:
+                replaced.append([end, p + s - end, st])
+        replaced.append([pos, end - pos, status])
+        replaced.sort()
+        self.extents[first:last] = replaced
+        self._merge(max(0, first - 1), first + len(replaced) + 1)
+
+    def _merge(self, lo: int, hi: int) -> None:
+        i = lo
+        while i < min(hi, len(self.extents)) - 1:
+            a, b = self.extents[i], self.extents[i + 1]
+            if a[2] == b[2] and a[0] + a[1] == b[0]:
+                a[1] += b[1]
+                del self.extents[i + 1]
+                hi -= 1
+            else:
+                i += 1
+
+    def areas(self, status: str) -> List[Tuple[int, int]]:
+        """Snapshot of (pos, size) extents with *status*."""
+        return [(p, s) for p, s, st in self.extents if st == status]
+
+    def total(self, status: str) -> int:
+        return sum(s for _, s, st in self.extents if st == status)
+
+    @property
+    def done(self) -> int:
+        """Bytes that have been through every pass that was due for them."""
+        return self.total(FINISHED) + self.total(BAD)
+
+    # ── GNU ddrescue mapfile ─────────────────────────────────
+    def save(self, path: Path) -> None:
+        status = _PHASE.get(self.current_pass, BAD) if self.total(NON_TRIED) + self.total(NON_TRIMMED) + self.total(BAD) else FINISHED
+        lines = [
+            "# Mapfile. Created by TKAutoRipper",
+            "# current_pos  current_status  current_pass",
+            f"0x{self.current_pos:08X}     {status}               {self.current_pass}",
+            "#      pos        size  status",
+        ]
+        lines += [f"0x{p:08X}  0x{s:08X}  {st}" for p, s, st in self.extents]
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="ascii") as fp:
+            fp.write("\n".join(lines) + "\n")
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, size: int) -> Optional["RescueMap"]:
+        """The saved map, or None if missing, unreadable or for another size."""
+        try:
+            rows = [
+                line.split() for line in path.read_text(encoding="ascii").splitlines()
+                if line.strip() and not line.startswith("#")
+            ]
+            pos, _, current_pass = rows[0][:3]
+            extents = [[int(p, 16), int(s, 16), st] for p, s, st in (r[:3] for r in rows[1:])]
+        except (OSError, ValueError, IndexError):
+            return None
+
+        # non-trimmed/bad areas from ddrescue's later phases map onto ours
+        for extent in extents:
+            if extent[2] == "/":
+                extent[2] = NON_TRIMMED
+        if sum(e[1] for e in extents) != size or (extents and extents[0][0] != 0):
+            return None
+
+        rmap = cls(size)
+        rmap.extents = extents
+        rmap.current_pos = int(pos, 16)
+        rmap.current_pass = int(current_pass)
+        rmap._merge(0, len(extents))
+        return rmap
+
+
+# ============================================================
+class RescueImager:
+    """
+    Images *device* into *output* driven by the map at *mapfile*; calling
+    run() again after an interruption picks up from the saved map.
+    """
+
+    def __init__(
+        self,
+        device: str,
+        output: Path,
+        mapfile: Path,
+        retries: int = 2,
+        block_size: int = BLOCK_SIZE,
+        direct: bool = False,
+        sparse: bool = True,
+        on_progress: Optional[RescueProgress] = None,
+    ) -> None:
+        self.device = device
+        self.output = Path(output)
+        self.mapfile = Path(mapfile)
+        self.retries = retries
+        self.block_size = block_size
+        self.direct = direct
+        self.sparse = sparse
+        self.on_progress = on_progress
+        self.map: Optional[RescueMap] = None
+        self.resumed = False
+        self._saved = 0.0
+
+    # ---------------------------------------------------------
+    def run(self) -> ReadStats:
+        with BlockDeviceReader(self.device, self.block_size, self.direct) as reader:
+            size = reader.size
+            self.map = RescueMap.load(self.mapfile, size) if self.output.exists() else None
+            self.resumed = self.map is not None
+            if self.map is None:
+                self.map = RescueMap(size)
+                self.output.unlink(missing_ok=True)     # no stale data under unread areas
+
+            stats = ReadStats(reader.device, reader.direct, reader.block_size, size)
+            with SparseWriter(self.output, self.sparse, size=size) as out:
+                try:
+                    self._passes(reader, out, stats)
+                finally:
+                    self.map.save(self.mapfile)
+                stats.direct = reader.direct
+                stats.bytes_sparse = out.skipped
+        return stats.finish()
+
+    def _passes(self, reader: BlockDeviceReader, out: SparseWriter, stats: ReadStats) -> None:
+        rmap = self.map
+        if rmap.current_pass <= 1:
+            self._copy(reader, out, stats, skip=True)
+            rmap.current_pass = 2
+        if rmap.current_pass == 2:
+            self._copy(reader, out, stats, skip=False)
+            rmap.current_pass = 3
+        if rmap.current_pass == 3:
+            self._sectors(reader, out, stats, NON_TRIMMED)
+            rmap.current_pass = 4
+        while rmap.current_pass < 4 + self.retries and rmap.total(BAD):
+            self._sectors(reader, out, stats, BAD)
+            rmap.current_pass += 1
+        rmap.current_pass = max(rmap.current_pass, 4 + self.retries)
+        rmap.current_pos = rmap.size
+
+    # ---------------------------------------------------------
+    def _copy(self, reader: BlockDeviceReader, out: SparseWriter, stats: ReadStats, skip: bool) -> None:
+        jump = MIN_SKIP
+        for start, length in self.map.areas(NON_TRIED):
+            pos, end = start, start + length
+            # resume inside the area the saved map was working on
+            if start < self.map.current_pos < end and self.map.current_pass <= 2:
+                pos = self.map.current_pos
+            while pos < end:
+                n = min(self.block_size, end - pos)
+                try:
+                    data = reader.pread(pos, n)
+                except OSError:
+                    self.map.mark(pos, n, NON_TRIMMED)
+                    pos += n
+                    if skip and pos < end:
+                        # jump over a region and leave it for the sweep
+                        hop = min(jump, end - pos) // SECTOR * SECTOR or min(SECTOR, end - pos)
+                        pos += hop
+                        jump = min(jump * 2, MAX_SKIP)
+                    self._checkpoint(pos)
+                    continue
+                if not data:                        # device shorter than reported
+                    self.map.mark(pos, end - pos, BAD)
+                    break
+                out.pwrite(data, pos)
+                self.map.mark(pos, len(data), FINISHED)
+                stats.bytes_read += len(data)
+                pos += len(data)
+                jump = MIN_SKIP
+                self._checkpoint(pos)
+
+    def _sectors(self, reader: BlockDeviceReader, out: SparseWriter, stats: ReadStats, status: str) -> None:
+        for start, length in self.map.areas(status):
+            for pos in range(start, start + length, SECTOR):
+                n = min(SECTOR, start + length - pos)
+                try:
+                    data = reader.pread(pos, n)
+                except OSError:
+                    data = None
+                if data:
+                    out.pwrite(data, pos)
+                    self.map.mark(pos, len(data), FINISHED)
+                    stats.bytes_read += len(data)
+                else:
+                    self.map.mark(pos, n, BAD)
+                self._checkpoint(pos + n)
+
+    def _checkpoint(self, pos: int) -> None:
+        rmap = self.map
+        rmap.current_pos = pos
+        now = time.monotonic()
+        if now - self._saved >= SAVE_INTERVAL:
+            self._saved = now
+            rmap.save(self.mapfile)
+        if self.on_progress:
+            self.on_progress(rmap.done, rmap.size, rmap.total(BAD))
+
+    def summary(self) -> Dict[str, int]:
+        rmap = self.map
+        return {
+            "rescued": rmap.total(FINISHED),
+            "bad": rmap.total(BAD),
+            "bad_areas": len(rmap.areas(BAD)),
+        }
@@ -1,15 +1,62 @@
 from app.core.configmanager import config
+import os
+import shutil
 import subprocess
+import threading
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
+
+FLATPAK_APP = "fr.handbrake.ghb"
+FLATPAK_ROOTS = (Path("/var/lib/flatpak"), Path("~/.local/share/flatpak").expanduser())
+
+# (install fingerprint, probe result) – see get_available_hw_encoders()
+_encoder_cache: Optional[Tuple[Any, Dict]] = None
+_encoder_lock = threading.Lock()
+
+
+def _use_flatpak() -> bool:
+    raw_val = config.get("Advanced", "HandbrakeFlatpak")
+    return raw_val if isinstance(raw_val, bool) else True
+
+
+def _install_fingerprint(use_flatpak: bool) -> Tuple:
+    """Changes whenever HandBrake is installed, updated or removed."""
+    if use_flatpak:
+        # `active` points at the deployed commit and moves on every update
+        candidates = [root / "app" / FLATPAK_APP / "current" / "active" for root in FLATPAK_ROOTS]
+    else:
+        found = shutil.which("HandBrakeCLI")
+        candidates = [Path(found)] if found else []
+
+    stamps = []
+    for path in candidates:
+        try:
+            real = os.path.realpath(path)
+            st = os.stat(real)
+            stamps.append((real, st.st_mtime_ns, st.st_size))
+        except OSError:
+            continue
+    return (use_flatpak, tuple(stamps))
 
 
 def get_available_hw_encoders():
+    """
+    Hardware encoders HandBrake was built with.  Probing means running
+    HandBrakeCLI, so the result is cached until the installation changes.
+    """
+    global _encoder_cache
+    use_flatpak = _use_flatpak()
+    fingerprint = _install_fingerprint(use_flatpak)
+    with _encoder_lock:
+        if _encoder_cache is None or _encoder_cache[0] != fingerprint:
+            _encoder_cache = (fingerprint, _probe_hw_encoders(use_flatpak))
+        return _encoder_cache[1]
+
+
+def _probe_hw_encoders(use_flatpak: bool) -> Dict:
     try:
-        raw_val = config.get("Advanced", "HandbrakeFlatpak")
-        use_flatpak = raw_val if isinstance(raw_val, bool) else True
         if use_flatpak:
-            cmd = ["flatpak", "run", "--command=HandBrakeCLI", "fr.handbrake.ghb", "-h"]
+            cmd = ["flatpak", "run", "--command=HandBrakeCLI", FLATPAK_APP, "-h"]
         else:
             cmd = ["HandBrakeCLI", "-h"]
 
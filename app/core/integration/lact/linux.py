@@ -1,16 +1,67 @@
 import socket
 import json
-from typing import Dict, List
+import threading
+from typing import Dict, List, Optional
+
+LACTD_SOCKET = "/run/lactd.sock"
+TIMEOUT = 2.0
+
+
+class LactClient:
+    """
+    One persistent connection to lactd (newline-delimited JSON requests
+    and replies), reopened on the next query after any error.
+    """
+
+    def __init__(self, path: str = LACTD_SOCKET) -> None:
+        self.path = path
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(TIMEOUT)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+        self._sock = self._reader = None
+
+    def query(self, command: Dict) -> Dict:
+        with self._lock:
+            # a reused connection may have been dropped by lactd: retry once fresh
+            for attempt in range(2):
+                fresh = self._sock is None
+                try:
+                    if fresh:
+                        self._connect()
+                    self._sock.sendall(json.dumps(command).encode() + b"\n")
+                    line = self._reader.readline()
+                    if not line:
+                        raise ConnectionResetError("lactd closed the connection")
+                    return json.loads(line.decode())
+                except (OSError, json.JSONDecodeError):
+                    self.close()
+                    if fresh:
+                        return {}
+            return {}
+
+
+_client = LactClient()
+
 
 def _query_lact(command: Dict) -> Dict:
-    try:
-        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
-            client.connect("/run/lactd.sock")
-            client.sendall(json.dumps(command).encode() + b"\n")
-            response = client.recv(4096)
-            return json.loads(response.decode())
-    except (FileNotFoundError, ConnectionRefusedError, json.JSONDecodeError):
-        return {}
+    return _client.query(command)
+
 
 def get_gpu_info() -> List[Dict]:
     gpu_info = []
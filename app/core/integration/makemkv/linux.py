@@ -1,8 +1,10 @@
-from typing import List
+from typing import List, Optional
 from pathlib import Path
-def build_makemkv_cmd(drive_path: str, temp_dir: Path, progress_path: Path) -> List[str]:
+def build_makemkv_cmd(drive_path: str, temp_dir: Path, progress_path: Optional[Path] = None) -> List[str]:
+    # "-same" keeps PRGV progress lines on stdout for the runner's parser
+    progress = str(progress_path) if progress_path else "-same"
     return [
         "makemkvcon", "--robot", "mkv", f"dev:{drive_path}", "all",
         str(temp_dir), "--noscan", "--decrypt", "--minlength=1",
-        f"--progress={progress_path}"
+        f"--progress={progress}"
     ]
@@ -1,9 +1,113 @@
+import shutil
+import subprocess
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, List, Optional
+
+from app.core.compression import CompressionStats, CountingWriter, ProgressCallback, read_chunks
+
+try:
+    import zstandard
+except ImportError:                     # optional: fall back to the zstd CLI
+    zstandard = None
+
+
 def build_zstd_cmd(input_path: Path, output_path: Path) -> List[str]:
     return [
         "zstd",
+        "--progress",
         str(input_path),
         "-o",
         str(output_path)
     ]
+
+
+def build_zstd_stream_cmd(level: int = 3, threads: int = 1, long_window: int = 0) -> List[str]:
+    """stdin → stdout filter for streaming pipelines."""
+    cmd = ["zstd", "-q", "-c", f"-{level}", f"-T{threads}"]
+    if level > 19:
+        cmd.append("--ultra")
+    if long_window:
+        cmd.append(f"--long={long_window}")
+    return cmd
+
+
+def compress_sample(sample: bytes, level: int) -> Optional[bytes]:
+    """Single-threaded one-shot compression, used for level calibration."""
+    if zstandard is None:
+        return None
+    return zstandard.ZstdCompressor(level=level).compress(sample)
+
+
+# ============================================================
+class ZstdCompressor:
+    """
+    Multi-threaded zstd with optional long-distance matching.
+
+    Uses the zstandard bindings when installed, otherwise pipes through
+    `zstd -T<threads>` so the thread budget is honoured either way.
+    Archives made with long_window > 27 need `zstd -d --long=N`.
+    """
+
+    algorithm = "zstd"
+    suffix = ".zst"
+
+    def __init__(self, level: int = 3, threads: int = 1, long_window: int = 0) -> None:
+        self.level = level
+        self.threads = max(1, threads)
+        self.long_window = long_window
+
+    def compress(
+        self,
+        src: BinaryIO,
+        dst: BinaryIO,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> CompressionStats:
+        stats = CompressionStats(self.algorithm, self.level, self.threads)
+        out = CountingWriter(dst)
+
+        if zstandard is not None:
+            params = {"threads": self.threads}
+            if self.long_window:
+                params.update(enable_ldm=True, window_log=self.long_window)
+            cctx = zstandard.ZstdCompressor(
+                compression_params=zstandard.ZstdCompressionParameters.from_level(self.level, **params)
+            )
+            with cctx.stream_writer(out, closefd=False) as writer:
+                for chunk in read_chunks(src):
+                    writer.write(chunk)
+                    stats.bytes_in += len(chunk)
+                    stats.bytes_out = out.count
+                    if on_progress:
+                        on_progress(stats.bytes_in, stats.bytes_out)
+            stats.bytes_out = out.count
+            return stats.finish()
+
+        return self._compress_cli(src, dst, stats, on_progress)
+
+    # ---------------------------------------------------------
+    def _compress_cli(self, src, dst, stats, on_progress) -> CompressionStats:
+        if not shutil.which("zstd"):
+            raise RuntimeError("zstd not available (install the zstandard module or the zstd CLI)")
+
+        dst.flush()
+        start = dst.tell()
+        proc = subprocess.Popen(
+            build_zstd_stream_cmd(self.level, self.threads, self.long_window),
+            stdin=subprocess.PIPE,
+            stdout=dst.fileno(),
+        )
+        try:
+            for chunk in read_chunks(src):
+                proc.stdin.write(chunk)
+                stats.bytes_in += len(chunk)
+                if on_progress:
+                    on_progress(stats.bytes_in, 0)
+        finally:
+            proc.stdin.close()
+            proc.wait()
+        if proc.returncode != 0:
+            raise RuntimeError(f"zstd exited with {proc.returncode}")
+
+        dst.seek(0, 2)
+        stats.bytes_out = dst.tell() - start
+        return stats.finish()
@@ -0,0 +1,219 @@
+"""
+Seekable zstd archives.
+
+Implements the zstd "seekable format" (contrib/seekable_format in the zstd
+repository): the data is cut into independently compressed frames and a
+seek table is appended as a skippable frame:
+
+    Magic 0x184D2A5E | Frame_Size | entries… | Number_Of_Frames u32
+                     | Descriptor u8 | Seekable magic 0x8F92EAB1
+
+Each entry is (compressed size u32, decompressed size u32).  Plain `zstd -d`
+still decompresses the file; SeekableZstdReader can read any byte range
+by inflating only the frames that cover it.
+"""
+
+from __future__ import annotations
+
+import bisect
+import io
+import struct
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Optional, Tuple
+
+from app.core.compression import CompressionStats, ProgressCallback, read_chunks
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SKIPPABLE_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+FOOTER_SIZE = 9
+DEFAULT_FRAME_SIZE = 4 * 1024 * 1024
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise RuntimeError("seekable zstd archives need the 'zstandard' module")
+
+
+# ============================================================
+class SeekableZstdCompressor:
+    """
+    Compressor-engine compatible writer (see app.core.compression).
+    Frames are compressed on *threads* workers and written in order;
+    only the seek table is kept in memory.
+    """
+
+    algorithm = "zstd-seekable"
+    suffix = ".zst"
+
+    def __init__(self, level: int = 3, threads: int = 1, frame_size: int = DEFAULT_FRAME_SIZE) -> None:
+        _require_zstandard()
+        self.level = level
+        self.threads = max(1, threads)
+        self.frame_size = frame_size
+        self._local = threading.local()
+
+    def _compress_frame(self, data: bytes) -> bytes:
+        cctx = getattr(self._local, "cctx", None)
+        if cctx is None:
+            cctx = self._local.cctx = zstandard.ZstdCompressor(
+                level=self.level, write_checksum=True, write_content_size=True,
+            )
+        return cctx.compress(data)
+
+    def compress(
+        self,
+        src: BinaryIO,
+        dst: BinaryIO,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> CompressionStats:
+        stats = CompressionStats(self.algorithm, self.level, self.threads)
+        table: List[Tuple[int, int]] = []
+        in_flight = deque()
+
+        def drain(limit: int) -> None:
+            while len(in_flight) > limit:
+                size, future = in_flight.popleft()
+                frame = future.result()
+                dst.write(frame)
+                table.append((len(frame), size))
+                stats.bytes_in += size
+                stats.bytes_out += len(frame)
+                if on_progress:
+                    on_progress(stats.bytes_in, stats.bytes_out)
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            for block in read_chunks(src, self.frame_size):
+                in_flight.append((len(block), pool.submit(self._compress_frame, block)))
+                drain(self.threads * 2)
+            drain(0)
+
+        seek_table = build_seek_table(table)
+        dst.write(seek_table)
+        stats.bytes_out += len(seek_table)
+        return stats.finish()
+
+
+def build_seek_table(frames: List[Tuple[int, int]]) -> bytes:
+    body = b"".join(struct.pack("<II", c, d) for c, d in frames)
+    body += struct.pack("<IBI", len(frames), 0, SEEKABLE_MAGIC)
+    return struct.pack("<II", SKIPPABLE_MAGIC, len(body)) + body
+
+
+# ============================================================
+class SeekableZstdReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over a seekable zstd archive.
+    A few recently inflated frames are cached, so sequential reads and
+    directory walks don't decompress the same frame twice.
+    """
+
+    def __init__(self, fp: BinaryIO, cache_frames: int = 8) -> None:
+        _require_zstandard()
+        super().__init__()
+        self.fp = fp
+        self._dctx = zstandard.ZstdDecompressor()
+        self._cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._cache_frames = cache_frames
+        self._pos = 0
+        self._load_seek_table()
+
+    @classmethod
+    def open(cls, path) -> "SeekableZstdReader":
+        return cls(open(path, "rb"))
+
+    # ---------------------------------------------------------
+    def _load_seek_table(self) -> None:
+        self.fp.seek(0, io.SEEK_END)
+        end = self.fp.tell()
+        if end < FOOTER_SIZE:
+            raise ValueError("not a seekable zstd archive")
+
+        self.fp.seek(end - FOOTER_SIZE)
+        count, descriptor, magic = struct.unpack("<IBI", self.fp.read(FOOTER_SIZE))
+        if magic != SEEKABLE_MAGIC:
+            raise ValueError("not a seekable zstd archive (no seek table)")
+
+        entry_size = 12 if descriptor & 0x80 else 8
+        table_size = 8 + count * entry_size + FOOTER_SIZE
+        self.fp.seek(end - table_size)
+        raw = self.fp.read(table_size)
+        magic, _ = struct.unpack_from("<II", raw)
+        if magic != SKIPPABLE_MAGIC:
+            raise ValueError("corrupt seek table")
+
+        # prefix sums: frame i covers [d_offsets[i], d_offsets[i+1])
+        self.c_offsets = [0]
+        self.d_offsets = [0]
+        for i in range(count):
+            c, d = struct.unpack_from("<II", raw, 8 + i * entry_size)
+            self.c_offsets.append(self.c_offsets[-1] + c)
+            self.d_offsets.append(self.d_offsets[-1] + d)
+
+    @property
+    def size(self) -> int:
+        return self.d_offsets[-1]
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.d_offsets) - 1
+
+    def _frame(self, index: int) -> bytes:
+        data = self._cache.get(index)
+        if data is not None:
+            self._cache.move_to_end(index)
+            return data
+
+        self.fp.seek(self.c_offsets[index])
+        raw = self.fp.read(self.c_offsets[index + 1] - self.c_offsets[index])
+        data = self._dctx.decompress(raw, max_output_size=self.d_offsets[index + 1] - self.d_offsets[index])
+        self._cache[index] = data
+        if len(self._cache) > self._cache_frames:
+            self._cache.popitem(last=False)
+        return data
+
+    # ---------------------------------------------------------
+    def read_range(self, offset: int, length: int) -> bytes:
+        """Decompressed bytes [offset, offset+length), clipped to the end."""
+        end = min(self.size, offset + max(0, length))
+        out = bytearray()
+        while offset < end:
+            index = bisect.bisect_right(self.d_offsets, offset) - 1
+            frame = self._frame(index)
+            start = offset - self.d_offsets[index]
+            piece = frame[start:start + (end - offset)]
+            out += piece
+            offset += len(piece)
+        return bytes(out)
+
+    # ── io.RawIOBase ─────────────────────────────────────────
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        data = self.read_range(self._pos, len(buffer))
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.fp.close()
+        super().close()
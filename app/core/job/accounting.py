@@ -0,0 +1,162 @@
+# app/core/job/accounting.py
+"""
+Per-step resource accounting.
+
+Child processes: JobRunner reaps every command with wait4(), whose rusage
+covers the command and all descendants it waited for – CPU time, peak
+RSS (of the largest single process) and block I/O, i.e. bytes that
+really hit storage.  While the command runs, /proc/<pid>/io of its
+process tree is sampled for rchar/wchar – all bytes read and written,
+pipes and page cache included.
+
+In-process steps (StepTask) are accounted from the worker thread's own
+rusage and /proc/thread-self/io.
+"""
+
+from __future__ import annotations
+
+import os
+import resource
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional
+
+SAMPLE_INTERVAL = 1.0
+BLOCK = 512                         # unit of ru_inblock / ru_oublock
+
+
+@dataclass
+class StepUsage:
+    wall: float = 0.0               # seconds
+    user: float = 0.0               # CPU seconds
+    system: float = 0.0
+    max_rss: int = 0                # bytes, largest single process
+    read_bytes: int = 0             # storage I/O
+    write_bytes: int = 0
+    rchar: int = 0                  # all reads/writes (sampled for child processes)
+    wchar: int = 0
+    processes: int = 0              # commands run
+
+    def add(self, other: "StepUsage") -> None:
+        self.user += other.user
+        self.system += other.system
+        self.max_rss = max(self.max_rss, other.max_rss)
+        self.read_bytes += other.read_bytes
+        self.write_bytes += other.write_bytes
+        self.rchar += other.rchar
+        self.wchar += other.wchar
+        self.processes += other.processes
+
+    def add_rusage(self, ru) -> None:
+        self.user += ru.ru_utime
+        self.system += ru.ru_stime
+        self.max_rss = max(self.max_rss, ru.ru_maxrss * 1024)     # KiB on Linux
+        self.read_bytes += ru.ru_inblock * BLOCK
+        self.write_bytes += ru.ru_oublock * BLOCK
+
+    def as_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        for key in ("wall", "user", "system"):
+            data[key] = round(data[key], 3)
+        return data
+
+
+# ------------------------------------------------------------
+def read_io(path: str) -> Dict[str, int]:
+    """/proc/<pid>/io as a dict ({} if gone or not permitted)."""
+    try:
+        with open(path, "rb") as fp:
+            return {
+                key.decode(): int(value)
+                for key, _, value in (line.partition(b":") for line in fp)
+            }
+    except (OSError, ValueError):
+        return {}
+
+
+def _children(pid: int) -> List[int]:
+    result: List[int] = []
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return result
+    for tid in tids:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children", "rb") as fp:
+                result += [int(c) for c in fp.read().split()]
+        except (OSError, ValueError):
+            pass
+    return result
+
+
+def process_tree(pid: int) -> Iterable[int]:
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack += _children(current)
+
+
+# ============================================================
+class ProcessSampler:
+    """
+    Samples rchar/wchar of a command's live process tree.  A reaped
+    process's counts fold into its parent, so the sum over live processes
+    only grows; the largest sum seen is kept.
+    """
+
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        self.rchar = 0
+        self.wchar = 0
+        self._last = 0.0
+
+    def sample(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last < SAMPLE_INTERVAL:
+            return
+        self._last = now
+        rchar = wchar = 0
+        for pid in process_tree(self.pid):
+            io = read_io(f"/proc/{pid}/io")
+            rchar += io.get("rchar", 0)
+            wchar += io.get("wchar", 0)
+        self.rchar = max(self.rchar, rchar)
+        self.wchar = max(self.wchar, wchar)
+
+
+def reap(pid: int, usage: StepUsage, sampler: Optional[ProcessSampler] = None) -> int:
+    """wait4() for *pid*, add its rusage to *usage*; returns the exit code."""
+    sampler = sampler or ProcessSampler(pid)
+    sampler.sample(force=True)                  # last look before it's gone
+    _, status, ru = os.wait4(pid, 0)
+    usage.add_rusage(ru)
+    usage.rchar += sampler.rchar
+    usage.wchar += sampler.wchar
+    usage.processes += 1
+    return os.waitstatus_to_exitcode(status)
+
+
+# ============================================================
+class ThreadMeter:
+    """CPU and I/O of the calling thread between start() and stop()."""
+
+    def __init__(self) -> None:
+        self._ru = None
+        self._io: Dict[str, int] = {}
+
+    @staticmethod
+    def _rusage():
+        return resource.getrusage(getattr(resource, "RUSAGE_THREAD", resource.RUSAGE_SELF))
+
+    def start(self) -> "ThreadMeter":
+        self._ru = self._rusage()
+        self._io = read_io("/proc/thread-self/io")
+        return self
+
+    def stop(self, usage: StepUsage) -> None:
+        ru, io = self._rusage(), read_io("/proc/thread-self/io")
+        usage.user += ru.ru_utime - self._ru.ru_utime
+        usage.system += ru.ru_stime - self._ru.ru_stime
+        for key in ("read_bytes", "write_bytes", "rchar", "wchar"):
+            setattr(usage, key, getattr(usage, key) + io.get(key, 0) - self._io.get(key, 0))
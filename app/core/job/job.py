@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, asdict, replace
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from collections import deque
 import json
 import time
 
+from .store import job_store
+
 
 @dataclass
 class Job:
@@ -18,16 +20,23 @@ class Job:
     output_path: Path
     output_path_lock: bool = False
     drive: Optional[str] = None
+    disc_size: Optional[int] = None     # bytes, as measured by disc detection
+    scratch: Dict[str, str] = field(default_factory=dict)  # resource class → scratch dir (storage.py)
 
     # ── timing ────────────────────────────────────────────
     start_time: float = field(default_factory=time.time)
     finish_time: Optional[float] = None  # set when done
 
+    # ── queue (see queue.py) ──────────────────────────────
+    priority: int = 0                   # higher is admitted first
+    queued_time: Optional[float] = None  # set while waiting for admission
+
     # ── progress & steps ──────────────────────────────────
     steps: List[Dict[str, Any]] = field(default_factory=list)
     step_weights: List[float] = field(default_factory=list)
     step_index: int = 0                 # 0-based current step
     step_progress: int = 0              # 0-100 within current step
+    step_stats: Dict[str, Any] = field(default_factory=dict)  # rate/fps/eta of current step
     job_progress: int = 0               # 0-100 overall
 
     # job_status: Queued | Running | Finished | Failed | Cancelled
@@ -40,7 +49,7 @@ class Job:
     # ======================================================
     # helpers
     # ======================================================
-    # property so we don’t hard-code path logic elsewhere
+    # legacy per-job state file (imported by JobStore.recover)
     def resume_file(self) -> Path:
         return self.temp_path / ".resume.json"
 
@@ -52,27 +61,28 @@ class Job:
     def mark_step_done(self) -> None:
         self.steps[self.step_index]["completed"] = True
         self.step_progress = 100
+        self.step_stats = {}
         self.step_index += 1
 
     def mark_finished(self) -> None:
         self.job_status = "Finished"
         self.job_progress = 100
         self.finish_time = time.time()
-        self.save_resume_state(remove=True)
+        self.save_resume_state(remove=True, event="Finished")
 
     def mark_failed(self) -> None:
         self.job_status = "Failed"
-        self.save_resume_state()
+        self.save_resume_state(event="Failed")
 
     def mark_cancelled(self) -> None:
         self.job_status = "Cancelled"
-        self.save_resume_state()
+        self.save_resume_state(event="Cancelled")
 
     # ------------------------------------------------------
     #   (de)serialization
     # ------------------------------------------------------
     def to_dict(self, persist: bool = False) -> Dict[str, Any]:
-        data = asdict(self)
+        data = asdict(replace(self, runner=None))  # runner holds locks
         # convert deque & Paths …
         data["stdout_log"] = list(self.stdout_log)
         data["temp_path"]  = str(self.temp_path)
@@ -85,29 +95,24 @@ class Job:
         return data
 
     # ------------------------------------------------------
-    def save_resume_state(self, *, remove: bool = False) -> None:
+    def save_resume_state(self, *, remove: bool = False, event: Optional[str] = None) -> None:
         """
-        Persist or delete the .resume.json file.
+        Queue the job's state for the job store (written off-thread).
 
-        remove=True → delete file (used on success)
+        remove=True → the job is done; also drop a legacy .resume.json
+        event       → status-history entry
         """
         if remove:
             try:
                 self.resume_file().unlink()
             except FileNotFoundError:
                 pass
-            return
-
-        self.temp_path.mkdir(parents=True, exist_ok=True)
-        with open(self.resume_file(), "w", encoding="utf-8") as fp:
-            json.dump(self.to_dict(persist=True), fp, indent=2)
+        job_store.save(self, event=event)
 
     # ------------------------------------------------------
     @classmethod
-    def from_resume_file(cls, file_path: Path) -> "Job":
-        with open(file_path, "r", encoding="utf-8") as fp:
-            data = json.load(fp)
-
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        data = dict(data)
         # restore Path objects
         data["temp_path"] = Path(data["temp_path"])
         data["output_path"] = Path(data["output_path"])
@@ -116,6 +121,17 @@ class Job:
         job.stdout_log = deque(data.get("stdout_log", []), maxlen=15)
         return job
 
+    @classmethod
+    def from_resume_file(cls, file_path: Path) -> "Job":
+        with open(file_path, "r", encoding="utf-8") as fp:
+            return cls.from_dict(json.load(fp))
+
+    @property
+    def step_description(self) -> str:
+        if 0 <= self.step_index < len(self.steps):
+            return self.steps[self.step_index].get("name", "")
+        return ""
+
     # ── Compatibility aliases (old templates expect these) ──
     # You can delete them once all templates use the new names.
     # -------------------------------------------------------
@@ -0,0 +1,304 @@
+# app/core/job/mover.py
+"""
+Promotion of finished artifacts from scratch storage to the output
+volume.
+
+Moves run one after another on a background thread, so a job promoting
+its output holds no scheduler slot and never keeps the next rip from
+starting.  Per file the cheapest way that works is taken:
+
+  rename          same filesystem – instant
+  reflink         FICLONE, when the filesystem shares extents across
+                  mounts (btrfs / XFS subvolumes)
+  copy_file_range in-kernel copy to <target>.part, preallocated; falls
+                  back to sendfile() and then read()/write()
+
+Copies are made durable in batches instead of one fsync() per file:
+once SYNC_BATCH bytes are unsynced or the queue runs empty the batch is
+fsync()ed, renamed into place, the target directories are fsync()ed and
+only then the sources removed.  A crash therefore leaves either the
+source or the complete target, never neither.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import errno
+import fcntl
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from app.core.diskspace import preallocate
+from .progress import ProgressUpdate
+from .task import StepTask
+
+if TYPE_CHECKING:
+    from .runner import JobRunner
+
+FICLONE = 0x40049409                # _IOW(0x94, 9, int)
+CHUNK = 64 * 1024**2
+SYNC_BATCH = 1024**3                # unsynced copied bytes before a batch is committed
+
+# errors after which the next, simpler copy method is tried
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+
+def _fsync_dir(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@dataclass(eq=False)
+class Move:
+    """One file on its way to *target*; future resolves to the method used."""
+    source: Path
+    target: Path
+    on_bytes: Optional[Callable[[int], None]] = None
+    future: concurrent.futures.Future = field(default_factory=concurrent.futures.Future)
+    method: Optional[str] = None
+    cancelled: bool = False
+    fd: Optional[int] = None                # open .part while its batch is unsynced
+    size: int = 0
+
+    @property
+    def partial(self) -> Path:
+        return self.target.with_name(self.target.name + ".part")
+
+    def cancel(self) -> None:
+        """Stop the move; the source stays where it is."""
+        self.cancelled = True
+        self.future.cancel()
+
+    def _progress(self, done: int) -> None:
+        if self.cancelled:
+            raise InterruptedError("cancelled")
+        if self.on_bytes:
+            self.on_bytes(done)
+
+
+# ============================================================
+class Mover:
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Move]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._batch: List[Move] = []
+        self._unsynced = 0
+
+    def move(self, source: Path, target: Path, on_bytes: Optional[Callable[[int], None]] = None) -> Move:
+        """Queue *source* to be moved to *target* (any thread)."""
+        item = Move(Path(source), Path(target), on_bytes)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="artifact-mover", daemon=True)
+                self._thread.start()
+        self._queue.put(item)
+        return item
+
+    # ── mover thread ─────────────────────────────────────────
+    def _work(self) -> None:
+        while True:
+            if self._batch and self._queue.empty():
+                self._commit()
+            item = self._queue.get()
+            if not item.future.set_running_or_notify_cancel():
+                continue
+            try:
+                self._move(item)
+            except Exception as exc:
+                self._abort(item, exc)
+                continue
+            if self._unsynced >= SYNC_BATCH:
+                self._commit()
+
+    def _move(self, item: Move) -> None:
+        item.target.parent.mkdir(parents=True, exist_ok=True)
+        item.size = item.source.stat().st_size
+        try:
+            os.rename(item.source, item.target)
+        except OSError as exc:
+            if exc.errno != errno.EXDEV:
+                raise
+        else:
+            _fsync_dir(item.target.parent)
+            item.method = "rename"
+            if item.on_bytes:
+                item.on_bytes(item.size)
+            item.future.set_result(item.method)
+            return
+
+        item.fd = os.open(item.partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        with open(item.source, "rb") as src:
+            item.method = self._copy(src.fileno(), item.fd, item)
+        self._batch.append(item)
+        self._unsynced += item.size
+
+    def _copy(self, src: int, dst: int, item: Move) -> str:
+        try:
+            fcntl.ioctl(dst, FICLONE, src)
+            item._progress(item.size)
+            return "reflink"
+        except OSError:
+            pass
+
+        preallocate(dst, item.size, keep_size=False)
+        done = 0
+        for method, step in (("copy_file_range", self._copy_range), ("sendfile", self._sendfile)):
+            try:
+                while done < item.size:
+                    n = step(src, dst, done, min(CHUNK, item.size - done))
+                    if n == 0:
+                        break
+                    done += n
+                    item._progress(done)
+                return method
+            except OSError as exc:
+                if exc.errno not in _UNSUPPORTED or done:
+                    raise
+        os.lseek(src, 0, os.SEEK_SET)
+        while True:
+            data = os.read(src, CHUNK)
+            if not data:
+                return "copy"
+            os.write(dst, data)
+            done += len(data)
+            item._progress(done)
+
+    @staticmethod
+    def _copy_range(src: int, dst: int, offset: int, count: int) -> int:
+        return os.copy_file_range(src, dst, count, offset, offset)
+
+    @staticmethod
+    def _sendfile(src: int, dst: int, offset: int, count: int) -> int:
+        os.lseek(dst, offset, os.SEEK_SET)
+        return os.sendfile(dst, src, offset, count)
+
+    def _commit(self) -> None:
+        """Make the batch durable, put it in place and drop the sources."""
+        batch, self._batch, self._unsynced = self._batch, [], 0
+        done: List[Move] = []
+        for item in batch:
+            try:
+                if item.cancelled:
+                    raise InterruptedError("cancelled")
+                os.fsync(item.fd)
+                os.close(item.fd)
+                item.fd = None
+                os.replace(item.partial, item.target)
+                done.append(item)
+            except (OSError, InterruptedError) as exc:
+                self._abort(item, exc)
+
+        dirs: Dict[Path, None] = dict.fromkeys(item.target.parent for item in done)
+        for path in dirs:
+            try:
+                _fsync_dir(path)
+            except OSError as exc:
+                logging.warning(f"⚠️ fsync of {path} failed: {exc}")
+        for item in done:
+            try:
+                item.source.unlink()
+            except OSError as exc:
+                logging.warning(f"⚠️ Could not remove {item.source} after copying it: {exc}")
+            item.future.set_result(item.method)
+
+    def _abort(self, item: Move, exc: BaseException) -> None:
+        if item.fd is not None:
+            os.close(item.fd)
+            item.fd = None
+        if item.method != "rename":
+            item.partial.unlink(missing_ok=True)
+        if item in self._batch:
+            self._batch.remove(item)
+            self._unsynced -= item.size
+        if not item.future.done():
+            item.future.set_exception(exc)
+
+
+mover = Mover()
+
+
+# ============================================================
+class PromoteTask(StepTask):
+    """
+    Move a finished artifact – a file, or the files matching *pattern*
+    in a staging directory – to the output volume.  Holds no scheduler slot: the
+    copying is done by the mover thread.  On a resumed job whatever was
+    already moved is simply gone from *source*.
+    """
+
+    resource = None
+
+    def __init__(self, source: Path, target: Path, pattern: str = "*") -> None:
+        self.source = source
+        self.target = target
+        self.pattern = pattern
+
+    def _pairs(self) -> List[Tuple[Path, Path]]:
+        if self.source.is_dir():
+            return [
+                (path, self.target / path.relative_to(self.source))
+                for path in sorted(self.source.rglob(self.pattern))
+                if path.is_file() and not path.name.endswith(".part")
+            ]
+        if self.source.exists():
+            return [(self.source, self.target)]
+        return []
+
+    async def run_async(self, runner: "JobRunner", index: int, weight: float) -> bool:
+        pairs = self._pairs()
+        if not pairs and not self.source.is_dir() and not self.target.exists():
+            runner.log_line(f"Nothing to move: {self.source} is missing")
+            return False
+
+        total = sum(src.stat().st_size for src, _ in pairs) or 1
+        done: Dict[int, int] = {}
+        started = time.monotonic()
+        last = [0.0]
+
+        def on_bytes(key: int) -> Callable[[int], None]:
+            def report(n: int) -> None:
+                done[key] = n
+                now = time.monotonic()
+                if now - last[0] < 0.5:
+                    return
+                last[0] = now
+                moved = sum(done.values())
+                runner.apply_progress(ProgressUpdate(
+                    percent=moved * 100.0 / total,
+                    rate=moved / max(now - started, 1e-6),
+                    bytes_done=moved,
+                ), weight)
+            return report
+
+        moves = [mover.move(src, dst, on_bytes(i)) for i, (src, dst) in enumerate(pairs)]
+        try:
+            methods = await asyncio.gather(*(asyncio.wrap_future(m.future) for m in moves))
+        except asyncio.CancelledError:
+            for m in moves:
+                m.cancel()
+            raise
+        except (OSError, InterruptedError) as exc:
+            for m in moves:
+                m.cancel()
+            runner.log_line(f"Moving to {self.target} failed: {exc}")
+            return False
+
+        for m, method in zip(moves, methods):
+            runner.log_line(f"Moved {m.source.name} → {m.target} ({method})")
+        if self.source.is_dir():
+            try:
+                self.source.rmdir()
+            except OSError:
+                pass                            # not empty – leave it for inspection
+        return True
@@ -0,0 +1,209 @@
+# app/core/job/output.py
+"""
+Child-process output handling for JobRunner.
+
+Output is read in raw chunks and split on both "\n" and "\r".  Tools like
+pv, HandBrake and zstd redraw one status line with "\r"; those redraws
+are coalesced – only the newest one per chunk is parsed, it reaches the
+log at most once a second and the UI at most UI_INTERVAL apart – while
+ordinary lines are always kept.  log.txt goes through a buffered writer
+that flushes on size or age instead of after every line.
+"""
+
+from __future__ import annotations
+
+import codecs
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, TextIO, Tuple
+
+CHUNK_SIZE = 64 * 1024
+UI_INTERVAL = 0.1                   # 10 Hz
+REDRAW_LOG_INTERVAL = 1.0
+
+_BREAK = re.compile(r"\r\n|\n|\r")
+
+LineCallback = Callable[[str], None]
+
+
+# ============================================================
+class LineSplitter:
+    """bytes → (text, is_redraw) segments; partial lines are carried over."""
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._partial = ""
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, bool]]:
+        text = self._partial + self._decoder.decode(chunk)
+        # a trailing "\r" may be the first half of "\r\n"
+        limit = len(text) - 1 if text.endswith("\r") else len(text)
+        segments = []
+        start = 0
+        for match in _BREAK.finditer(text, 0, limit):
+            segments.append((text[start:match.start()], match.group() == "\r"))
+            start = match.end()
+        self._partial = text[start:]
+        return segments
+
+    def close(self) -> List[Tuple[str, bool]]:
+        rest = (self._partial + self._decoder.decode(b"", final=True)).rstrip("\r")
+        self._partial = ""
+        return [(rest, False)] if rest else []
+
+
+# ============================================================
+class BufferedLog:
+    """
+    Append-only log file shared by all commands of a job (thread-safe).
+    Flushes once *max_bytes* are buffered or the oldest buffered line is
+    *max_delay* seconds old, and on flush()/close().
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 64 * 1024, max_delay: float = 1.0) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self._fp: Optional[TextIO] = None
+        self._buffer: List[str] = []
+        self._size = 0
+        self._since = 0.0
+        self._lock = threading.Lock()
+
+    def write(self, line: str) -> None:
+        with self._lock:
+            if not self._buffer:
+                self._since = time.monotonic()
+            self._buffer.append(line + "\n")
+            self._size += len(line) + 1
+            if self._size >= self.max_bytes or time.monotonic() - self._since >= self.max_delay:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        if self._fp is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fp = open(self.path, "a", encoding="utf-8")
+        self._fp.write("".join(self._buffer))
+        self._fp.flush()
+        self._buffer.clear()
+        self._size = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def tick(self) -> None:
+        """Flush if the oldest buffered line has aged out (call when idle)."""
+        with self._lock:
+            if self._buffer and time.monotonic() - self._since >= self.max_delay:
+                self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+
+
+# ============================================================
+class OutputPipeline:
+    """
+    One command's output → sinks.
+
+    log     – every ordinary line, redraws at most once a second
+    on_line – every ordinary line and the newest redraw of each chunk
+              (progress parsing)
+    ui      – lines batched to at most one burst per UI_INTERVAL; of the
+              redraws only the newest survives
+    """
+
+    def __init__(
+        self,
+        log: LineCallback,
+        on_line: Optional[LineCallback] = None,
+        ui: Optional[Callable[[], Optional[LineCallback]]] = None,
+        prefix: str = "",
+    ) -> None:
+        self.log = log
+        self.on_line = on_line
+        self.ui = ui                    # getter: the UI callback can change mid-run
+        self.prefix = prefix
+        self._splitter = LineSplitter()
+        self._ui_lines: List[str] = []
+        self._ui_redraw: Optional[str] = None
+        self._ui_sent = 0.0
+        self._redraw_logged = 0.0
+        self._unlogged_redraw: Optional[str] = None
+
+    # ---------------------------------------------------------
+    def feed(self, chunk: bytes) -> None:
+        redraw = None
+        for text, is_redraw in self._splitter.feed(chunk):
+            if is_redraw:
+                redraw = text               # superseded by the next one
+            else:
+                self._line(text)
+        if redraw is not None:
+            self._redraw(redraw)
+        self._pump_ui()
+
+    def tick(self) -> None:
+        """Deliver held-back UI lines once the output goes quiet."""
+        self._pump_ui()
+
+    def close(self) -> None:
+        for text, _ in self._splitter.close():
+            self._line(text)
+        if self._unlogged_redraw is not None:
+            self.log(self._unlogged_redraw)     # keep the final progress state
+            self._unlogged_redraw = None
+        self._pump_ui(force=True)
+
+    # ---------------------------------------------------------
+    def _line(self, text: str) -> None:
+        text = text.rstrip()
+        if not text:
+            return
+        line = self.prefix + text
+        self.log(line)
+        self._unlogged_redraw = None
+        if self.on_line:
+            self.on_line(line)
+        self._ui_lines.append(line)
+        self._ui_redraw = None
+
+    def _redraw(self, text: str) -> None:
+        text = text.strip()
+        if not text:
+            return
+        line = self.prefix + text
+        if self.on_line:
+            self.on_line(line)
+        now = time.monotonic()
+        if now - self._redraw_logged >= REDRAW_LOG_INTERVAL:
+            self._redraw_logged = now
+            self.log(line)
+            self._unlogged_redraw = None
+        else:
+            self._unlogged_redraw = line
+        self._ui_redraw = line
+
+    def _pump_ui(self, force: bool = False) -> None:
+        if not self._ui_lines and self._ui_redraw is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._ui_sent < UI_INTERVAL:
+            return
+        callback = self.ui() if self.ui else None
+        lines = self._ui_lines + ([self._ui_redraw] if self._ui_redraw else [])
+        self._ui_lines = []
+        self._ui_redraw = None
+        self._ui_sent = now
+        if callback:
+            for line in lines:
+                callback(line)
@@ -0,0 +1,279 @@
+# app/core/job/progress.py
+"""
+Progress parsers keyed by integration.
+
+JobRunner picks a parser with parser_for(command) and feeds it every
+output line.  A parser returns a ProgressUpdate when the line carried
+progress information (percentage, throughput, fps, ETA) and None
+otherwise.  New integrations register with @register_parser("key"),
+where the key is the one scheduler.command_tool() reports.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Type
+
+from .scheduler import command_tool
+
+
+@dataclass
+class ProgressUpdate:
+    percent: Optional[float] = None      # 0-100 within the step
+    rate: Optional[float] = None         # bytes / second
+    fps: Optional[float] = None          # frames / second (encodes)
+    eta: Optional[float] = None          # seconds left
+    bytes_done: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+_UNITS = {
+    "": 1, "B": 1,
+    "K": 1000, "KB": 1000, "KIB": 1024,
+    "M": 1000**2, "MB": 1000**2, "MIB": 1024**2,
+    "G": 1000**3, "GB": 1000**3, "GIB": 1024**3,
+    "T": 1000**4, "TB": 1000**4, "TIB": 1024**4,
+}
+
+
+def _to_bytes(value: str, unit: str) -> int:
+    return int(float(value) * _UNITS.get(unit.upper(), 1))
+
+
+def _hms(text: str) -> int:
+    """'1:02:03' / '02:03' → seconds."""
+    seconds = 0
+    for part in text.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+# ============================================================
+class ProgressParser:
+    """
+    Base class.  Subclasses implement parse(); feed() adds an ETA
+    extrapolated from the percentage when the tool doesn't print one.
+    """
+
+    def __init__(self, command: Sequence[Any] = ()) -> None:
+        self.command = [str(tok) for tok in command]
+        self._started: Optional[float] = None
+
+    def parse(self, line: str) -> Optional[ProgressUpdate]:
+        raise NotImplementedError
+
+    def feed(self, line: str) -> Optional[ProgressUpdate]:
+        update = self.parse(line)
+        if update is None:
+            return None
+
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        if update.percent is not None:
+            update.percent = max(0.0, min(100.0, update.percent))
+            elapsed = now - self._started
+            if update.eta is None and elapsed > 0 and 0 < update.percent < 100:
+                update.eta = elapsed * (100 - update.percent) / update.percent
+        return update
+
+
+PARSERS: Dict[str, Type[ProgressParser]] = {}
+
+
+def register_parser(*keys: str) -> Callable[[Type[ProgressParser]], Type[ProgressParser]]:
+    def deco(cls: Type[ProgressParser]) -> Type[ProgressParser]:
+        for key in keys:
+            PARSERS[key] = cls
+        return cls
+    return deco
+
+
+def parser_for(command: Sequence[Any]) -> Optional[ProgressParser]:
+    cls = PARSERS.get(command_tool(command) or "")
+    return cls(command) if cls else None
+
+
+# ============================================================
+@register_parser("makemkv")
+class MakeMKVParser(ProgressParser):
+    """Robot mode: `PRGV:current,total,max` (total = whole operation)."""
+
+    _prgv = re.compile(r"^PRGV:(\d+),(\d+),(\d+)")
+
+    def parse(self, line: str) -> Optional[ProgressUpdate]:
+        m = self._prgv.match(line.strip())
+        if not m:
+            return None
+        _current, total, maximum = (int(g) for g in m.groups())
+        if not maximum:
+            return None
+        return ProgressUpdate(percent=total * 100.0 / maximum)
+
+
+@register_parser("handbrake")
+class HandBrakeParser(ProgressParser):
+    """`Encoding: task 1 of 2, 45.67 % (123.45 fps, avg 120.00 fps, ETA 00h12m34s)`"""
+
+    _enc = re.compile(
+        r"Encoding: task (\d+) of (\d+), ([\d.]+) %"
+        r"(?: \(([\d.]+) fps, avg ([\d.]+) fps, ETA (\d+)h(\d+)m(\d+)s\))?"
+    )
+
+    def parse(self, line: str) -> Optional[ProgressUpdate]:
+        m = self._enc.search(line)
+        if not m:
+            return None
+        task, tasks, pct = int(m.group(1)), int(m.group(2)), float(m.group(3))
+        update = ProgressUpdate(percent=((task - 1) + pct / 100.0) * 100.0 / max(1, tasks))
+        if m.group(4):
+            update.fps = float(m.group(4))
+            h, mi, s = (int(m.group(i)) for i in (6, 7, 8))
+            update.eta = h * 3600 + mi * 60 + s
+            # HandBrake's ETA only covers the current pass
+            if task < tasks and pct < 100:
+                update.eta += (tasks - task) * update.eta * 100.0 / (100 - pct)
+        return update
+
+
+@register_parser("pv")
+class PvParser(ProgressParser):
+    """`1.23GiB 0:00:05 [10.2MiB/s] [===>   ] 12% ETA 0:00:35` (pv -pterb)"""
+
+    _bytes = re.compile(r"^\s*([\d.]+)\s*([KMGT]?i?B)\s+\d+:\d{2}")
+    _rate = re.compile(r"\[\s*([\d.]+)\s*([KMGT]?i?B)/s\s*\]")
+    _pct = re.compile(r"\]\s*(\d+)%")
+    _eta = re.compile(r"ETA\s+(\d+(?::\d+)+)")
+
+    def parse(self, line: str) -> Optional[ProgressUpdate]:
+        rate = self._rate.search(line)
+        pct = self._pct.search(line)
+        if not rate and not pct:
+            return None
+
+        update = ProgressUpdate()
+        if pct:
+            update.percent = float(pct.group(1))
+        if rate:
+            update.rate = _to_bytes(*rate.groups())
+        done = self._bytes.search(line)
+        if done:
+            update.bytes_done = _to_bytes(*done.groups())
+        eta = self._eta.search(line)
+        if eta:
+            update.eta = _hms(eta.group(1))
+        return update
+
+
+class _SizedInputParser(ProgressParser):
+    """Parsers that need the input size to turn byte counts into %."""
+
+    def __init__(self, command: Sequence[Any] = ()) -> None:
+        super().__init__(command)
+        self.total_bytes = self._input_size()
+
+    def _input_size(self) -> Optional[int]:
+        for tok in self.command[1:]:
+            path = tok[3:] if tok.startswith("if=") else tok
+            if path.startswith("-") or not os.path.exists(path):
+                continue
+            try:
+                with open(path, "rb") as fp:       # works for block devices too
+                    return fp.seek(0, os.SEEK_END) or None
+            except OSError:
+                return None
+        return None
+
+    def _percent(self, done: int) -> Optional[float]:
+        return done * 100.0 / self.total_bytes if self.total_bytes else None
+
+
+@register_parser("dd")
+class DdParser(_SizedInputParser):
+    """`123456789 bytes (123 MB, 118 MiB) copied, 5 s, 24.6 MB/s` (status=progress)"""
+
+    _line = re.compile(r"^(\d+) bytes .*copied, ([\d.]+) s, ([\d.]+) ([kKMGT]?B)/s")
+
+    def parse(self, line: str) -> Optional[ProgressUpdate]:
+        m = self._line.search(line.strip())
+        if not m:
+            return None
+        done = int(m.group(1))
+        return ProgressUpdate(
+            percent=self._percent(done),
+            rate=_to_bytes(m.group(3), m.group(4)),
+            bytes_done=done,
+        )
+
+
+@register_parser("zstd")
+class ZstdParser(_SizedInputParser):
+    """
+    zstd --progress:
+      `Read : 1234 MiB ==> 45.67%` (older) or
+      `(L3) Buffered : 12 MiB - Consumed : 1234 MiB - Compressed : 400 MiB => 32.42%`
+    The trailing percentage is the compression ratio, not progress.
+    """
+
+    _consumed = re.compile(r"(?:Consumed|Read)\s*:\s*([\d.]+)\s*([KMGT]?i?B)")
+
+    def __init__(self, command: Sequence[Any] = ()) -> None:
+        super().__init__(command)
+        self._last: Optional[tuple] = None
+
+    def parse(self, line: str) -> Optional[ProgressUpdate]:
+        m = self._consumed.search(line)
+        if not m:
+            return None
+        done = _to_bytes(*m.groups())
+        now = time.monotonic()
+        update = ProgressUpdate(percent=self._percent(done), bytes_done=done)
+        if self._last and now > self._last[0]:
+            update.rate = (done - self._last[1]) / (now - self._last[0])
+        self._last = (now, done)
+        return update
+
+
+@register_parser("abcde")
+class AbcdeParser(ProgressParser):
+    """
+    abcde prints `Grabbing track 03: …` and `Encoding track 3 of 12: …`;
+    grabbing and encoding each count for half of a track.
+    """
+
+    _tracks = re.compile(r"Grabbing entire CD - tracks:\s*([\d ]+)")
+    _grab = re.compile(r"Grabbing track (\d+)")
+    _encode = re.compile(r"Encoding track (\d+) of (\d+)")
+
+    def __init__(self, command: Sequence[Any] = ()) -> None:
+        super().__init__(command)
+        self.total: int = 0
+        self.grabbed: int = 0
+        self.encoded: int = 0
+
+    def parse(self, line: str) -> Optional[ProgressUpdate]:
+        m = self._tracks.search(line)
+        if m:
+            self.total = len(m.group(1).split())
+            return None
+
+        m = self._encode.search(line)
+        if m:
+            # the announced track is in progress, the previous one is done
+            self.encoded = max(self.encoded, int(m.group(1)) - 1)
+            self.total = max(self.total, int(m.group(2)))
+        else:
+            m = self._grab.search(line)
+            if not m:
+                return None
+            self.grabbed = max(self.grabbed, int(m.group(1)) - 1)
+
+        if not self.total:
+            return None
+        return ProgressUpdate(percent=(self.grabbed + self.encoded) * 50.0 / self.total)
+
@@ -0,0 +1,338 @@
+# app/core/job/queue.py
+"""
+Job queue with admission control.
+
+New and resumed jobs wait here instead of starting the moment they are
+created.  Waiting jobs are ordered by priority (the "priority" key of
+the CD / DVD / BLURAY / OTHER section), then round-robin across drives,
+then first come first served, and are admitted – their JobRunner
+started – as far as the "Queue" config section allows:
+
+  maxjobs          – jobs running at once
+  max<class>jobs   – running jobs whose current step is of that resource
+                     class (drive / encode / io, see scheduler.py)
+  encodebacklog    – rips that lead to an encode are deferred while this
+                     many jobs wait for or run an encode
+  maxtempusage     – rips are deferred while the temp filesystem is
+                     fuller than this (percent)
+
+Every job also has to fit its estimated disk footprint beside what
+running jobs have reserved (space.py); one that couldn't fit even on an
+empty filesystem is refused when it is submitted.
+
+A deferred rip keeps its drive: the disc stays loaded and is read as
+soon as the backlog drains.  Waiting jobs are persisted like any other
+job state (Job.queued_time) and re-queued after a restart.
+
+Admission runs on the supervisor loop whenever a job changes, and every
+RECHECK seconds while anything is waiting (disk space frees up without
+an event).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import shutil
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.configmanager import config
+from app.core.drive.manager import drive_tracker
+from .job import Job
+from .runner import JobRunner
+from .scheduler import RESOURCE_CLASSES, RESOURCE_DRIVE, RESOURCE_ENCODE
+from .space import Claim, estimate, space_ledger
+from .store import job_store, temp_root
+from .supervisor import run_quiet, supervisor
+from .tracker import job_tracker
+
+RECHECK = 5.0
+PROBE_TIMEOUT = 30.0                # seconds to identify the disc of a resumed job
+
+# disc type → config section holding its priority
+DISC_SECTIONS = {"cd_audio": "CD", "dvd_video": "DVD", "bluray_video": "BLURAY"}
+
+# why a job is still waiting
+REASON_LIMIT = "limit"
+REASON_BACKLOG = "encode_backlog"
+REASON_DISK = "temp_disk"
+REASON_SPACE = "disk_space"
+
+
+# ------------------------------------------------------------
+def _int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def priority_of(disc_type: str) -> int:
+    return _int(config.get(DISC_SECTIONS.get(disc_type.lower(), "OTHER"), "priority"))
+
+
+def current_resource(job: Job) -> Optional[str]:
+    """Resource class of the step the job is at (None for in-process tasks)."""
+    if 0 <= job.step_index < len(job.steps):
+        return job.steps[job.step_index].get("resource")
+    return None
+
+
+def _needs_encode(job: Job) -> bool:
+    return any(
+        step.get("resource") == RESOURCE_ENCODE and not step.get("completed")
+        for step in job.steps[job.step_index:]
+    )
+
+
+def _temp_usage() -> Optional[float]:
+    """Percent used of the filesystem holding the temp directory."""
+    path = temp_root()
+    while not path.exists() and path != path.parent:
+        path = path.parent                      # not created yet
+    try:
+        usage = shutil.disk_usage(path)
+    except OSError:
+        return None
+    return 100.0 * usage.used / usage.total if usage.total else None
+
+
+def check_disc(job: Job) -> Optional[str]:
+    """Why the disc in job.drive isn't the job's disc, None if it is (blocking)."""
+    from app.core.discdetection.linux import probe_disc
+
+    try:
+        disc = supervisor.call(asyncio.wait_for(probe_disc(job.drive, {}), PROBE_TIMEOUT))
+    except (OSError, asyncio.TimeoutError) as exc:
+        return f"can't read the disc in {job.drive}: {exc or 'timed out'}"
+    if job.disc_size:
+        if disc["disc_size"] != job.disc_size:
+            return f"the disc in {job.drive} ({disc['disc_label']}) is not {job.disc_label}"
+    elif "unknown" not in (job.disc_label, disc["disc_label"]) and disc["disc_label"] != job.disc_label:
+        return f"the disc in {job.drive} is {disc['disc_label']}, not {job.disc_label}"
+    return None
+
+
+def attach_drive(job: Job, drive: Optional[str]) -> Optional[str]:
+    """
+    Give a job whose next step reads the disc its drive back, after
+    checking the same disc is still in it.  Why not, None once attached.
+    """
+    if not drive:
+        return "the drive it ran on is unknown"
+    entry = drive_tracker.get_drive(drive)
+    if entry is None:
+        return f"{drive} is not connected"
+    if entry.job_id != job.job_id and not drive_tracker.assign_job(drive, job.job_id):
+        return f"{drive} is busy"
+    job.drive = drive
+    problem = check_disc(job)
+    if problem:
+        job.drive = None
+        drive_tracker.release_drive(drive)
+    return problem
+
+
+@dataclass
+class QueueEntry:
+    runner: JobRunner
+    seq: int
+    claims: List[Claim] = field(default_factory=list)
+    reason: Optional[Tuple[str, str]] = None    # (REASON_*, text) once deferred
+
+    @property
+    def job(self) -> Job:
+        return self.runner.job
+
+
+# ============================================================
+class JobQueue:
+    def __init__(self) -> None:
+        self._entries: List[QueueEntry] = []
+        self._active: Dict[str, Job] = {}       # admitted, runner not finished (loop thread)
+        self._served: Dict[str, int] = {}       # drive → admission count when last served
+        self._admissions = 0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._kicked = False
+        self._recheck: Optional[asyncio.TimerHandle] = None
+        job_tracker.add_listener(lambda _job_id: self.kick())
+
+    # ── any thread ───────────────────────────────────────────
+    def submit(self, job: Job) -> JobRunner:
+        """Queue *job* (already in the job tracker); returns its runner."""
+        runner = JobRunner(job)
+        try:
+            runner.initialize_steps()           # queued jobs show their steps
+            claims = estimate(job)
+        except Exception as exc:
+            self._refuse(job, f"Fatal exception: {exc}")
+            return runner
+        problem = space_ledger.impossible(claims)
+        if problem:
+            self._refuse(job, f"❌ Not enough disk space: {problem}")
+            return runner
+
+        job.priority = priority_of(job.disc_type)
+        job.queued_time = job.queued_time or time.time()
+        job.job_status = "Queued"
+        job.save_resume_state()
+        with self._lock:
+            self._entries.append(QueueEntry(runner, next(self._seq), claims))
+        job_tracker.notify(job.job_id)          # also kicks the queue
+        return runner
+
+    def _refuse(self, job: Job, message: str) -> None:
+        """Fail *job* before it ever runs and hand its disc back."""
+        job.append_stdout(message)
+        logging.error(f"{message} – job {job.job_id} ({job.disc_label}) refused")
+        job.mark_failed()
+        job_tracker.notify(job.job_id)
+        if job.drive:
+            drive_tracker.release_drive(job.drive)
+            supervisor.submit(run_quiet(["eject", job.drive]))
+
+    def kick(self) -> None:
+        """Re-evaluate admission soon; bursts of calls coalesce."""
+        with self._lock:
+            if self._kicked or not self._entries:
+                return
+            self._kicked = True
+        supervisor.call_soon(self._dispatch)
+
+    def restore(self) -> None:
+        """
+        Re-queue jobs a previous process left waiting (after job_store.recover()).
+        A job that still has to read its disc is only re-queued if that disc
+        is still in the drive; otherwise it fails and can be resumed later.
+        """
+        restored = job_store.queued()
+        requeued = 0
+        for data in restored:
+            job = Job.from_dict(data)
+            job.drive = None                    # attach_drive() checks it first
+            job_tracker.add_job(job)
+            drive = data.get("drive")
+            if current_resource(job) == RESOURCE_DRIVE or job.step_index == 0:
+                if drive and not drive_tracker.get_drive(drive):
+                    drive_tracker.register_drive(drive, model="Unknown", capability=["Unknown"])
+                problem = attach_drive(job, drive)
+                if problem:
+                    # the tray may hold another disc by now: don't rip that instead
+                    job.queued_time = None
+                    self._refuse(job, f"❌ Not re-queued after restart: {problem}")
+                    continue
+            self.submit(job)
+            requeued += 1
+        if requeued:
+            logging.info(f"📋 Re-queued {requeued} waiting job(s)")
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Waiting jobs in admission order."""
+        with self._lock:
+            entries = sorted(self._entries, key=self._order)
+        return [
+            {
+                "job_id": e.job.job_id,
+                "disc_type": e.job.disc_type,
+                "disc_label": e.job.disc_label,
+                "drive": e.job.drive,
+                "priority": e.job.priority,
+                "queued_time": e.job.queued_time,
+                "reason": e.reason[0] if e.reason else None,
+                "detail": e.reason[1] if e.reason else None,
+            }
+            for e in entries
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        """Waiting jobs by reason ("waiting" = not looked at yet)."""
+        with self._lock:
+            return dict(Counter(e.reason[0] if e.reason else "waiting" for e in self._entries))
+
+    # ── supervisor loop ──────────────────────────────────────
+    def _order(self, entry: QueueEntry) -> Tuple[int, int, int]:
+        return (-entry.job.priority, self._served.get(entry.job.drive or "", 0), entry.seq)
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            self._kicked = False
+            for entry in [e for e in self._entries if e.runner.cancelled or e.job.job_status == "Cancelled"]:
+                self._entries.remove(entry)
+                entry.job.queued_time = None
+
+        limits = {cls: _int(config.get("Queue", f"max{cls}jobs")) for cls in RESOURCE_CLASSES}
+        max_jobs = _int(config.get("Queue", "maxjobs"))
+        backlog_limit = _int(config.get("Queue", "encodebacklog"))
+        max_usage = _int(config.get("Queue", "maxtempusage"))
+        usage = _temp_usage() if max_usage else None
+        at = Counter(current_resource(job) for job in self._active.values())
+
+        def blocked(entry: QueueEntry) -> Optional[Tuple[str, str]]:
+            job = entry.job
+            if max_jobs and len(self._active) >= max_jobs:
+                return REASON_LIMIT, f"job limit reached ({len(self._active)} running)"
+            resource = current_resource(job)
+            if limits.get(resource) and at[resource] >= limits[resource]:
+                return REASON_LIMIT, f"{resource} job limit reached ({at[resource]} running)"
+            shortage = space_ledger.shortage(job.job_id, entry.claims)
+            if shortage:
+                return REASON_SPACE, shortage
+            if resource != RESOURCE_DRIVE:
+                return None                     # backpressure only holds back new rips
+            if usage is not None and usage >= max_usage:
+                return REASON_DISK, f"temp disk {usage:.0f}% full"
+            if backlog_limit and at[RESOURCE_ENCODE] >= backlog_limit and _needs_encode(job):
+                return REASON_BACKLOG, f"encode backlog of {at[RESOURCE_ENCODE]} job(s)"
+            return None
+
+        # admit the best admissible entry until none is left: every
+        # admission changes the counts and the drive round-robin
+        while True:
+            with self._lock:
+                entries = sorted(self._entries, key=self._order)
+            for entry in entries:
+                reason = blocked(entry)
+                if reason is None:
+                    self._admit(entry)
+                    at[current_resource(entry.job)] += 1
+                    break
+                self._defer(entry, reason)
+            else:
+                break
+
+        if self._recheck:
+            self._recheck.cancel()
+        self._recheck = supervisor.loop.call_later(RECHECK, self.kick) if entries else None
+
+    def _defer(self, entry: QueueEntry, reason: Tuple[str, str]) -> None:
+        previous, entry.reason = entry.reason, reason
+        if previous is None or previous[0] != reason[0]:     # details (free space …) drift
+            entry.job.append_stdout(f"⏸️ Waiting to start: {reason[1]}")
+            logging.info(f"⏸️ Job {entry.job.job_id} ({entry.job.disc_label}) deferred: {reason[1]}")
+
+    def _admit(self, entry: QueueEntry) -> None:
+        job = entry.job
+        with self._lock:
+            self._entries.remove(entry)
+        self._admissions += 1
+        self._served[job.drive or ""] = self._admissions
+        self._active[job.job_id] = job
+        space_ledger.reserve(job.job_id, entry.claims)
+        job.queued_time = None
+        if entry.reason:
+            job.append_stdout("▶️ Starting")
+        entry.runner.run().add_done_callback(lambda _f: supervisor.call_soon(self._finished, job.job_id))
+
+    def _finished(self, job_id: str) -> None:
+        self._active.pop(job_id, None)
+        space_ledger.release(job_id)
+        self.kick()
+
+
+job_queue = JobQueue()
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import logging
 import os
-import signal
-import subprocess
 import threading
+import time
 from pathlib import Path
-from typing import Callable, List, Tuple, Optional
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
 
+from app.core.configmanager import config
 from app.core.drive.manager import drive_tracker
+from app.core.logstream import log_hub
+from app.core import metrics
+from .accounting import ProcessSampler, StepUsage, ThreadMeter
 from .job import Job
+from .output import CHUNK_SIZE, UI_INTERVAL, BufferedLog, OutputPipeline
+from .progress import ProgressUpdate, parser_for
+from .scheduler import RESOURCE_DRIVE, classify_step, scheduler
+from .storage import discard_scratch
+from .supervisor import ChildProcess, run_quiet, supervisor
+from .task import StepTask
+from .tracker import job_tracker
+
+DEFAULT_IDLE_TIMEOUT = 1800.0       # seconds without output before a command is stopped
 
 
 # ------------------------------------------------------------
@@ -42,7 +57,10 @@ def get_job_steps(job: Job) -> List[Tuple[List[str], str, bool, float]]:
 # ============================================================
 class JobRunner:
     """
-    Runs a job in a background thread.
+    Runs a job as a coroutine on the supervisor loop (see supervisor.py):
+    child processes are awaited there, blocking in-process steps go to
+    the supervisor's worker pool.  cancel() cancels the job's tasks;
+    every running command then gets SIGTERM, SIGKILL if it lingers.
     """
 
     def __init__(
@@ -53,46 +71,92 @@ class JobRunner:
         self.job = job
         self.job.runner = self
         self.on_output = on_output
-        self.process: Optional[subprocess.Popen] = None
+        self.log = BufferedLog(job.temp_path / "log.txt")
+        self.processes: Set[ChildProcess] = set()
+        self._proc_lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()   # cancelled by cancel(); loop thread only
+        self._helpers: Set[asyncio.Task] = set()  # eject & co., held until done
         self._cancelled = False
+        self._resource: Optional[str] = None      # class of the running step
+        self._bytes_seen = 0                      # bytes_done already counted
+        self._usage: Optional[StepUsage] = None   # resources of the running step
+        self._usage_lock = threading.Lock()
 
     # ---------------------------------------------------------
-    def run(self) -> None:
-        threading.Thread(target=self._run, daemon=True).start()
+    def run(self) -> concurrent.futures.Future:
+        """Start the job on the supervisor loop; the future resolves when it ends."""
+        return supervisor.submit(self._tracked(self._run()))
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
 
     def cancel(self) -> None:
+        """Callable from any thread; returns without waiting for the children."""
         self._cancelled = True
-        if self.process:
-            try: os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
-            except Exception: pass
         self.job.mark_cancelled()
+        self._changed()
 
         if self.job.drive:
             drive_tracker.release_drive(self.job.drive)
-            subprocess.run(["eject", self.job.drive], check=False)
+        supervisor.call_soon(self._cancel_tasks)
+
+    def _cancel_tasks(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self.job.drive:
+            eject = supervisor.loop.create_task(run_quiet(["eject", self.job.drive]))
+            self._helpers.add(eject)
+            eject.add_done_callback(self._helper_done)
+
+    def _helper_done(self, task: asyncio.Task) -> None:
+        self._helpers.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None or task.result() != 0:
+            logging.warning(f"⚠️ Ejecting {self.job.drive} after cancelling job {self.job.job_id} failed: "
+                            f"{exc or f'exit code {task.result()}'}")
+
+    async def _tracked(self, coro: Awaitable[Any]) -> Any:
+        """Await *coro* as a task cancel() knows about."""
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            return await coro
+        finally:
+            self._tasks.discard(task)
 
     # ---------------------------------------------------------
-    def _initialize_steps(self) -> None:
+    def initialize_steps(self) -> List[Tuple[Any, str, bool, float]]:
         """
-        Fill job.steps & step_weights if they are empty (fresh job).
+        Fill job.steps & step_weights from the ripper's step template and
+        return the step tuples.  Each step records its resource class,
+        which the job queue admits by.
         """
-        if self.job.steps:
-            return  # already initialised (resume case)
-
         raw = get_job_steps(self.job)
-        self.job.step_weights = [tpl[3] for tpl in raw]  # fourth element
-        for idx, (_, desc, _, _) in enumerate(raw, start=1):
-            self.job.steps.append(
-                {"index": idx, "name": desc, "completed": False}
-            )
+        if len(self.job.steps) != len(raw) or len(self.job.step_weights) != len(raw):
+            # fresh job – or one saved by a version with other steps: the
+            # template's weights (they add up to 1), finished steps kept
+            self.job.step_weights = [tpl[3] for tpl in raw]  # fourth element
+            del self.job.steps[len(raw):]
+            for idx in range(len(self.job.steps), len(raw)):
+                self.job.steps.append(
+                    {"index": idx + 1, "name": raw[idx][1], "completed": False}
+                )
+        for step, tpl in zip(self.job.steps, raw):
+            # ParallelSubsteps hold no slot themselves: count their sub-steps' class
+            resource = classify_step(tpl) or getattr(tpl[0], "sub_resource", None)
+            step.setdefault("resource", resource)
+        return raw
 
     # ---------------------------------------------------------
-    def _run(self) -> None:
+    async def _run(self) -> None:
         try:
             self.job.job_status = "Running"
-            self._initialize_steps()
-
-            steps = get_job_steps(self.job)
+            steps = self.initialize_steps()
+            self.job.save_resume_state(event="Running")
+            self._changed()
 
             # skip already-completed steps (resume case)
             current_idx = self.job.step_index
@@ -103,64 +167,267 @@ class JobRunner:
                 cmd, desc, release_drive, weight = steps[i]
                 self.job.step_progress = 0
                 self.job.steps[i]["name"] = desc  # keep in sync
+                self.job.steps[i]["started"] = time.time()
+
+                # wait for a slot of the step's resource class
+                resource = classify_step(steps[i])
+                if resource and not await self._acquire_slot(resource):
+                    return
+                self._resource, self._bytes_seen = resource, 0
+                self._usage = StepUsage()
+                started = time.monotonic()
+                ok = False
+                try:
+                    if isinstance(cmd, StepTask):
+                        ok = await cmd.run_async(self, i, weight)
+                        self.set_step_progress(100, weight)
+                    else:
+                        ok = await self._run_step(cmd, weight)
+                finally:
+                    if resource:
+                        scheduler.release(resource)
+                    elapsed = time.monotonic() - started
+                    self._usage.wall = elapsed
+                    self.job.steps[i]["usage"] = self._usage.as_dict()
+                    self._observe_step(i, resource, ok, elapsed)
 
-                ok = self._run_step(cmd, weight)
                 if not ok:
                     self.job.mark_failed()
+                    self._changed()
                     return
 
+                if self.job.step_stats:
+                    self.job.steps[i]["stats"] = dict(self.job.step_stats)
+                self.job.steps[i]["finished"] = time.time()
                 self.job.mark_step_done()
                 self.job.save_resume_state()
+                self._changed()
 
                 # early drive release
                 if release_drive and self.job.drive:
-                    subprocess.run(["eject", self.job.drive], check=False)
+                    await run_quiet(["eject", self.job.drive])
                     drive_tracker.release_drive(self.job.drive)
 
             self.job.mark_finished()
+            self._changed()
+            await asyncio.get_running_loop().run_in_executor(None, discard_scratch, self.job)
+
+        except asyncio.CancelledError:
+            pass                            # cancel() has marked the job already
 
         except Exception as exc:
             self.job.append_stdout(f"Fatal exception: {exc}")
             self.job.mark_failed()
+            self._changed()
+
+        finally:
+            self.log.close()
+            log_hub.finish(self.job.job_id)
+
+    # ---------------------------------------------------------
+    async def _acquire_slot(self, resource: str) -> bool:
+        """
+        Park the job as "Queued" while it waits for a scheduler slot.
+        Returns False if the job was cancelled in the meantime.
+        """
+        stats = scheduler.stats()[resource]
+        if stats["active"] >= stats["capacity"]:
+            self.job.job_status = "Queued"
+            self.job.append_stdout(f"Waiting for a free {resource} slot …")
+            self._changed()
+
+        ok = await scheduler.acquire_async(resource, cancelled=lambda: self._cancelled)
+        if ok and self.job.job_status != "Running":
+            self.job.job_status = "Running"
+            self._changed()
+        return ok
+
+    def _observe_step(self, index: int, resource: Optional[str], ok: bool, seconds: float) -> None:
+        kind = resource or "task"
+        disc_type = self.job.disc_type
+        outcome = "ok" if ok else "cancelled" if self._cancelled else "failed"
+        metrics.steps_total.inc(disc_type=disc_type, kind=kind, outcome=outcome)
+
+        # progress reports are throttled: count what the final stats add
+        done = self.job.step_stats.get("bytes_done") or 0
+        if resource == RESOURCE_DRIVE and done > self._bytes_seen:
+            metrics.drive_read_bytes.inc(done - self._bytes_seen, drive=self.job.drive)
+        self._resource = None
+        if not ok:
+            return
+
+        metrics.step_seconds.observe(seconds, disc_type=disc_type, kind=kind)
+        compression = self.job.steps[index].get("compression")
+        if compression:
+            metrics.compression_ratio.observe(compression["ratio"], algorithm=compression["algorithm"])
+
+    def _changed(self) -> None:
+        """Tell the dashboard that this job's row changed."""
+        job_tracker.notify(self.job.job_id)
+
+    # ---------------------------------------------------------
+    async def _run_step(self, command: List[str], weight: float) -> bool:
+        parser = parser_for(command)
+
+        def on_line(line: str) -> None:
+            update = parser.feed(line) if parser else None
+            if update is not None:
+                self.apply_progress(update, weight)
+            elif parser is None:
+                # no parser for this tool: bounce to keep UI alive
+                self.job.step_progress = min(99, self.job.step_progress + 1)
+                self._recalc_job_progress(weight)
+
+        ok = await self.run_command_async(command, on_line)
+        self.job.step_progress = 100
+        self._recalc_job_progress(weight)
+        return ok
 
     # ---------------------------------------------------------
-    def _run_step(self, command: List[str], weight: float) -> bool:
-        log_path = self.job.temp_path / "log.txt"
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+    async def run_in_worker(self, fn: Callable[..., bool], *args: Any) -> bool:
+        """
+        Run a blocking step body in the supervisor's worker pool, accounted
+        to the current step.  A cancelled job still waits for it to return
+        (bodies check runner.cancelled) so nothing outlives the job.
+        """
+        def body() -> bool:
+            meter = ThreadMeter().start()
+            try:
+                return fn(*args)
+            finally:
+                with self._usage_lock:
+                    if self._usage is not None:
+                        meter.stop(self._usage)
+
+        future = asyncio.get_running_loop().run_in_executor(None, body)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await asyncio.wait([future])
+            raise
 
+    def run_command(
+        self,
+        command: List[str],
+        on_line: Optional[Callable[[str], None]] = None,
+        prefix: str = "",
+    ) -> bool:
+        """Blocking run_command_async() for code outside the supervisor loop."""
+        if self._cancelled:
+            return False
         try:
-            with open(log_path, "a") as lf:
-                self.process = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    preexec_fn=os.setsid,  # own process-group
-                )
+            return supervisor.call(self._tracked(self.run_command_async(command, on_line, prefix)))
+        except concurrent.futures.CancelledError:
+            return False
 
-                for line in self.process.stdout:
-                    if self._cancelled:
-                        return False
-                    line = line.rstrip()
-                    self.job.append_stdout(line)
-                    lf.write(line + "\n")
-                    lf.flush()
-                    if self.on_output:
-                        self.on_output(line)
-
-                    # naive in-step progress (bounces to keep UI alive)
-                    self.job.step_progress = min(99, self.job.step_progress + 1)
-                    self._recalc_job_progress(weight)
-
-                self.process.wait()
-                self.job.step_progress = 100
-                self._recalc_job_progress(weight)
-                return self.process.returncode == 0
+    async def run_command_async(
+        self,
+        command: List[str],
+        on_line: Optional[Callable[[str], None]] = None,
+        prefix: str = "",
+        idle_timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Run one child process in its own process group, streaming its
+        output to log.txt, the job log and on_output.  A command silent
+        for *idle_timeout* seconds (Advanced.commandidletimeout) is
+        stopped and fails.  Cancelling the awaiting task stops the child
+        the same way: SIGTERM, then SIGKILL after a grace period.
+        """
+        if self._cancelled:
+            return False
+        if idle_timeout is None:
+            idle_timeout = float(config.get("Advanced", "commandidletimeout") or DEFAULT_IDLE_TIMEOUT)
+
+        pipeline = OutputPipeline(self._log, on_line, lambda: self._emit, prefix)
+        try:
+            child = ChildProcess(command)
+        except OSError as exc:
+            self.job.append_stdout(f"Exception in subprocess: {exc}")
+            return False
+        with self._proc_lock:
+            self.processes.add(child)
+
+        loop = asyncio.get_running_loop()
+        sampler = ProcessSampler(child.pid)
+        usage = StepUsage()
+        last_output = loop.time()
+        timed_out = False
+
+        def on_chunk(chunk: bytes) -> None:
+            nonlocal last_output
+            last_output = loop.time()
+            pipeline.feed(chunk)
+
+        async def tick() -> None:
+            nonlocal timed_out
+            while True:
+                await asyncio.sleep(UI_INTERVAL)
+                pipeline.tick()
+                self.log.tick()
+                sampler.sample()
+                if idle_timeout > 0 and not timed_out and loop.time() - last_output > idle_timeout:
+                    timed_out = True
+                    self._log(f"⏱️ No output for {idle_timeout:g}s – stopping {os.path.basename(command[0])}")
+                    await child.terminate()
+
+        ticker = loop.create_task(tick())
+        try:
+            await child.pump(on_chunk, CHUNK_SIZE)
+            pipeline.close()
+            code = await child.wait(usage, sampler)
+            return code == 0 and not timed_out
+
+        except asyncio.CancelledError:
+            await child.terminate()
+            await child.wait(usage, sampler)
+            raise
 
         except Exception as exc:
             self.job.append_stdout(f"Exception in subprocess: {exc}")
+            await child.terminate()
+            await child.wait(usage, sampler)
             return False
 
+        finally:
+            ticker.cancel()
+            self.log.flush()
+            child.close()
+            with self._proc_lock:
+                self.processes.discard(child)
+            with self._usage_lock:
+                if self._usage is not None:
+                    self._usage.add(usage)
+
+    def _log(self, line: str) -> None:
+        self.job.append_stdout(line)
+        self.log.write(line)
+
+    def _emit(self, line: str) -> None:
+        """Line → live viewers (already rate-limited by OutputPipeline)."""
+        log_hub.publish(self.job.job_id, line)
+        if self.on_output:
+            self.on_output(line)
+
+    def log_line(self, line: str) -> None:
+        """Log output of in-process steps like child-process output."""
+        self._log(line)
+        self._emit(line)
+
+    def set_step_progress(self, progress: int, weight: float) -> None:
+        self.job.step_progress = progress
+        self._recalc_job_progress(weight)
+
+    def apply_progress(self, update: ProgressUpdate, weight: float) -> None:
+        """Publish a parsed ProgressUpdate as the current step's progress."""
+        self.job.step_stats = update.as_dict()
+        if update.bytes_done is not None and self._resource == RESOURCE_DRIVE:
+            if update.bytes_done > self._bytes_seen:
+                metrics.drive_read_bytes.inc(update.bytes_done - self._bytes_seen, drive=self.job.drive)
+            self._bytes_seen = update.bytes_done
+        if update.percent is not None:
+            self.set_step_progress(min(99, int(update.percent)), weight)
+
     # ---------------------------------------------------------
     def _recalc_job_progress(self, current_weight: float) -> None:
         """
@@ -172,4 +439,7 @@ class JobRunner:
         )
 
         step_fraction = (self.job.step_progress / 100.0) * current_weight
-        self.job.job_progress = int((done_fraction + step_fraction) * 100)
+        progress = int((done_fraction + step_fraction) * 100)
+        if progress != self.job.job_progress:
+            self.job.job_progress = progress
+            self._changed()
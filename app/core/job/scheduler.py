@@ -0,0 +1,214 @@
+# app/core/job/scheduler.py
+"""
+Resource-class scheduler.
+
+Every step tuple returned by get_job_steps() is classified into one of
+three resource classes and has to hold a slot of that class while it runs:
+
+  drive   – optical reads (MakeMKV, ISO dump, abcde)
+  encode  – CPU-bound transcodes (HandBrake)
+  io      – disk-bound compression / copies (zstd, bzip2, cp)
+
+Drive slots scale with the number of tracked drives, so a loaded drive can
+always start reading.  Encode and io slots are bounded (see the
+"Scheduler" config section) and queue up instead of fighting for cores.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shlex
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.configmanager import config
+from app.core.drive.manager import drive_tracker
+
+RESOURCE_DRIVE = "drive"
+RESOURCE_ENCODE = "encode"
+RESOURCE_IO = "io"
+RESOURCE_CLASSES = (RESOURCE_DRIVE, RESOURCE_ENCODE, RESOURCE_IO)
+
+# executable name → integration key
+KNOWN_TOOLS = {
+    "makemkvcon": "makemkv",
+    "HandBrakeCLI": "handbrake",
+    "abcde": "abcde",
+    "pv": "pv",
+    "dd": "dd",
+    "zstd": "zstd",
+    "bzip2": "bzip2",
+    "lbzip2": "bzip2",
+    "pbzip2": "bzip2",
+    "cp": "cp",
+}
+
+ENCODE_TOOLS = {"handbrake"}
+DRIVE_TOOLS = {"makemkv", "abcde", "pv", "dd"}
+
+
+# ------------------------------------------------------------
+def command_tool(command: Sequence[Any]) -> Optional[str]:
+    """
+    Return the integration key of the first known tool in *command*.
+
+    Understands `flatpak run --command=X …` and `sh -c "a | b"` wrappers,
+    so the ISO pipeline resolves to "pv" and the HandBrake flatpak call
+    to "handbrake".
+    """
+    for token in command:
+        token = str(token)
+        try:
+            words = shlex.split(token) if any(c.isspace() for c in token) else [token]
+        except ValueError:
+            words = token.split()
+
+        for word in words:
+            if word.startswith("--command="):
+                word = word.split("=", 1)[1]
+            name = os.path.basename(word)
+            if name in KNOWN_TOOLS:
+                return KNOWN_TOOLS[name]
+    return None
+
+
+def classify_step(step: Sequence[Any]) -> Optional[str]:
+    """
+    Map a step tuple (command, description, release_drive[, weight]) to its
+    resource class.  Steps that release the drive afterwards are the ones
+    reading from it.  In-process StepTasks declare their own class (None
+    if they schedule their sub-steps themselves).
+    """
+    command, release_drive = step[0], step[2]
+    if hasattr(command, "resource"):
+        return command.resource
+    tool = command_tool(command)
+
+    if release_drive or tool in DRIVE_TOOLS:
+        return RESOURCE_DRIVE
+    if tool in ENCODE_TOOLS:
+        return RESOURCE_ENCODE
+    return RESOURCE_IO
+
+
+# ============================================================
+class ResourceScheduler:
+    """
+    Counting slots per resource class.  Capacities are re-evaluated on
+    every admission so config changes and hot-plugged drives apply
+    without a restart.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._active: Dict[str, int] = {cls: 0 for cls in RESOURCE_CLASSES}
+        self._waiting: Dict[str, int] = {cls: 0 for cls in RESOURCE_CLASSES}
+        # coroutines in acquire_async(), woken by release()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    # ---------------------------------------------------------
+    def capacity(self, resource: str) -> int:
+        cores = os.cpu_count() or 1
+
+        if resource == RESOURCE_DRIVE:
+            return max(1, len(drive_tracker.get_all_drives()))
+
+        cfg = config.section("Scheduler")
+        if resource == RESOURCE_ENCODE:
+            configured = cfg.get("encodeconcurrency")
+            auto = max(1, cores // 8)
+        else:
+            configured = cfg.get("ioconcurrency")
+            auto = max(1, min(4, cores // 4))
+
+        try:
+            configured = int(configured or 0)
+        except (TypeError, ValueError):
+            configured = 0
+        return configured if configured > 0 else auto
+
+    def thread_budget(self, resource: str) -> int:
+        """CPU threads a single slot of *resource* may use."""
+        return max(1, (os.cpu_count() or 1) // self.capacity(resource))
+
+    # ---------------------------------------------------------
+    def acquire(
+        self,
+        resource: str,
+        cancelled: Callable[[], bool] = lambda: False,
+        poll: float = 1.0,
+    ) -> bool:
+        """
+        Block until a slot of *resource* is free.
+        Returns False (without holding a slot) if *cancelled* turns true
+        while waiting.
+        """
+        with self._cond:
+            self._waiting[resource] += 1
+            try:
+                while self._active[resource] >= self.capacity(resource):
+                    if cancelled():
+                        return False
+                    self._cond.wait(timeout=poll)
+            finally:
+                self._waiting[resource] -= 1
+            self._active[resource] += 1
+            return True
+
+    async def acquire_async(
+        self,
+        resource: str,
+        cancelled: Callable[[], bool] = lambda: False,
+        poll: float = 1.0,
+    ) -> bool:
+        """acquire() for coroutines: waits without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            self._waiting[resource] += 1
+        try:
+            while True:
+                with self._cond:
+                    if self._active[resource] < self.capacity(resource):
+                        self._active[resource] += 1
+                        return True
+                    if cancelled():
+                        return False
+                    waiter = loop.create_future()
+                    self._async_waiters.append((loop, waiter))
+                try:
+                    await asyncio.wait_for(waiter, poll)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                self._waiting[resource] -= 1
+
+    def release(self, resource: str) -> None:
+        with self._cond:
+            self._active[resource] = max(0, self._active[resource] - 1)
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            if not waiter.done():
+                loop.call_soon_threadsafe(_wake, waiter)
+
+    # ---------------------------------------------------------
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._cond:
+            return {
+                cls: {
+                    "active": self._active[cls],
+                    "waiting": self._waiting[cls],
+                    "capacity": self.capacity(cls),
+                }
+                for cls in RESOURCE_CLASSES
+            }
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+scheduler = ResourceScheduler()
@@ -0,0 +1,193 @@
+# app/core/job/space.py
+"""
+Disk-space estimates and reservations for jobs.
+
+A job's footprint is estimated per volume from the disc size (measured
+by disc detection, Job.disc_size) and what its steps write:
+
+  dvd_video / bluray_video  MKVs of about the disc's size on the drive
+                            tier, plus the HandBrake output
+                            (<section>.encodepercent of the disc)
+  *_rom                     the image on the drive tier unless it is
+                            streamed, plus an at most disc-sized image
+  cd_audio                  nothing – abcde picks its own directories
+
+Final artifacts count on their staging tier and on the output volume,
+unless both are the same filesystem (promotion is a rename there).
+
+Admitted jobs hold their claims until they end.  A claim only counts
+what the job hasn't written yet (estimate minus what is already on disk
+under its path), so free space isn't promised twice.  The job queue
+admits a job when its claims fit beside everyone else's, keeping
+Queue.freespacemargin free, and refuses one that couldn't fit even on
+an empty filesystem.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.core.configmanager import config
+from app.core.diskspace import disk_usage, existing, free_bytes, total_bytes, volume_id
+from .job import Job
+from .scheduler import RESOURCE_DRIVE, RESOURCE_ENCODE, RESOURCE_IO
+from .storage import GiB, disc_size, scratch_dir, staging_dir
+
+ENCODE_SECTIONS = {"dvd_video": "DVD", "bluray_video": "BLURAY"}
+DEFAULT_ENCODE_PERCENT = 50
+DEFAULT_MARGIN = 2 * GiB
+WRITTEN_TTL = 2.0                   # seconds a measured claim stays valid
+
+
+def _int(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _gib(n: int) -> str:
+    return f"{n / GiB:.1f} GiB"
+
+
+@dataclass(frozen=True)
+class Claim:
+    """*size* bytes that will be written under *root* (files starting with *prefix*)."""
+    root: Path
+    size: int
+    prefix: Optional[str] = None
+
+    def written(self) -> int:
+        if self.prefix is None:
+            return disk_usage(self.root)
+        try:
+            return sum(disk_usage(p) for p in self.root.glob(self.prefix + "*"))
+        except OSError:
+            return 0
+
+
+# ------------------------------------------------------------
+def _promoted(stage: Path, final: Claim) -> List[Claim]:
+    """Claims of an artifact staged in *stage*, then moved to *final*."""
+    try:
+        if volume_id(stage) == volume_id(final.root):
+            return [final]                      # renamed, never there twice
+    except OSError:
+        pass
+    return [Claim(stage, final.size), final]
+
+
+def estimate(job: Job) -> List[Claim]:
+    """What *job* will write, in total, per location."""
+    dtype = job.disc_type.lower()
+    size = disc_size(job)
+    claims: List[Claim] = []
+
+    if dtype in ENCODE_SECTIONS:
+        cfg = config.section(ENCODE_SECTIONS[dtype])
+        claims.append(Claim(scratch_dir(job, RESOURCE_DRIVE), size))
+        if cfg.get("usehandbrake", True):
+            percent = _int(cfg.get("encodepercent"), DEFAULT_ENCODE_PERCENT)
+            output = Claim(job.output_path, size * percent // 100)
+            claims += _promoted(staging_dir(job, RESOURCE_ENCODE), output)
+
+    elif dtype in ("cd_rom", "dvd_rom", "bluray_rom"):
+        cfg = config.section("OTHER")
+        output = Claim(job.output_path.parent, size, prefix=job.output_path.name + ".")
+        # same conditions as rip_generic_disc()
+        streaming = cfg.get("streaming", True) is not False and not cfg.get("rescue")
+        compressed = cfg.get("usecompression", True) and (cfg.get("compression") or "zstd").lower() in ("zstd", "bz2")
+        if streaming:
+            claims += _promoted(staging_dir(job, RESOURCE_DRIVE), output)
+        elif compressed:
+            claims.append(Claim(scratch_dir(job, RESOURCE_DRIVE), size))
+            claims += _promoted(staging_dir(job, RESOURCE_IO), output)
+        else:
+            claims += _promoted(scratch_dir(job, RESOURCE_DRIVE), output)   # the image itself moves
+
+    return claims
+
+
+def margin() -> int:
+    return _int(config.get("Queue", "freespacemargin"), DEFAULT_MARGIN // GiB) * GiB
+
+
+# ============================================================
+class SpaceLedger:
+    """Claims of admitted jobs, by job id."""
+
+    def __init__(self) -> None:
+        self._claims: Dict[str, List[Claim]] = {}
+        self._written: Dict[Claim, Tuple[float, int]] = {}   # claim → (measured at, bytes)
+        self._lock = threading.Lock()
+
+    def reserve(self, job_id: str, claims: List[Claim]) -> None:
+        with self._lock:
+            self._claims[job_id] = list(claims)
+
+    def release(self, job_id: str) -> None:
+        with self._lock:
+            for claim in self._claims.pop(job_id, []):
+                self._written.pop(claim, None)
+
+    # ---------------------------------------------------------
+    def _outstanding(self, claim: Claim, cache: bool) -> int:
+        """Bytes of *claim* not written yet (measured at most every WRITTEN_TTL if cached)."""
+        if not cache:
+            return max(0, claim.size - claim.written())
+        now = time.monotonic()
+        cached = self._written.get(claim)
+        if cached is None or now - cached[0] > WRITTEN_TTL:
+            cached = self._written[claim] = (now, claim.written())
+        return max(0, claim.size - cached[1])
+
+    def _by_volume(self, claims: List[Claim], cache: bool = False) -> Dict[int, Tuple[Path, int]]:
+        volumes: Dict[int, Tuple[Path, int]] = {}
+        for claim in claims:
+            try:
+                dev = volume_id(claim.root)
+            except OSError:
+                continue
+            path, need = volumes.get(dev, (existing(claim.root), 0))
+            volumes[dev] = (path, need + self._outstanding(claim, cache))
+        return volumes
+
+    def held(self, exclude: Optional[str] = None) -> Dict[int, int]:
+        """Bytes still claimed per volume by admitted jobs."""
+        with self._lock:
+            claims = [c for job_id, cs in self._claims.items() if job_id != exclude for c in cs]
+            return {dev: need for dev, (_, need) in self._by_volume(claims, cache=True).items()}
+
+    def shortage(self, job_id: str, claims: List[Claim]) -> Optional[str]:
+        """Why *claims* don't fit right now, None if they do."""
+        held = self.held(exclude=job_id)
+        keep = margin()
+        needs = self._by_volume(claims)
+        for dev, (path, need) in needs.items():
+            try:
+                available = free_bytes(path) - held.get(dev, 0) - keep
+            except OSError:
+                continue
+            if need > available:
+                return f"needs {_gib(need)} on {path}, {_gib(max(0, available))} available"
+        return None
+
+    def impossible(self, claims: List[Claim]) -> Optional[str]:
+        """Why *claims* could never fit, None if an empty filesystem would do."""
+        keep = margin()
+        needs = self._by_volume(claims)
+        for dev, (path, need) in needs.items():
+            try:
+                size = total_bytes(path)
+            except OSError:
+                continue
+            if need + keep > size:
+                return f"needs {_gib(need)} on {path}, which holds only {_gib(size)}"
+        return None
+
+
+space_ledger = SpaceLedger()
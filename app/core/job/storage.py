@@ -0,0 +1,96 @@
+# app/core/job/storage.py
+"""
+Scratch storage tiers.
+
+Up to three scratch directories, from fastest to biggest ("Storage"
+config section):
+
+  tmpfs – RAM
+  fast  – NVMe / SSD
+  bulk  – HDD; General.tempdirectory unless set
+
+Steps write their intermediate files to the tier configured for their
+resource class (Storage.drivetier / encodetier / iotier).  A tier that
+isn't set up, or hasn't room for the disc, falls back to the next
+bigger one.  The choice is kept in Job.scratch, so a resumed job finds
+its files again even if the config changed meanwhile.
+
+Final artifacts are written to a staging directory on the tier as well
+and promoted to the output directory by the mover (mover.py).
+"""
+
+from __future__ import annotations
+
+import logging
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from app.core.configmanager import config
+from app.core.diskspace import free_bytes
+from .job import Job
+from .store import temp_root
+
+TIERS = ("tmpfs", "fast", "bulk")
+
+GiB = 1024**3
+MiB = 1024**2
+
+# worst case per medium when detection couldn't measure the disc
+DEFAULT_DISC_SIZES = {"cd": 900 * MiB, "dvd": int(8.5 * GiB), "bluray": 50 * GiB}
+
+
+def disc_size(job: Job) -> int:
+    return job.disc_size or DEFAULT_DISC_SIZES.get(job.disc_type.split("_")[0], 50 * GiB)
+
+
+def tier_root(tier: str) -> Optional[Path]:
+    configured = config.get("Storage", f"{tier}directory")
+    if configured:
+        return Path(configured).expanduser()
+    return temp_root() if tier == "bulk" else None
+
+
+# ------------------------------------------------------------
+def scratch_dir(job: Job, resource: Optional[str]) -> Path:
+    """Where steps of *resource* put the job's intermediate files."""
+    key = resource or "task"
+    if key not in job.scratch:
+        if any(step.get("completed") for step in job.steps):
+            return job.temp_path                # started before scratch tiers existed
+        job.scratch[key] = str(_place(job, resource))
+    return Path(job.scratch[key])
+
+
+def staging_dir(job: Job, resource: Optional[str]) -> Path:
+    """Where steps of *resource* put final artifacts until they are promoted."""
+    return scratch_dir(job, resource) / "output"
+
+
+def _place(job: Job, resource: Optional[str]) -> Path:
+    wanted = config.get("Storage", f"{resource}tier") if resource else None
+    tiers = TIERS[TIERS.index(wanted):] if wanted in TIERS else ("bulk",)
+    need = disc_size(job)
+
+    for tier in tiers:
+        root = tier_root(tier)
+        if root is None:
+            continue
+        if tier != "bulk":
+            try:
+                if free_bytes(root) < need:
+                    logging.info(f"💾 {tier} scratch has no room for {job.disc_label}; trying the next tier")
+                    continue
+            except OSError as exc:
+                logging.warning(f"⚠️ {tier} scratch {root} unusable: {exc}")
+                continue
+        # the bulk tier in the temp directory is the job's own temp dir
+        return job.temp_path if root == temp_root() else root / job.job_id
+    return job.temp_path
+
+
+def discard_scratch(job: Job) -> None:
+    """Remove scratch directories on other tiers once the job is done (blocking)."""
+    for path in {Path(p) for p in job.scratch.values()}:
+        if path != job.temp_path and path.name == job.job_id:
+            shutil.rmtree(path, ignore_errors=True)
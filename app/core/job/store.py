@@ -0,0 +1,423 @@
+# app/core/job/store.py
+"""
+Durable job state: jobs, their steps (with timings) and a status history
+in one SQLite database (WAL mode).
+
+Callers never wait on the disk: save() takes a snapshot of the job and
+hands it to a writer thread, which coalesces snapshots per job and
+commits them in one transaction every FLUSH_INTERVAL seconds.  Reads use
+a per-thread connection and see the last committed state.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from app.core.configmanager import config
+
+if TYPE_CHECKING:
+    from .job import Job
+
+FLUSH_INTERVAL = 0.5
+RETRY_DELAY = 5.0                   # seconds before a failed batch is written again
+
+# statuses a job can be in while its runner is alive
+LIVE_STATUSES = ("Queued", "Running")
+# … and the ones it can be resumed from
+RESUMABLE_STATUSES = ("Failed", "Cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      TEXT PRIMARY KEY,
+    disc_type   TEXT NOT NULL,
+    disc_label  TEXT NOT NULL,
+    drive       TEXT,
+    temp_path   TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    progress    INTEGER NOT NULL DEFAULT 0,
+    step_index  INTEGER NOT NULL DEFAULT 0,
+    start_time  REAL,
+    finish_time REAL,
+    updated     REAL NOT NULL,
+    data        TEXT NOT NULL               -- Job.to_dict(persist=True)
+);
+CREATE INDEX IF NOT EXISTS jobs_status    ON jobs(status);
+CREATE INDEX IF NOT EXISTS jobs_drive     ON jobs(drive);
+CREATE INDEX IF NOT EXISTS jobs_disc_type ON jobs(disc_type);
+CREATE INDEX IF NOT EXISTS jobs_start     ON jobs(start_time);
+
+CREATE TABLE IF NOT EXISTS steps (
+    job_id      TEXT NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+    idx         INTEGER NOT NULL,
+    name        TEXT,
+    weight      REAL,
+    completed   INTEGER NOT NULL DEFAULT 0,
+    started     REAL,
+    finished    REAL,
+    stats       TEXT,
+    usage       TEXT,                       -- accounting.StepUsage
+    PRIMARY KEY (job_id, idx)
+);
+
+CREATE TABLE IF NOT EXISTS history (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id      TEXT NOT NULL,
+    time        REAL NOT NULL,
+    status      TEXT NOT NULL,
+    detail      TEXT
+);
+CREATE INDEX IF NOT EXISTS history_job ON history(job_id);
+"""
+
+
+def _db_path() -> Path:
+    configured = config.get("General", "jobdatabase")
+    return Path(configured or "~/TKAutoRipper/jobs.db").expanduser()
+
+
+def temp_root() -> Path:
+    return Path(config.get("General", "tempdirectory") or "~/TKAutoRipper/temp").expanduser()
+
+
+def _partial_dump(data: Dict[str, Any]) -> bool:
+    """An interrupted image dump (rescue map or image) the first step can continue."""
+    scratch = Path((data.get("scratch") or {}).get("drive") or data["temp_path"])
+    try:
+        return any(True for _ in scratch.glob("*.iso.map")) or any(True for _ in scratch.glob("*.iso"))
+    except OSError:
+        return False
+
+
+def is_resumable(data: Dict[str, Any]) -> bool:
+    """Stopped, and past the first step (the drive-bound one) or partway into a dump."""
+    steps = data.get("steps") or []
+    if data.get("job_status") not in RESUMABLE_STATUSES or not steps:
+        return False
+    return bool(steps[0].get("completed")) or _partial_dump(data)
+
+
+# ============================================================
+class ResumableIndex:
+    """
+    job_id → persisted data of every resumable job, kept current by
+    JobStore.save() instead of being rebuilt per request.
+
+    Jobs whose temp directory was deleted can't be resumed; rather than
+    stat'ing every entry per read, entries are re-checked only when the
+    temp root's mtime changes (a job dir was added or removed).
+    """
+
+    def __init__(self) -> None:
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self._root_mtime: Optional[int] = None
+
+    def load(self, rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries = {d["job_id"]: d for d in rows if is_resumable(d)}
+            self._root_mtime = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._entries is not None
+
+    def update(self, data: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._entries is None:
+                return                          # loaded lazily from the database
+            if is_resumable(data):
+                self._entries[data["job_id"]] = data
+            else:
+                self._entries.pop(data["job_id"], None)
+
+    def list(self, root: Path) -> List[Dict[str, Any]]:
+        try:
+            mtime = root.stat().st_mtime_ns
+        except OSError:
+            mtime = -1
+        with self._lock:
+            if mtime != self._root_mtime:
+                self._root_mtime = mtime
+                for job_id, data in list(self._entries.items()):
+                    if not Path(data["temp_path"]).is_dir():
+                        del self._entries[job_id]
+            return sorted(self._entries.values(), key=lambda d: d.get("start_time") or 0, reverse=True)
+
+
+# ============================================================
+class JobStore:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._events: List[tuple] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flushed = threading.Condition(self._lock)
+        self._queued = 0                    # sequence number of the last queued write
+        self._written = 0                   # … and of the last committed one
+        self._local = threading.local()
+        self._writer: Optional[threading.Thread] = None
+        self._schema_ready = False
+        self._resumable = ResumableIndex()
+
+    # ── connections ──────────────────────────────────────────
+    def _connect(self) -> sqlite3.Connection:
+        if self.path is None:
+            self.path = _db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        if not self._schema_ready:
+            conn.executescript(_SCHEMA)
+            columns = {r[1] for r in conn.execute("PRAGMA table_info(steps)")}
+            if "usage" not in columns:          # databases from before step accounting
+                try:
+                    conn.execute("ALTER TABLE steps ADD COLUMN usage TEXT")
+                except sqlite3.OperationalError:
+                    pass                        # another thread got there first
+            self._schema_ready = True
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="job-store", daemon=True)
+            self._writer.start()
+
+    # ── writes (non-blocking) ────────────────────────────────
+    def save(self, job: "Job", event: Optional[str] = None) -> None:
+        """Queue a snapshot of *job*; *event* adds a history row."""
+        snapshot = job.to_dict(persist=True)
+        self._resumable.update(snapshot)
+        snapshot = dict(snapshot, drive=job.drive)     # indexed column, not part of the resume data
+        with self._lock:
+            self._pending[job.job_id] = snapshot
+            if event:
+                self._events.append((job.job_id, time.time(), event, None))
+            self._queued += 1
+            self._ensure_writer()
+        self._wake.set()
+
+    def record(self, job_id: str, status: str, detail: Optional[str] = None) -> None:
+        with self._lock:
+            self._events.append((job_id, time.time(), status, detail))
+            self._queued += 1
+            self._ensure_writer()
+        self._wake.set()
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Block until everything queued so far is committed."""
+        with self._lock:
+            target = self._queued
+            if self._written >= target:
+                return
+            self._ensure_writer()
+            self._wake.set()
+            self._flushed.wait_for(lambda: self._written >= target, timeout)
+
+    # ---------------------------------------------------------
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        while True:
+            self._wake.wait()
+            time.sleep(FLUSH_INTERVAL)          # let snapshots of busy jobs coalesce
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                events, self._events = self._events, []
+                batch = self._queued
+            try:
+                with conn:
+                    for snapshot in pending.values():
+                        self._write_job(conn, dict(snapshot))
+                    conn.executemany(
+                        "INSERT INTO history (job_id, time, status, detail) VALUES (?, ?, ?, ?)", events
+                    )
+            except sqlite3.Error as exc:
+                logging.error(f"❌ Job store write failed, retrying in {RETRY_DELAY:g}s: {exc}")
+                with self._lock:
+                    # newer snapshots queued meanwhile win over the failed ones
+                    self._pending = {**pending, **self._pending}
+                    self._events = events + self._events
+                time.sleep(RETRY_DELAY)
+                self._wake.set()
+                continue
+            with self._lock:
+                self._written = batch
+                self._flushed.notify_all()
+
+    @staticmethod
+    def _write_job(conn: sqlite3.Connection, data: Dict[str, Any]) -> None:
+        drive = data.pop("drive", None)
+        conn.execute(
+            """
+            INSERT INTO jobs (job_id, disc_type, disc_label, drive, temp_path, output_path, status,
+                              progress, step_index, start_time, finish_time, updated, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(job_id) DO UPDATE SET
+                drive=COALESCE(excluded.drive, jobs.drive), status=excluded.status,
+                progress=excluded.progress, step_index=excluded.step_index,
+                output_path=excluded.output_path, finish_time=excluded.finish_time,
+                updated=excluded.updated, data=excluded.data
+            """,
+            (
+                data["job_id"], data["disc_type"], data["disc_label"], drive,
+                data["temp_path"], data["output_path"], data["job_status"],
+                data["job_progress"], data["step_index"], data["start_time"],
+                data["finish_time"], time.time(), json.dumps(data),
+            ),
+        )
+        weights = data.get("step_weights") or []
+        conn.executemany(
+            """
+            INSERT INTO steps (job_id, idx, name, weight, completed, started, finished, stats, usage)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(job_id, idx) DO UPDATE SET
+                name=excluded.name, completed=excluded.completed, started=excluded.started,
+                finished=excluded.finished, stats=excluded.stats, usage=excluded.usage
+            """,
+            [
+                (
+                    data["job_id"], i, step.get("name"),
+                    weights[i] if i < len(weights) else None,
+                    int(bool(step.get("completed"))), step.get("started"), step.get("finished"),
+                    json.dumps(step["stats"]) if step.get("stats") else None,
+                    json.dumps(step["usage"]) if step.get("usage") else None,
+                )
+                for i, step in enumerate(data.get("steps") or [])
+            ],
+        )
+
+    # ── reads ────────────────────────────────────────────────
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Persisted Job.to_dict() data (feed to Job.from_dict)."""
+        row = self._reader().execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def drive_of(self, job_id: str) -> Optional[str]:
+        """Drive the job last ran on (kept out of the resume data, see save())."""
+        row = self._reader().execute("SELECT drive FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row["drive"] if row else None
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        drive: Optional[str] = None,
+        disc_type: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Job summaries, newest first."""
+        where, args = [], []
+        for column, value in (("status", status), ("drive", drive), ("disc_type", disc_type)):
+            if value:
+                where.append(f"{column} = ?")
+                args.append(value)
+        sql = (
+            "SELECT job_id, disc_type, disc_label, drive, output_path, status, progress, "
+            "step_index, start_time, finish_time FROM jobs"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + " ORDER BY start_time DESC LIMIT ? OFFSET ?"
+        )
+        rows = self._reader().execute(sql, (*args, limit, offset)).fetchall()
+        return [dict(r) for r in rows]
+
+    def steps(self, job_id: str) -> List[Dict[str, Any]]:
+        rows = self._reader().execute(
+            "SELECT idx, name, weight, completed, started, finished, stats, usage FROM steps "
+            "WHERE job_id = ? ORDER BY idx", (job_id,),
+        ).fetchall()
+        result = []
+        for r in rows:
+            step = dict(r)
+            step["completed"] = bool(step["completed"])
+            step["stats"] = json.loads(step["stats"]) if step["stats"] else None
+            step["usage"] = json.loads(step["usage"]) if step["usage"] else None
+            if step["started"] and step["finished"]:
+                step["seconds"] = round(step["finished"] - step["started"], 2)
+            result.append(step)
+        return result
+
+    def history(self, job_id: str) -> List[Dict[str, Any]]:
+        rows = self._reader().execute(
+            "SELECT time, status, detail FROM history WHERE job_id = ? ORDER BY id", (job_id,)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def by_status(self, *statuses: str) -> List[Dict[str, Any]]:
+        marks = ",".join("?" * len(statuses))
+        rows = self._reader().execute(
+            f"SELECT data FROM jobs WHERE status IN ({marks}) ORDER BY start_time DESC", statuses
+        ).fetchall()
+        return [json.loads(r["data"]) for r in rows]
+
+    def queued(self) -> List[Dict[str, Any]]:
+        """Jobs waiting in the job queue, oldest first, with their drive."""
+        rows = self._reader().execute(
+            "SELECT data, drive FROM jobs WHERE status = 'Queued' ORDER BY start_time"
+        ).fetchall()
+        result = [dict(json.loads(r["data"]), drive=r["drive"]) for r in rows]
+        return [d for d in result if d.get("queued_time")]
+
+    def resumable(self) -> List[Dict[str, Any]]:
+        """Resumable jobs, newest first, from the in-memory index."""
+        if not self._resumable.loaded:
+            self.flush()                        # don't miss snapshots still in the queue
+            self._resumable.load(self.by_status(*RESUMABLE_STATUSES))
+        return self._resumable.list(temp_root())
+
+    # ── startup ──────────────────────────────────────────────
+    def recover(self, root: Optional[Path] = None) -> None:
+        """
+        Called once at startup: jobs a previous process left Queued/Running
+        died with it and become Failed (so they can be resumed), and
+        legacy .resume.json files are imported.  Jobs still waiting in the
+        job queue stay Queued; JobQueue.restore() picks them up.
+        """
+        from .job import Job
+
+        conn = self._reader()
+        with conn:
+            stale = [r["job_id"] for r in conn.execute(
+                f"SELECT job_id FROM jobs WHERE status IN ({','.join('?' * len(LIVE_STATUSES))})",
+                LIVE_STATUSES,
+            )]
+            for job_id in stale:
+                data = self.get(job_id)
+                if data["job_status"] == "Queued" and data.get("queued_time"):
+                    continue                    # never admitted: nothing was lost
+                data["job_status"] = "Failed"
+                conn.execute("UPDATE jobs SET status = 'Failed', data = ? WHERE job_id = ?",
+                             (json.dumps(data), job_id))
+                conn.execute("INSERT INTO history (job_id, time, status, detail) VALUES (?, ?, 'Failed', ?)",
+                             (job_id, time.time(), "interrupted by restart"))
+
+        known = {r["job_id"] for r in conn.execute("SELECT job_id FROM jobs")}
+        for resume_file in Path(root or temp_root()).glob("*/.resume.json"):
+            try:
+                job = Job.from_resume_file(resume_file)
+            except (OSError, ValueError, TypeError, KeyError):
+                continue
+            if job.job_id not in known:
+                if job.job_status in LIVE_STATUSES:
+                    job.job_status = "Failed"
+                self.save(job, event="imported")
+        self.flush()
+
+
+job_store = JobStore()
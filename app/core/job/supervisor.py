@@ -0,0 +1,187 @@
+# app/core/job/supervisor.py
+"""
+One asyncio loop for all jobs.
+
+Every JobRunner is a coroutine on the supervisor loop, and so is every
+child process it starts: output is read with add_reader() on the
+non-blocking pipe and exit is noticed through a pidfd, then the child is
+reaped with wait4() so its rusage still reaches the step accounting
+(asyncio's own subprocess support reaps children itself, from a watcher
+thread per child).  Dozens of concurrent steps cost no threads at all.
+
+In-process step bodies (StepTask.run) are blocking Python; they run in
+a small worker pool, bounded by the scheduler slots they hold.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import signal
+import subprocess
+import threading
+from typing import Any, Awaitable, Callable, List, Optional
+
+from .accounting import ProcessSampler, StepUsage, reap
+
+KILL_GRACE = 10.0                   # SIGTERM → SIGKILL after this many seconds
+
+
+# ============================================================
+class ChildProcess:
+    """A child in its own session whose output and exit are awaited on the loop."""
+
+    def __init__(self, command: List[str], capture: bool = True) -> None:
+        self.command = command
+        self.popen = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+            stderr=subprocess.STDOUT if capture else subprocess.DEVNULL,
+            bufsize=0,
+            start_new_session=True,         # own process group, still vfork-able
+        )
+        self.pid = self.popen.pid
+        self.returncode: Optional[int] = None
+        if capture:
+            os.set_blocking(self.popen.stdout.fileno(), False)
+
+    # ---------------------------------------------------------
+    async def pump(self, on_chunk: Callable[[bytes], None], chunk_size: int) -> None:
+        """Feed stdout to on_chunk (on the loop thread) until EOF."""
+        loop = asyncio.get_running_loop()
+        fd = self.popen.stdout.fileno()
+        eof = loop.create_future()
+
+        def readable() -> None:
+            try:
+                chunk = os.read(fd, chunk_size)
+            except BlockingIOError:
+                return
+            except OSError as exc:
+                chunk = b""
+                logging.debug(f"Reading output of {self.pid} failed: {exc}")
+            if not chunk:
+                loop.remove_reader(fd)
+                if not eof.done():
+                    eof.set_result(None)
+                return
+            try:
+                on_chunk(chunk)
+            except Exception as exc:
+                loop.remove_reader(fd)
+                if not eof.done():
+                    eof.set_exception(exc)
+
+        loop.add_reader(fd, readable)
+        try:
+            await eof
+        finally:
+            loop.remove_reader(fd)
+
+    async def wait(self, usage: Optional[StepUsage] = None, sampler: Optional[ProcessSampler] = None) -> int:
+        """Exit code once the child ends; its resource usage is added to *usage*."""
+        if self.returncode is not None:
+            return self.returncode
+        await _exited(self.pid)
+        # exited, so wait4() in reap() returns at once
+        self.returncode = self.popen.returncode = reap(self.pid, usage or StepUsage(), sampler)
+        return self.returncode
+
+    def signal(self, sig: int) -> None:
+        if self.returncode is not None:
+            return
+        try:
+            os.killpg(self.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    async def terminate(self, grace: Optional[float] = None) -> None:
+        """SIGTERM to the process group; SIGKILL if it's still there after *grace*."""
+        if self.returncode is not None:
+            return
+        self.signal(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(asyncio.shield(_exited(self.pid)), KILL_GRACE if grace is None else grace)
+        except asyncio.TimeoutError:
+            logging.warning(f"⚠️ {os.path.basename(self.command[0])} ignored SIGTERM; killing it")
+            self.signal(signal.SIGKILL)
+
+    def close(self) -> None:
+        if self.popen.stdout:
+            self.popen.stdout.close()
+
+
+async def _exited(pid: int) -> None:
+    """Resolves once *pid* has exited (without reaping it)."""
+    loop = asyncio.get_running_loop()
+    try:
+        pidfd = os.pidfd_open(pid)
+    except ProcessLookupError:
+        return                              # already reaped
+    except (AttributeError, OSError):
+        # no pidfd (old kernel): wait without reaping in a worker thread
+        try:
+            await loop.run_in_executor(None, os.waitid, os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+        except ChildProcessError:
+            pass
+        return
+    done = loop.create_future()
+    loop.add_reader(pidfd, lambda: done.done() or done.set_result(None))
+    try:
+        await done
+    finally:
+        loop.remove_reader(pidfd)
+        os.close(pidfd)
+
+
+async def run_quiet(command: List[str]) -> int:
+    """Run a short helper command (eject …) without capturing output."""
+    try:
+        child = ChildProcess(command, capture=False)
+    except OSError as exc:
+        logging.warning(f"⚠️ {command[0]} failed: {exc}")
+        return -1
+    return await child.wait()
+
+
+# ============================================================
+class Supervisor:
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.pool = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="job-task")
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop.set_default_executor(self.pool)
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="job-supervisor", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def on_loop(self) -> bool:
+        return self._thread is threading.current_thread()
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """Schedule *coro* on the loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, coro: Awaitable[Any]) -> Any:
+        """Run *coro* on the loop and wait for it (not from the loop itself)."""
+        if self.on_loop():
+            raise RuntimeError("Supervisor.call() would block the supervisor loop")
+        return self.submit(coro).result()
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> None:
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+supervisor = Supervisor()
@@ -0,0 +1,167 @@
+# app/core/job/task.py
+"""
+In-process step bodies.
+
+A ripper normally returns an argv list as the command of a step tuple.
+It may instead return a StepTask; JobRunner then awaits task.run_async()
+on the supervisor loop.  By default that runs the blocking task.run() in
+the supervisor's worker pool; tasks that only orchestrate child
+processes override run_async() and need no thread at all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from .progress import parser_for
+from .scheduler import scheduler
+
+if TYPE_CHECKING:
+    from .runner import JobRunner
+
+
+class StepTask:
+    """
+    Base class for in-process steps.
+
+    resource – scheduler class JobRunner acquires around run();
+               None means the task schedules its own work.
+    """
+
+    resource: Optional[str] = None
+
+    def run(self, runner: "JobRunner", index: int, weight: float) -> bool:
+        raise NotImplementedError
+
+    async def run_async(self, runner: "JobRunner", index: int, weight: float) -> bool:
+        return await runner.run_in_worker(self.run, runner, index, weight)
+
+
+# ============================================================
+@dataclass
+class SubStep:
+    key: str                # stable id, used to skip finished work on resume
+    command: List[str]
+    description: str
+    weight: float           # relative share of the parent step
+
+
+class ParallelSubsteps(StepTask):
+    """
+    Fans a step out into independent sub-commands (e.g. one HandBrake
+    encode per MKV title).
+
+    *expand* is called when the step starts, so it can look at files the
+    previous step produced.  Each sub-step takes its own slot of
+    *sub_resource*, which bounds concurrency across all jobs.  Failed
+    sub-steps are retried *retries* times; per-sub-step state lives in
+    job.steps[index]["titles"] so a resumed job only redoes what failed.
+    """
+
+    def __init__(
+        self,
+        expand: Callable[[], List[SubStep]],
+        sub_resource: str,
+        retries: int = 1,
+    ) -> None:
+        self.expand = expand
+        self.sub_resource = sub_resource
+        self.retries = max(0, retries)
+
+    # ---------------------------------------------------------
+    async def run_async(self, runner: "JobRunner", index: int, weight: float) -> bool:
+        job = runner.job
+        subs = self.expand()
+        if not subs:
+            job.append_stdout("Nothing to process.")
+            return False
+
+        previous = {t["key"]: t for t in job.steps[index].get("titles", [])}
+        titles: List[Dict[str, Any]] = []
+        for sub in subs:
+            old = previous.get(sub.key, {})
+            done = old.get("status") == "done"
+            titles.append({
+                "key": sub.key,
+                "name": sub.description,
+                "weight": sub.weight,
+                "progress": 100 if done else 0,
+                "status": "done" if done else "pending",
+                "attempts": old.get("attempts", 0),
+            })
+        job.steps[index]["titles"] = titles
+
+        pending = [
+            (sub, title) for sub, title in zip(subs, titles)
+            if title["status"] != "done"
+        ]
+        # longest titles first → shortest overall wall time
+        pending.sort(key=lambda pair: pair[0].weight, reverse=True)
+
+        def update_progress() -> None:
+            running = [t["stats"] for t in titles if t["status"] == "running" and t.get("stats")]
+            fps = [s["fps"] for s in running if "fps" in s]
+            job.step_stats = {"fps": round(sum(fps), 2)} if fps else {}
+            runner.set_step_progress(
+                min(99, int(sum(t["progress"] * t["weight"] for t in titles))), weight
+            )
+
+        async def work(sub: SubStep, title: Dict[str, Any]) -> bool:
+            for _ in range(self.retries + 1):
+                if runner.cancelled:
+                    return False
+                title["status"] = "queued"
+                if not await scheduler.acquire_async(self.sub_resource, cancelled=lambda: runner.cancelled):
+                    return False
+                try:
+                    title["status"] = "running"
+                    title["attempts"] += 1
+                    title["progress"] = 0
+                    ok = await runner.run_command_async(
+                        sub.command, self._title_progress(sub, title, update_progress),
+                        prefix=f"[{sub.key}] ",
+                    )
+                finally:
+                    scheduler.release(self.sub_resource)
+
+                title.pop("stats", None)
+                if ok:
+                    title["status"] = "done"
+                    title["progress"] = 100
+                    update_progress()
+                    return True
+                job.append_stdout(f"[{sub.key}] failed (attempt {title['attempts']})")
+
+            title["status"] = "failed"
+            return False
+
+        # all sub-steps wait on the scheduler; its slots bound the concurrency
+        results = await asyncio.gather(*(work(sub, title) for sub, title in pending))
+        return all(results) and not runner.cancelled
+
+    # ---------------------------------------------------------
+    @staticmethod
+    def _title_progress(
+        sub: SubStep,
+        title: Dict[str, Any],
+        update_progress: Callable[[], None],
+    ) -> Callable[[str], None]:
+        """Line callback feeding one attempt's output to a fresh parser."""
+        parser = parser_for(sub.command)
+
+        def on_line(line: str) -> None:
+            update = parser.feed(line) if parser else None
+            if update is not None:
+                title["stats"] = update.as_dict()
+                if update.percent is not None:
+                    title["progress"] = min(99, int(update.percent))
+            elif parser is None:
+                # naive in-step progress, like JobRunner._run_step
+                title["progress"] = min(99, title["progress"] + 1)
+            else:
+                return
+            update_progress()
+
+        return on_line
@@ -1,24 +1,40 @@
 # app/core/job/tracker.py
 #
-# Adds add_job() so back-end can register a Job that was loaded
-# from a .resume.json file.
+# Live jobs of this process.  Durable state and history live in the
+# job store (store.py); add_job() registers a Job loaded from there.
 
+import logging
 import threading
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
 from .job import Job
+from .store import job_store
 
 
 class JobTracker:
     def __init__(self):
         self.jobs: Dict[str, Job] = {}
         self.lock = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+
+    # ------------------------------------------------------
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """callback(job_id) runs after a job's status or progress changed."""
+        self._listeners.append(callback)
+
+    def notify(self, job_id: str) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(job_id)
+            except Exception as exc:
+                logging.warning(f"JobTracker listener failed: {exc}")
 
     # ------------------------------------------------------
     def add_job(self, job: Job) -> None:
         """Register an existing Job object (used for resume)."""
         with self.lock:
             self.jobs[job.job_id] = job
+        self.notify(job.job_id)
 
     # ------------------------------------------------------
     def create_job(
@@ -28,7 +44,7 @@ class JobTracker:
         disc_label: str,
         temp_dir: Path,
         output_dir: Path,
-        steps_total: int,
+        disc_size: Optional[int] = None,
     ) -> Job:
         import uuid, time
         job_id = str(uuid.uuid4())
@@ -37,12 +53,14 @@ class JobTracker:
             disc_type=disc_type,
             disc_label=disc_label,
             drive=drive,
+            disc_size=disc_size,
             temp_path=temp_dir / job_id,
             output_path=output_dir,
             output_path_lock=False,
             start_time=time.time(),
         )
         self.add_job(job)
+        job_store.save(job, event="Queued")
         return job
 
     # ------------------------------------------------------
@@ -52,10 +70,13 @@ class JobTracker:
     def cancel_job(self, job_id: str) -> bool:
         with self.lock:
             job = self.jobs.get(job_id)
-            if job:
+            if not job:
+                return False
+            if job.job_status != "Cancelled":
                 job.job_status = "Cancelled"
-                return True
-            return False
+                job_store.save(job, event="Cancelled")
+        self.notify(job_id)
+        return True
 
     def list_jobs(self) -> List[Job]:
         return list(self.jobs.values())
@@ -0,0 +1,144 @@
+# app/core/logstream.py
+"""
+Per-job log broadcasting.
+
+Runners publish output lines from their worker threads; any number of
+WebSocket clients subscribe from the event loop.  Each job keeps a ring
+buffer of recent lines, so a client that connects mid-job first gets
+that history.  Every subscriber has its own bounded queue: a client that
+falls behind loses its oldest lines (it is told how many) instead of
+growing memory or slowing the runner down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Set, Tuple
+
+if TYPE_CHECKING:
+    from app.core.job.job import Job
+
+REPLAY_LINES = 200
+QUEUE_LINES = 500
+DONE_STATUSES = ("Finished", "Failed", "Cancelled")
+
+
+# ============================================================
+class Subscription:
+    def __init__(self, job: "Job", loop: asyncio.AbstractEventLoop, replay: List[str]) -> None:
+        self.job = job
+        self.loop = loop
+        self.lines: Deque[str] = deque(replay[-QUEUE_LINES:])
+        self.dropped = 0
+        self.finished = False               # the job ended; nothing more will be pushed
+        self._event = asyncio.Event()
+        self._signalled = False
+        self._lock = threading.Lock()
+        if self.lines:
+            self._event.set()
+
+    # called from runner threads
+    def push(self, line: str) -> None:
+        with self._lock:
+            if len(self.lines) >= QUEUE_LINES:
+                self.lines.popleft()
+                self.dropped += 1
+            self.lines.append(line)
+            if self._signalled:
+                return                      # a wake-up is already on its way
+            self._signalled = True
+        try:
+            self.loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass                            # loop closed: client is gone
+
+    def end(self) -> None:
+        self.finished = True
+        try:
+            self.loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass
+
+    async def next(self, timeout: float) -> Tuple[List[str], int]:
+        """Queued lines and the number dropped since the last call ([] on timeout)."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
+        with self._lock:
+            lines, self.lines = list(self.lines), deque()
+            dropped, self.dropped = self.dropped, 0
+            self._signalled = False
+        return lines, dropped
+
+
+class _JobStream:
+    def __init__(self) -> None:
+        self.ring: Deque[str] = deque(maxlen=REPLAY_LINES)
+        self.subscribers: Set[Subscription] = set()
+        self.finished = False
+
+
+# ============================================================
+class LogHub:
+    def __init__(self) -> None:
+        self._streams: Dict[str, _JobStream] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, job_id: str, line: str) -> None:
+        with self._lock:
+            stream = self._streams.get(job_id)
+            if stream is None:
+                stream = self._streams[job_id] = _JobStream()
+            stream.ring.append(line)
+            subscribers = list(stream.subscribers)
+        for sub in subscribers:
+            sub.push(line)
+
+    def subscribe(self, job: "Job", loop: asyncio.AbstractEventLoop) -> Subscription:
+        with self._lock:
+            stream = self._streams.get(job.job_id)
+            if stream is None:
+                # nothing published by this process yet (e.g. a resumed job)
+                stream = self._streams[job.job_id] = _JobStream()
+                stream.ring.extend(job.stdout_log)
+                stream.finished = job.job_status in DONE_STATUSES
+            sub = Subscription(job, loop, list(stream.ring))
+            sub.finished = stream.finished
+            stream.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            stream = self._streams.get(sub.job.job_id)
+            if stream is None:
+                return
+            stream.subscribers.discard(sub)
+            if stream.finished and not stream.subscribers:
+                del self._streams[sub.job.job_id]
+
+    def finish(self, job_id: str) -> None:
+        """Job ended: tell subscribers, drop the stream once the last one leaves."""
+        with self._lock:
+            stream = self._streams.get(job_id)
+            if stream is None:
+                return
+            stream.finished = True
+            subscribers = list(stream.subscribers)
+            if not subscribers:
+                del self._streams[job_id]
+        for sub in subscribers:
+            sub.end()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "streams": len(self._streams),
+                "subscribers": sum(len(s.subscribers) for s in self._streams.values()),
+            }
+
+
+log_hub = LogHub()
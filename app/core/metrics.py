@@ -0,0 +1,204 @@
+# app/core/metrics.py
+"""
+Minimal Prometheus-style metrics.
+
+A tiny registry of counters, gauges and histograms rendered in the text
+exposition format (served at /metrics, see app.api.metrics).  Updating a
+metric is a dict lookup and an add under a per-metric lock, so the hot
+paths stay instrumented permanently.  State that already lives elsewhere
+(trackers, scheduler, subscriber counts) isn't mirrored: collectors
+registered with on_collect() copy it into gauges at scrape time only.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# seconds: 5 ms … 10 s (requests); 1 s … 4 h (steps)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400)
+RATIO_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+# ============================================================
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: LabelKey, extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def clear(self) -> None:
+        """Forget all label sets (collectors rebuild dynamic ones per scrape)."""
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{self._labels(key)} {_number(value)}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._hist: Dict[LabelKey, list] = {}       # key → [bucket counts…, sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._hist.get(key)
+            if row is None:
+                row = self._hist[key] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                row[i] += 1                         # cumulated when rendered
+            row[-2] += value
+            row[-1] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hist.clear()
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(key, list(row)) for key, row in self._hist.items()]
+        for key, row in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                le = 'le="%s"' % _number(bound)
+                yield f"{self.name}_bucket{self._labels(key, le)} {cumulative}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{self._labels(key, le)} {row[-1]}"
+            yield f"{self.name}_sum{self._labels(key)} {_number(row[-2])}"
+            yield f"{self.name}_count{self._labels(key)} {row[-1]}"
+
+
+# ============================================================
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        """callback() runs before every scrape to refresh derived gauges."""
+        self._collectors.append(callback)
+
+    def render(self) -> str:
+        with self._lock:                            # one scrape at a time
+            for callback in self._collectors:
+                try:
+                    callback()
+                except Exception as exc:
+                    logging.warning(f"Metrics collector failed: {exc}")
+            lines: List[str] = []
+            for metric in self._metrics.values():
+                lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# ── instruments updated on the hot paths ────────────────────
+http_request_seconds = registry.histogram(
+    "tkautoripper_http_request_duration_seconds",
+    "API request latency by route template",
+    ("method", "route", "status"),
+)
+step_seconds = registry.histogram(
+    "tkautoripper_step_duration_seconds",
+    "Wall time of finished job steps",
+    ("disc_type", "kind"),
+    DURATION_BUCKETS,
+)
+steps_total = registry.counter(
+    "tkautoripper_steps_total",
+    "Finished job steps by outcome",
+    ("disc_type", "kind", "outcome"),
+)
+drive_read_bytes = registry.counter(
+    "tkautoripper_drive_read_bytes_total",
+    "Bytes read from optical drives",
+    ("drive",),
+)
+compression_ratio = registry.histogram(
+    "tkautoripper_compression_ratio",
+    "Compressed / original size of finished compression steps",
+    ("algorithm",),
+    RATIO_BUCKETS,
+)
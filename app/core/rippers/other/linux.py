@@ -1,43 +1,393 @@
 # app/core/rippers/other/linux.py
+import hashlib
+import time
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from app.core.compression import make_compressor, pick_zstd_level
 from app.core.configmanager import config
-from app.core.integration.dd.linux import build_iso_dump_cmd
-from app.core.integration.zstd.linux import build_zstd_cmd
+from app.core.diskspace import preallocate, trim
+from app.core.integration.dd.reader import BLOCK_SIZE, BlockDeviceReader, ReadStats, SparseWriter
+from app.core.integration.dd.rescue import RescueImager
 from app.core.job.job import Job
+from app.core.job.mover import PromoteTask
+from app.core.job.progress import ProgressUpdate
+from app.core.job.scheduler import RESOURCE_DRIVE, RESOURCE_IO, scheduler
+from app.core.job.storage import scratch_dir, staging_dir
+from app.core.job.task import StepTask
 
+# compression → file suffix
+_SUFFIXES = {"zstd": ".iso.zst", "bz2": ".iso.bz2"}
 
-def rip_generic_disc(job: Job) -> List[Tuple[List[str], str, bool]]:
+# assumed drive read rate when no earlier step measured one (~8x BD)
+DEFAULT_READ_RATE = 36 * 1024**2
+
+
+def rip_generic_disc(job: Job) -> List[Tuple[Any, str, bool, float]]:
     """
     ISO dump (drive needed) then optional compression.
+
+    With OTHER.streaming the device is read straight into the compressor
+    and only the final artifact is written – no intermediate .iso.
+    OTHER.rescue always dumps first: the dump keeps a bad-sector map and
+    resumes mid-step.  Artifacts are written to scratch storage and moved
+    to the output directory by a last step (storage.py, mover.py).
     """
     cfg = config.section("OTHER")
     use_comp = cfg.get("usecompression", True)
-    comp_alg = cfg.get("compression", "zstd").lower()
+    comp_alg = (cfg.get("compression") or "zstd").lower()
+    streaming = cfg.get("streaming", True) is not False and not cfg.get("rescue")
+    if not use_comp or comp_alg not in _SUFFIXES:
+        comp_alg = "none"
+
+    job.output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if streaming:
+        return _stream_steps(job, comp_alg, cfg)
 
-    iso_path = job.temp_path / f"{job.disc_label}.iso"
-    steps: List[Tuple[List[str], str, bool]] = [
-        (build_iso_dump_cmd(job.drive, iso_path), "Creating ISO image", True)
+    scratch = scratch_dir(job, RESOURCE_DRIVE)
+    scratch.mkdir(parents=True, exist_ok=True)
+    iso_path = scratch / f"{job.disc_label}.iso"
+    steps: List[Tuple[Any, str, bool, float]] = [
+        (ImageReadTask(job.drive, iso_path, cfg, job.output_path.with_suffix(".iso.map")),
+         "Creating ISO image", True, 0.50)
     ]
 
-    if use_comp and comp_alg == "zstd":
+    if comp_alg != "none":
+        output = job.output_path.with_suffix(_SUFFIXES[comp_alg])
+        staged = staging_dir(job, RESOURCE_IO)
+        staged.mkdir(parents=True, exist_ok=True)
         steps.append(
-            (build_zstd_cmd(iso_path, job.output_path.with_suffix(".iso.zst")),
-             "Compressing ISO (zstd)",
-             False)
+            (CompressTask(iso_path, staged / output.name, comp_alg, cfg),
+             f"Compressing ISO ({comp_alg})",
+             False,
+             0.48)
         )
-    elif use_comp and comp_alg == "bz2":
         steps.append(
-            (["bzip2", str(iso_path)],
-             "Compressing ISO (bzip2)",
-             False)
+            (PromoteTask(staged / output.name, output),
+             "Moving image to final destination",
+             False,
+             0.02)
         )
     else:
         steps.append(
-            (["cp", str(iso_path), str(job.output_path.with_suffix('.iso'))],
-             "Copying ISO to final destination",
-             False)
+            (PromoteTask(iso_path, job.output_path.with_suffix(".iso")),
+             "Moving ISO to final destination",
+             False,
+             0.50)
         )
 
     return steps
+
+
+def _stream_steps(job: Job, comp_alg: str, cfg: Dict[str, Any]) -> List[Tuple[Any, str, bool, float]]:
+    staged = staging_dir(job, RESOURCE_DRIVE)
+    staged.mkdir(parents=True, exist_ok=True)
+    name = job.output_path.with_suffix(".iso").name
+    output = staged / job.output_path.with_suffix(_SUFFIXES.get(comp_alg, ".iso")).name
+    # checksum describes the raw image, so `sha256sum -c` works after unpacking
+    checksum = staged / job.output_path.with_suffix(".iso.sha256").name if cfg.get("checksum", True) is not False else None
+    task = StreamImageTask(job.drive, output, comp_alg, cfg, checksum, name)
+    label = f"Streaming ISO image ({comp_alg})" if comp_alg != "none" else "Streaming ISO image"
+    return [
+        (task, label, True, 0.98),
+        (PromoteTask(staged, job.output_path.parent), "Moving image to final destination", False, 0.02),
+    ]
+
+
+# ── OTHER options ────────────────────────────────────────────
+def _level(cfg: Dict[str, Any]) -> Optional[int]:
+    """None means "auto"."""
+    raw = cfg.get("compressionlevel")
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def _long_window(cfg: Dict[str, Any]) -> int:
+    try:
+        return int(cfg.get("compressionlongwindow") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _int(raw: Any, default: int) -> int:
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return default
+
+
+def _threads(cfg: Dict[str, Any]) -> int:
+    configured = _int(cfg.get("compressionthreads"), 0)
+    return configured if configured > 0 else scheduler.thread_budget(RESOURCE_IO)
+
+
+# ── progress ─────────────────────────────────────────────────
+def _reporter(runner, total: int, weight: float) -> Callable[[int], None]:
+    """Throttled bytes → job progress; raises InterruptedError once cancelled."""
+    started = time.monotonic()
+    last = [0.0]
+
+    def report(done: int) -> None:
+        if runner.cancelled:
+            raise InterruptedError("cancelled")
+        now = time.monotonic()
+        if now - last[0] < 0.5:
+            return
+        last[0] = now
+        runner.apply_progress(ProgressUpdate(
+            percent=done * 100.0 / (total or 1),
+            rate=done / max(now - started, 1e-6),
+            bytes_done=done,
+        ), weight)
+
+    return report
+
+
+def _log_read(runner, stats: ReadStats) -> None:
+    runner.job.step_stats = {"rate": stats.throughput, "bytes_done": stats.bytes_read}
+    runner.log_line(
+        f"Read {stats.bytes_read} bytes from {stats.device} at {stats.throughput / 1024**2:.1f} MiB/s"
+        f"{' (O_DIRECT)' if stats.direct else ''}"
+        f"{f', {stats.bytes_sparse / 1024**2:.0f} MiB left sparse' if stats.bytes_sparse else ''}"
+    )
+
+
+# ============================================================
+class ImageReadTask(StepTask):
+    """
+    Dump the disc to an ISO (holds the drive).
+
+    The dump is driven by a ddrescue-style map kept next to the image, so
+    a resumed job continues mid-disc and scratched areas are retried
+    (OTHER.rescueretries) instead of failing the job.  If sectors stay
+    unreadable the map is copied to *report_map* for inspection.
+    """
+
+    resource = RESOURCE_DRIVE
+
+    def __init__(self, device: str, output: Path, cfg: Dict[str, Any], report_map: Optional[Path] = None) -> None:
+        self.device = device
+        self.output = output
+        self.cfg = cfg
+        self.report_map = report_map
+
+    def run(self, runner, index: int, weight: float) -> bool:
+        report = None
+
+        def on_progress(done: int, total: int, bad: int) -> None:
+            nonlocal report
+            if report is None:
+                report = _reporter(runner, total, weight)
+            report(done)
+
+        imager = RescueImager(
+            self.device,
+            self.output,
+            self.output.with_name(self.output.name + ".map"),
+            retries=_int(self.cfg.get("rescueretries"), 2),
+            direct=bool(self.cfg.get("directio")),
+            sparse=self.cfg.get("sparse", True) is not False,
+            on_progress=on_progress,
+        )
+        try:
+            stats = imager.run()
+        except (OSError, InterruptedError) as exc:
+            runner.log_line(f"Reading {self.device} failed: {exc}")
+            return False
+        finally:
+            if imager.resumed:
+                runner.log_line(f"Resumed dump from {imager.mapfile.name}")
+
+        summary = imager.summary()
+        runner.job.steps[index]["read"] = {**stats.as_dict(), **summary}
+        _log_read(runner, stats)
+        if summary["bad"]:
+            runner.log_line(
+                f"⚠️ {summary['bad'] // 2048} unreadable sector(s) in {summary['bad_areas']} area(s) "
+                f"left zero-filled"
+            )
+            if self.report_map:
+                self.report_map.write_bytes(imager.mapfile.read_bytes())
+        return True
+
+
+class _TappedReader:
+    """Feeds a compressor from the device while hashing and reporting progress."""
+
+    def __init__(self, reader: BlockDeviceReader, digest, report: Callable[[int], None]) -> None:
+        self.reader = reader
+        self.digest = digest
+        self.report = report
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.reader.read(size)
+        if self.digest is not None:
+            self.digest.update(data)
+        self.bytes_read += len(data)
+        self.report(self.bytes_read)
+        return data
+
+
+class StreamImageTask(StepTask):
+    """
+    Read the disc once and write only the final artifact: compressed
+    in-process (OTHER.compression) or a sparse raw ISO.  Writes to
+    <output>.part and renames on success.
+    """
+
+    resource = RESOURCE_DRIVE
+
+    def __init__(
+        self,
+        device: str,
+        output: Path,
+        algorithm: str,
+        cfg: Dict[str, Any],
+        checksum_path: Optional[Path] = None,
+        checksum_name: Optional[str] = None,
+    ) -> None:
+        self.device = device
+        self.output = output
+        self.algorithm = algorithm
+        self.cfg = cfg
+        self.checksum_path = checksum_path
+        self.checksum_name = checksum_name or output.name
+
+    # ---------------------------------------------------------
+    def run(self, runner, index: int, weight: float) -> bool:
+        job = runner.job
+        partial = self.output.with_name(self.output.name + ".part")
+        digest = hashlib.sha256() if self.checksum_path else None
+
+        try:
+            with BlockDeviceReader(self.device, direct=bool(self.cfg.get("directio"))) as reader:
+                read = ReadStats(reader.device, reader.direct, reader.block_size, reader.size)
+                source = _TappedReader(reader, digest, _reporter(runner, reader.size, weight))
+                if self.algorithm == "none":
+                    read.bytes_sparse = self._copy_raw(source, partial)
+                else:
+                    stats = self._compress(runner, reader, source, partial)
+                    job.steps[index]["compression"] = stats.as_dict()
+                read.bytes_read = source.bytes_read
+                read.direct = reader.direct
+            read.finish()
+            partial.replace(self.output)
+        except Exception as exc:
+            runner.log_line(f"Streaming {self.device} failed: {exc}")
+            partial.unlink(missing_ok=True)
+            return False
+
+        if digest is not None:
+            self.checksum_path.write_text(f"{digest.hexdigest()}  {self.checksum_name}\n")
+        job.steps[index]["read"] = read.as_dict()
+        _log_read(runner, read)
+        return True
+
+    @staticmethod
+    def _copy_raw(source: _TappedReader, partial: Path) -> int:
+        with SparseWriter(partial) as out:
+            while True:
+                data = source.read(BLOCK_SIZE)
+                if not data:
+                    return out.skipped
+                out.write(data)
+
+    def _compress(self, runner, reader: BlockDeviceReader, source: _TappedReader, partial: Path):
+        threads = _threads(self.cfg)
+        level = _level(self.cfg)
+        if level is None and self.algorithm == "zstd":
+            # calibrate on a block from the middle of the disc – the start is mostly padding
+            sample = reader.read_at(reader.size // 2 // BLOCK_SIZE * BLOCK_SIZE, BLOCK_SIZE)
+            level = pick_zstd_level(sample, DEFAULT_READ_RATE, threads)
+            runner.log_line(f"Auto-selected zstd level {level}")
+
+        compressor = make_compressor(
+            self.algorithm, threads, level, _long_window(self.cfg),
+            seekable=bool(self.cfg.get("seekable")),
+        )
+        with open(partial, "wb") as dst:
+            preallocate(dst.fileno(), reader.size)     # compressed output won't be bigger
+            stats = compressor.compress(source, dst)
+            dst.flush()
+            trim(dst.fileno())
+        runner.log_line(
+            f"Compressed {stats.bytes_in / 1024**2:.0f} MiB → {stats.bytes_out / 1024**2:.0f} MiB "
+            f"(ratio {stats.ratio:.3f}) with {stats.threads} thread(s)"
+        )
+        return stats
+
+
+# ============================================================
+class CompressTask(StepTask):
+    """
+    Compress an ISO in-process with the thread budget of one io slot.
+    Writes to <output>.part and renames on success.
+    """
+
+    resource = RESOURCE_IO
+
+    def __init__(self, source: Path, output: Path, algorithm: str, cfg: Dict[str, Any]) -> None:
+        self.source = source
+        self.output = output
+        self.algorithm = algorithm
+        self.cfg = cfg
+
+    # ---------------------------------------------------------
+    def run(self, runner, index: int, weight: float) -> bool:
+        job = runner.job
+        threads = _threads(self.cfg)
+        level = _level(self.cfg)
+        total = self.source.stat().st_size or 1
+
+        if level is None and self.algorithm == "zstd":
+            target = self._read_rate(job)
+            level = pick_zstd_level(self._sample(), target, threads)
+            runner.log_line(f"Auto-selected zstd level {level} for {target / 1024**2:.1f} MiB/s reads")
+
+        compressor = make_compressor(
+            self.algorithm, threads, level, _long_window(self.cfg),
+            seekable=bool(self.cfg.get("seekable")),
+        )
+        partial = self.output.with_name(self.output.name + ".part")
+        report = _reporter(runner, total, weight)
+
+        def on_progress(bytes_in: int, bytes_out: int) -> None:
+            report(bytes_in)
+
+        try:
+            with open(self.source, "rb") as src, open(partial, "wb") as dst:
+                preallocate(dst.fileno(), total)
+                stats = compressor.compress(src, dst, on_progress)
+                dst.flush()
+                trim(dst.fileno())
+            partial.replace(self.output)
+        except Exception as exc:
+            runner.log_line(f"Compression failed: {exc}")
+            partial.unlink(missing_ok=True)
+            return False
+
+        job.steps[index]["compression"] = stats.as_dict()
+        job.step_stats = {"rate": stats.throughput, "bytes_done": stats.bytes_in}
+        runner.log_line(
+            f"Compressed {stats.bytes_in / 1024**2:.0f} MiB → {stats.bytes_out / 1024**2:.0f} MiB "
+            f"(ratio {stats.ratio:.3f}) at {stats.throughput / 1024**2:.1f} MiB/s "
+            f"with {stats.threads} thread(s)"
+        )
+        return True
+
+    # ---------------------------------------------------------
+    @staticmethod
+    def _read_rate(job: Job) -> float:
+        """Fastest read rate an earlier step of this job measured."""
+        rates = [s.get("stats", {}).get("rate") or 0 for s in job.steps]
+        return max(rates + [0]) or DEFAULT_READ_RATE
+
+    def _sample(self, size: int = 4 * 1024**2) -> bytes:
+        """A chunk from the middle of the image – the start is mostly padding."""
+        with open(self.source, "rb") as fp:
+            fp.seek(max(0, self.source.stat().st_size // 2 - size // 2))
+            return fp.read(size)
@@ -4,19 +4,27 @@ DVD / Blu-ray VIDEO ripper helper (Linux).
 
 Steps:
   1. MakeMKV  →  creates *.mkv titles, releases drive   (weight ≈ 0.70)
-  2. HandBrake loops over each MKV and transcodes       (weight ≈ 0.30)
-
-All MKVs are processed so TV-series discs are handled correctly.
+  2. HandBrake transcodes every MKV as its own sub-step (weight ≈ 0.28)
+  3. Encodes (or the MKVs without HandBrake) are moved to the output
+     directory                                          (weight ≈ 0.02)
+
+All MKVs are processed so TV-series discs are handled correctly; titles
+encode in parallel, bounded by the scheduler's encode slots.  MKVs and
+encodes go to the scratch tiers of the drive and encode steps
+(storage.py).
 """
 
 from pathlib import Path
 from typing import List, Tuple
-import shlex
 
 from app.core.configmanager import config
 from app.core.integration.makemkv.linux import build_makemkv_cmd
 from app.core.integration.handbrake.linux import build_handbrake_cmd
 from app.core.job.job import Job
+from app.core.job.mover import PromoteTask
+from app.core.job.scheduler import RESOURCE_DRIVE, RESOURCE_ENCODE
+from app.core.job.storage import scratch_dir, staging_dir
+from app.core.job.task import ParallelSubsteps, SubStep
 
 
 def rip_video_disc(job: Job, disc_type: str) -> List[Tuple[List[str], str, bool, float]]:
@@ -26,14 +34,15 @@ def rip_video_disc(job: Job, disc_type: str) -> List[Tuple[List[str], str, bool,
     """
     cfg = config.section(disc_type.upper())
 
-    temp_dir: Path = job.temp_path
-    progress_txt = temp_dir / "makemkv_progress.txt"
+    temp_dir: Path = scratch_dir(job, RESOURCE_DRIVE)
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    output_dir = job.output_path
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     # ── Step 1: MakeMKV ─────────────────────────────────────
     makemkv_cmd = build_makemkv_cmd(
         drive_path=job.drive,
         temp_dir=temp_dir,
-        progress_path=progress_txt,
     )
 
     steps: List[Tuple[List[str], str, bool, float]] = [
@@ -41,39 +50,50 @@ def rip_video_disc(job: Job, disc_type: str) -> List[Tuple[List[str], str, bool,
         (makemkv_cmd, f"Ripping {disc_type} with MakeMKV", True, 0.70)
     ]
 
-    # ── Step 2: HandBrake for every MKV ─────────────────────
+    # ── Step 2: HandBrake, one sub-step per MKV ─────────────
     if cfg.get("usehandbrake", True):
         preset_path = Path(cfg["handbrakepreset_path"]).expanduser()
         preset_name = cfg["handbrakepreset_name"]
         container   = cfg["handbrakeformat"]            # “mkv” by default
         use_flatpak = cfg.get("handbrakeflatpak", True)
-
-        output_dir = job.output_path
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        # Build a template HandBrake CLI (as strings, not Path objects!)
-        hb_template = build_handbrake_cmd(
-            mkv_file="INPUT_PLACEHOLDER",
-            output_path="OUTPUT_PLACEHOLDER",
-            preset_path=preset_path,
-            preset_name=preset_name,
-            flatpak=use_flatpak,
-        )
-
-        # Path objects → str, then quote
-        hb_template_str = " ".join(shlex.quote(str(tok)) for tok in hb_template)
-
-        # Bash loop: transcode each *.mkv
-        shell_script = (
-            f'for SRC in *.mkv; do '
-            f'OUT="{shlex.quote(str(output_dir))}/$(basename "${{SRC%.*}}").{container}"; '
-            f'{hb_template_str.replace("INPUT_PLACEHOLDER", "$SRC").replace("OUTPUT_PLACEHOLDER", "$OUT")} ; '
-            f'done'
-        )
-
-        steps.append( (["bash", "-c", shell_script],
+        retries     = int(cfg.get("handbrakeretries") or 0)
+
+        staging = staging_dir(job, RESOURCE_ENCODE)
+        staging.mkdir(parents=True, exist_ok=True)
+
+        def expand_titles() -> List[SubStep]:
+            """Runs after MakeMKV: one encode per produced title."""
+            mkvs = sorted(temp_dir.glob("*.mkv"))
+            total = sum(p.stat().st_size for p in mkvs) or 1
+            return [
+                SubStep(
+                    key=mkv.stem,
+                    command=build_handbrake_cmd(
+                        mkv_file=mkv,
+                        output_path=staging / f"{mkv.stem}.{container}",
+                        preset_path=preset_path,
+                        preset_name=preset_name,
+                        flatpak=use_flatpak,
+                    ),
+                    description=f"Encoding {mkv.name}",
+                    weight=mkv.stat().st_size / total,
+                )
+                for mkv in mkvs
+            ]
+
+        steps.append( (ParallelSubsteps(expand_titles, RESOURCE_ENCODE, retries=retries),
                        f"Encoding {disc_type} titles with HandBrake",
                        False,
-                       0.30) )
+                       0.28) )
+        steps.append( (PromoteTask(staging, output_dir),
+                       "Moving titles to the output directory",
+                       False,
+                       0.02) )
+    else:
+        # the MKVs are the result; scratch may be RAM and is dropped at the end
+        steps.append( (PromoteTask(temp_dir, output_dir, pattern="*.mkv"),
+                       "Moving titles to the output directory",
+                       False,
+                       0.02) )
 
     return steps
@@ -1,12 +1,21 @@
 import platform
 
+from .sampler import SystemSampler
+
 system = platform.system().lower()
 
 if system == "linux":
-    from .linux import get_system_info
+    from .linux import collect_system_info
 elif system == "darwin":
-    from .mac import get_system_info
+    from .mac import collect_system_info
 elif system == "windows":
-    from .windows import get_system_info
+    from .windows import collect_system_info
 else:
     raise NotImplementedError(f"SystemInfo not supported on platform: {system}")
+
+system_sampler = SystemSampler(collect_system_info)
+
+
+def get_system_info():
+    """Latest snapshot from the background sampler (no I/O)."""
+    return system_sampler.snapshot()
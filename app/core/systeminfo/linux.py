@@ -1,14 +1,18 @@
 import platform
 import psutil
 import time
+from functools import lru_cache
 from typing import Dict, Any
 
 from ..configmanager import config
 from ..integration.handbrake import linux as handbrake
 from ..integration.lact import linux as lact
 
+psutil.cpu_percent(interval=None)       # start the counter for the first sample
 
-def get_system_info() -> Dict[str, Any]:
+
+# Called by the background sampler (see sampler.py), not per request.
+def collect_system_info() -> Dict[str, Any]:
     return {
         "os_info": _get_os_info(),
         "cpu_info": _get_cpu_info(),
@@ -20,6 +24,11 @@ def get_system_info() -> Dict[str, Any]:
 
 
 def _get_os_info() -> Dict:
+    return {**_get_os_release(), "uptime": _format_uptime(psutil.boot_time())}
+
+
+@lru_cache(maxsize=None)
+def _get_os_release() -> Dict:
     try:
         with open("/etc/os-release", "r") as f:
             os_release = f.readlines()
@@ -31,7 +40,6 @@ def _get_os_info() -> Dict:
         "os": platform.system(),
         "os_version": os_version,
         "kernel": platform.release(),
-        "uptime": _format_uptime(psutil.boot_time())
     }
 
 
@@ -43,12 +51,17 @@ def _format_uptime(boot_time: float) -> str:
     return f"{days}d {hours}h {minutes}m {seconds}s"
 
 
-def _get_cpu_info() -> Dict:
+@lru_cache(maxsize=None)
+def _get_cpu_model() -> str:
     try:
         with open("/proc/cpuinfo", "r") as f:
-            model = next((line.split(": ")[1].strip() for line in f if line.startswith("model name")), platform.processor())
+            return next((line.split(": ")[1].strip() for line in f if line.startswith("model name")), platform.processor())
     except FileNotFoundError:
-        model = platform.processor()
+        return platform.processor()
+
+
+def _get_cpu_info() -> Dict:
+    freq = psutil.cpu_freq()
 
     try:
         with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
@@ -57,11 +70,12 @@ def _get_cpu_info() -> Dict:
         temp = "N/A"
 
     return {
-        "model": model,
+        "model": _get_cpu_model(),
         "cores": psutil.cpu_count(logical=False),
         "threads": psutil.cpu_count(logical=True),
-        "frequency": int(psutil.cpu_freq().current),
-        "usage": psutil.cpu_percent(interval=1),
+        "frequency": int(freq.current) if freq else 0,
+        # usage since the previous sample: no blocking measurement window
+        "usage": psutil.cpu_percent(interval=None),
         "temperature": temp
     }
 
@@ -0,0 +1,73 @@
+# app/core/systeminfo/sampler.py
+"""
+Background system-info sampler.
+
+Collecting system info is slow (CPU usage is measured over an interval,
+GPUs are queried over lactd), so a daemon thread collects it every
+*interval* seconds into a shared snapshot and requests only read that.
+Listeners (the dashboard) are called after every new sample.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from ..configmanager import config
+
+DEFAULT_INTERVAL = 5.0
+
+
+class SystemSampler:
+    def __init__(self, collect: Callable[[], Dict[str, Any]], interval: Optional[float] = None) -> None:
+        self.collect = collect
+        self.interval = interval
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[], None]] = []
+
+    # ------------------------------------------------------
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """callback() runs on the sampler thread after every sample."""
+        self._listeners.append(callback)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            if self.interval is None:
+                self.interval = float(config.get("Advanced", "systeminfointerval") or DEFAULT_INTERVAL)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="system-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest sample; only the very first call waits for one."""
+        if self._snapshot is None:
+            self.start()
+            self._ready.wait()
+        return self._snapshot
+
+    # ------------------------------------------------------
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._snapshot = self.collect()
+            except Exception as exc:
+                logging.warning(f"⚠️ System info sampling failed: {exc}")
+                if self._snapshot is None:
+                    self._snapshot = {}
+            self._ready.set()
+            for callback in list(self._listeners):
+                try:
+                    callback()
+                except Exception as exc:
+                    logging.warning(f"SystemSampler listener failed: {exc}")
+            self._stop.wait(self.interval)
@@ -0,0 +1,159 @@
+"""
+Minimal ISO9660 reader (with Joliet names when present).
+
+Works on any seekable binary file object – an optical device, an .iso
+image or a SeekableZstdReader – and only reads the sectors it needs:
+the volume descriptors, directory extents and the file data asked for.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+SECTOR = 2048
+_JOLIET_ESCAPES = (b"%/@", b"%/C", b"%/E")
+
+
+@dataclass
+class IsoEntry:
+    name: str
+    path: str
+    is_dir: bool
+    size: int
+    # (lba, length) pairs; multi-extent files have several
+    extents: List[Tuple[int, int]] = field(default_factory=list)
+
+
+class IsoError(ValueError):
+    pass
+
+
+# ============================================================
+class IsoVolume:
+    def __init__(self, fp: BinaryIO) -> None:
+        self.fp = fp
+        self.joliet = False
+        self._dirs: Dict[str, List[IsoEntry]] = {}
+
+        pvd = None
+        svd = None
+        for index in range(16, 64):
+            desc = self._read(index * SECTOR, SECTOR)
+            if desc[1:6] != b"CD001":
+                raise IsoError("no ISO9660 volume descriptor")
+            vd_type = desc[0]
+            if vd_type == 1 and pvd is None:
+                pvd = desc
+            elif vd_type == 2 and desc[88:91] in _JOLIET_ESCAPES:
+                svd = desc
+            elif vd_type == 255:
+                break
+        if pvd is None:
+            raise IsoError("no primary volume descriptor")
+
+        self.label = pvd[40:72].decode("ascii", "replace").strip()
+        self.block_size = struct.unpack_from("<H", pvd, 128)[0] or SECTOR
+        self.volume_size = struct.unpack_from("<I", pvd, 80)[0] * self.block_size
+
+        desc = svd or pvd
+        self.joliet = svd is not None
+        if self.joliet:
+            label = svd[40:72].decode("utf-16-be", "replace").strip()
+            self.label = label or self.label
+        self.root = self._record(desc[156:190], "", "/")
+        self.root.is_dir = True
+
+    # ---------------------------------------------------------
+    def _read(self, offset: int, length: int) -> bytes:
+        self.fp.seek(offset)
+        data = self.fp.read(length)
+        if len(data) < length:
+            raise IsoError(f"short read at {offset}")
+        return data
+
+    def _name(self, raw: bytes) -> str:
+        if raw in (b"\x00", b"\x01"):
+            return raw.decode("latin-1")
+        name = raw.decode("utf-16-be", "replace") if self.joliet else raw.decode("ascii", "replace")
+        name = name.split(";", 1)[0]
+        return name[:-1] if name.endswith(".") else name
+
+    def _record(self, rec: bytes, parent: str, path: Optional[str] = None) -> IsoEntry:
+        lba = struct.unpack_from("<I", rec, 2)[0]
+        size = struct.unpack_from("<I", rec, 10)[0]
+        flags = rec[25]
+        name = self._name(rec[33:33 + rec[32]])
+        return IsoEntry(
+            name=name,
+            path=path or f"{parent.rstrip('/')}/{name}",
+            is_dir=bool(flags & 0x02),
+            size=size,
+            extents=[(lba, size)],
+        )
+
+    # ---------------------------------------------------------
+    def listdir(self, path: str = "/") -> List[IsoEntry]:
+        path = "/" + path.strip("/")
+        if path in self._dirs:
+            return self._dirs[path]
+
+        directory = self.root if path == "/" else self.find(path)
+        if directory is None or not directory.is_dir:
+            raise FileNotFoundError(path)
+
+        lba, length = directory.extents[0]
+        data = self._read(lba * self.block_size, length)
+        entries: List[IsoEntry] = []
+        continues = False                           # previous record was multi-extent
+        pos = 0
+        while pos < len(data):
+            rec_len = data[pos]
+            if rec_len == 0:                        # records never cross sectors
+                pos = (pos // SECTOR + 1) * SECTOR
+                continue
+            rec = data[pos:pos + rec_len]
+            pos += rec_len
+            if rec[33:33 + rec[32]] in (b"\x00", b"\x01"):
+                continue                            # "." and ".."
+
+            entry = self._record(rec, path)
+            if continues and entries and entries[-1].name == entry.name:
+                entries[-1].extents += entry.extents
+                entries[-1].size += entry.size
+            else:
+                entries.append(entry)
+            continues = bool(rec[25] & 0x80)
+
+        self._dirs[path] = entries
+        return entries
+
+    def find(self, path: str) -> Optional[IsoEntry]:
+        parts = [p for p in path.strip("/").split("/") if p]
+        if not parts:
+            return self.root
+        current = "/"
+        entry = None
+        for part in parts:
+            entry = next((e for e in self.listdir(current) if e.name.lower() == part.lower()), None)
+            if entry is None:
+                return None
+            current = entry.path
+        return entry
+
+    def walk(self, path: str = "/") -> Iterator[IsoEntry]:
+        for entry in self.listdir(path):
+            yield entry
+            if entry.is_dir:
+                yield from self.walk(entry.path)
+
+    # ---------------------------------------------------------
+    def iter_file(self, entry: IsoEntry, chunk: int = 1024 * 1024) -> Iterator[bytes]:
+        for lba, length in entry.extents:
+            offset = lba * self.block_size
+            end = offset + length
+            while offset < end:
+                n = min(chunk, end - offset)
+                yield self._read(offset, n)
+                offset += n
@@ -0,0 +1,48 @@
+"""
+Volume probe for disc classification.
+
+Reads label, size and root directory straight off a device or image –
+UDF first (DVD video bridge discs and Blu-rays), then ISO9660 – without
+mounting anything or running blkid.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+from typing import BinaryIO, List, Optional
+
+from app.core.volume.iso9660 import IsoError, IsoVolume
+from app.core.volume.udf import UdfError, UdfVolume
+
+
+@dataclass
+class VolumeInfo:
+    fs_type: str                # "udf" | "iso9660"
+    label: str
+    size: int                   # bytes
+    root: List[str] = field(default_factory=list)
+
+    def has(self, name: str) -> bool:
+        """Case-insensitive check for a root directory entry."""
+        return name.lower() in (entry.lower() for entry in self.root)
+
+
+def probe_volume(fp: BinaryIO) -> Optional[VolumeInfo]:
+    """Filesystem info of the volume in *fp*, None if neither UDF nor ISO9660."""
+    for fs_type, volume_class in (("udf", UdfVolume), ("iso9660", IsoVolume)):
+        try:
+            volume = volume_class(fp)
+            root = [entry.name for entry in volume.listdir("/")]
+        except (UdfError, IsoError, OSError, struct.error, IndexError):
+            continue                            # not this filesystem, or unreadable
+        return VolumeInfo(fs_type=fs_type, label=volume.label, size=volume.volume_size, root=root)
+    return None
+
+
+def probe_path(path: str) -> Optional[VolumeInfo]:
+    try:
+        with open(path, "rb", buffering=0) as fp:
+            return probe_volume(fp)
+    except OSError:
+        return None
@@ -0,0 +1,306 @@
+"""
+Minimal UDF reader (ECMA-167 / OSTA UDF 1.02 – 2.60).
+
+Companion to iso9660.py for the discs that aren't (only) ISO9660: DVD
+video is a UDF bridge, Blu-ray is UDF 2.50 with a metadata partition.
+Works on any seekable binary file object and reads only what it needs:
+anchor, volume descriptor sequence, file set descriptor, then one file
+entry plus its data per directory listed.
+
+Not supported: virtual (VAT) partitions of packet-written discs and
+allocation descriptor continuation extents.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+SECTOR = 2048
+ANCHOR_SECTOR = 256
+
+# descriptor tag identifiers
+TAG_PVD, TAG_AVDP, TAG_PD, TAG_LVD, TAG_TD = 1, 2, 5, 6, 8
+TAG_FSD, TAG_FID, TAG_FE, TAG_EFE = 256, 257, 261, 266
+
+# file characteristics of a file identifier descriptor
+FID_DIRECTORY, FID_DELETED, FID_PARENT = 0x02, 0x04, 0x08
+FILE_TYPE_DIRECTORY = 4
+
+_META_MAP = b"*UDF Metadata Partition"
+_SPARABLE_MAP = b"*UDF Sparable Partition"
+
+
+@dataclass
+class UdfEntry:
+    name: str
+    path: str
+    is_dir: bool
+    size: int
+    # (byte offset, length) pairs on the image
+    extents: List[Tuple[int, int]] = field(default_factory=list)
+    data: Optional[bytes] = None                    # embedded in the file entry
+
+
+class UdfError(ValueError):
+    pass
+
+
+def _cs0(raw: bytes) -> str:
+    """OSTA compressed unicode: 8 = one byte per char, 16 = UTF-16BE."""
+    if not raw:
+        return ""
+    if raw[0] == 16:
+        return raw[1:].decode("utf-16-be", "replace")
+    return raw[1:].decode("latin-1")
+
+
+def _dstring(raw: bytes) -> str:
+    """Fixed-size field whose last byte holds the used length."""
+    return _cs0(raw[:raw[-1]]).rstrip("\0 ") if raw and raw[-1] else ""
+
+
+def _tag_id(desc: bytes) -> Optional[int]:
+    """Descriptor tag identifier, None if the tag checksum doesn't match."""
+    if len(desc) < 16 or (sum(desc[0:4]) + sum(desc[5:16])) & 0xFF != desc[4]:
+        return None
+    return struct.unpack_from("<H", desc, 0)[0]
+
+
+# ============================================================
+class UdfVolume:
+    def __init__(self, fp: BinaryIO) -> None:
+        self.fp = fp
+        self._dirs: Dict[str, List[UdfEntry]] = {}
+
+        anchor = self._anchor()
+        vds_length, vds_location = struct.unpack_from("<II", anchor, 16)
+
+        pvd = lvd = None
+        partitions: Dict[int, Tuple[int, int]] = {}     # number → (start sector, length)
+        for index in range(max(1, vds_length // SECTOR)):
+            desc = self._read((vds_location + index) * SECTOR, SECTOR)
+            tag = _tag_id(desc)
+            if tag == TAG_TD or tag is None:
+                break
+            if tag == TAG_PVD and pvd is None:
+                pvd = desc
+            elif tag == TAG_PD:
+                number = struct.unpack_from("<H", desc, 22)[0]
+                partitions[number] = struct.unpack_from("<II", desc, 188)
+            elif tag == TAG_LVD and lvd is None:
+                lvd = desc
+        if lvd is None or not partitions:
+            raise UdfError("incomplete volume descriptor sequence")
+
+        self.block_size = struct.unpack_from("<I", lvd, 212)[0] or SECTOR
+        self.label = _dstring(lvd[84:212]) or (_dstring(pvd[24:56]) if pvd else "")
+        self.volume_size = max(start + length for start, length in partitions.values()) * self.block_size
+
+        # partition reference → physical start block, plus the metadata file's
+        # (block offset, blocks, physical block) runs for metadata partitions
+        self._maps: List[Tuple[int, Optional[List[Tuple[int, int, int]]]]] = []
+        self._partition_maps(lvd, partitions)
+
+        fsd_lbn, fsd_ref = struct.unpack_from("<IH", lvd, 252)
+        fsd = self._read_block(fsd_ref, fsd_lbn)
+        if _tag_id(fsd) != TAG_FSD:
+            raise UdfError("no file set descriptor")
+        root_lbn, root_ref = struct.unpack_from("<IH", fsd, 404)
+        self.root = self._entry("", "/", root_ref, root_lbn)
+
+    # ---------------------------------------------------------
+    def _read(self, offset: int, length: int) -> bytes:
+        self.fp.seek(offset)
+        data = self.fp.read(length)
+        if len(data) < length:
+            raise UdfError(f"short read at {offset}")
+        return data
+
+    def _anchor(self) -> bytes:
+        candidates = [ANCHOR_SECTOR]
+        try:
+            last = self.fp.seek(0, 2) // SECTOR - 1
+            candidates += [s for s in (last - ANCHOR_SECTOR, last) if s >= 0]
+        except OSError:
+            pass
+        for sector in candidates:
+            try:
+                desc = self._read(sector * SECTOR, SECTOR)
+            except (UdfError, OSError):
+                continue
+            if _tag_id(desc) == TAG_AVDP:
+                return desc
+        raise UdfError("no UDF anchor volume descriptor")
+
+    def _partition_maps(self, lvd: bytes, partitions: Dict[int, Tuple[int, int]]) -> None:
+        def start_of(number: int) -> int:
+            if number not in partitions:
+                raise UdfError(f"partition {number} not described")
+            return partitions[number][0]
+
+        count = struct.unpack_from("<I", lvd, 268)[0]
+        pos = 440
+        for _ in range(count):
+            map_type, length = lvd[pos], lvd[pos + 1]
+            if map_type == 1:
+                number = struct.unpack_from("<H", lvd, pos + 4)[0]
+                self._maps.append((start_of(number), None))
+            elif map_type == 2 and lvd[pos + 5:pos + 5 + len(_META_MAP)] == _META_MAP:
+                number, meta_lbn = struct.unpack_from("<HI", lvd, pos + 38)
+                start = start_of(number)
+                self._maps.append((start, self._metadata_runs(start, meta_lbn)))
+            elif map_type == 2 and lvd[pos + 5:pos + 5 + len(_SPARABLE_MAP)] == _SPARABLE_MAP:
+                number = struct.unpack_from("<H", lvd, pos + 38)[0]
+                self._maps.append((start_of(number), None))     # pressed discs have no spares
+            else:
+                raise UdfError(f"unsupported partition map (type {map_type})")
+            if length == 0:
+                raise UdfError("corrupt partition map table")
+            pos += length
+
+    def _metadata_runs(self, start: int, meta_lbn: int) -> List[Tuple[int, int, int]]:
+        desc = self._read((start + meta_lbn) * self.block_size, self.block_size)
+        _, _, extents, _ = self._parse_file_entry(desc, start)
+        runs, offset = [], 0
+        for byte_offset, length in extents:
+            blocks = -(-length // self.block_size)
+            runs.append((offset, blocks, byte_offset // self.block_size))
+            offset += blocks
+        return runs
+
+    def _block(self, ref: int, lbn: int) -> int:
+        """Physical block of logical block *lbn* in partition *ref*."""
+        if ref >= len(self._maps):
+            raise UdfError(f"bad partition reference {ref}")
+        start, runs = self._maps[ref]
+        if runs is None:
+            return start + lbn
+        for offset, blocks, physical in runs:
+            if offset <= lbn < offset + blocks:
+                return physical + lbn - offset
+        raise UdfError(f"block {lbn} outside metadata partition")
+
+    def _read_block(self, ref: int, lbn: int) -> bytes:
+        return self._read(self._block(ref, lbn) * self.block_size, self.block_size)
+
+    def _extent(self, ref: int, lbn: int, length: int) -> List[Tuple[int, int]]:
+        """(byte offset, length) pieces of an extent, split where the mapping isn't contiguous."""
+        pieces: List[Tuple[int, int]] = []
+        while length > 0:
+            block = self._block(ref, lbn)
+            n = min(length, self.block_size)
+            if pieces and pieces[-1][0] + pieces[-1][1] == block * self.block_size:
+                pieces[-1] = (pieces[-1][0], pieces[-1][1] + n)
+            else:
+                pieces.append((block * self.block_size, n))
+            length -= n
+            lbn += 1
+        return pieces
+
+    # ---------------------------------------------------------
+    def _parse_file_entry(self, desc: bytes, ref_or_start: int, physical: bool = True):
+        """(is_dir, size, extents, embedded data) of a (extended) file entry."""
+        tag = _tag_id(desc)
+        if tag == TAG_FE:
+            l_ea, l_ad = struct.unpack_from("<II", desc, 168)
+            ads = 176 + l_ea
+        elif tag == TAG_EFE:
+            l_ea, l_ad = struct.unpack_from("<II", desc, 208)
+            ads = 216 + l_ea
+        else:
+            raise UdfError("no file entry")
+        is_dir = desc[27] == FILE_TYPE_DIRECTORY
+        size = struct.unpack_from("<Q", desc, 56)[0]
+        ad_type = struct.unpack_from("<H", desc, 34)[0] & 0x07
+
+        area = desc[ads:ads + l_ad]
+        if ad_type == 3:
+            return is_dir, size, [], area[:size]
+
+        extents: List[Tuple[int, int]] = []
+        step = 8 if ad_type == 0 else 16
+        for pos in range(0, len(area) - step + 1, step):
+            raw_length, lbn = struct.unpack_from("<II", area, pos)
+            length, kind = raw_length & 0x3FFFFFFF, raw_length >> 30
+            if length == 0 or kind == 3:
+                break                               # end, or continuation (unsupported)
+            if kind != 0:
+                continue                            # allocated but not recorded
+            if physical:
+                extents.append(((ref_or_start + lbn) * self.block_size, length))
+            else:
+                ref = ref_or_start if ad_type == 0 else struct.unpack_from("<H", area, pos + 8)[0]
+                extents += self._extent(ref, lbn, length)
+        return is_dir, size, extents, None
+
+    def _entry(self, name: str, path: str, ref: int, lbn: int) -> UdfEntry:
+        is_dir, size, extents, data = self._parse_file_entry(self._read_block(ref, lbn), ref, physical=False)
+        return UdfEntry(name=name, path=path, is_dir=is_dir, size=size, extents=extents, data=data)
+
+    def _contents(self, entry: UdfEntry) -> bytes:
+        if entry.data is not None:
+            return entry.data
+        return b"".join(self._read(offset, length) for offset, length in entry.extents)[:entry.size]
+
+    # ---------------------------------------------------------
+    def listdir(self, path: str = "/") -> List[UdfEntry]:
+        path = "/" + path.strip("/")
+        if path in self._dirs:
+            return self._dirs[path]
+
+        directory = self.root if path == "/" else self.find(path)
+        if directory is None or not directory.is_dir:
+            raise FileNotFoundError(path)
+
+        data = self._contents(directory)
+        entries: List[UdfEntry] = []
+        pos = 0
+        while pos + 38 <= len(data):
+            if _tag_id(data[pos:pos + 16]) != TAG_FID:
+                break
+            characteristics, l_fi = data[pos + 18], data[pos + 19]
+            _, lbn, ref = struct.unpack_from("<IIH", data, pos + 20)
+            l_iu = struct.unpack_from("<H", data, pos + 36)[0]
+            name = _cs0(data[pos + 38 + l_iu:pos + 38 + l_iu + l_fi])
+            pos += (38 + l_iu + l_fi + 3) & ~3
+            if characteristics & (FID_PARENT | FID_DELETED):
+                continue
+            entries.append(self._entry(name, f"{path.rstrip('/')}/{name}", ref, lbn))
+
+        self._dirs[path] = entries
+        return entries
+
+    def find(self, path: str) -> Optional[UdfEntry]:
+        parts = [p for p in path.strip("/").split("/") if p]
+        if not parts:
+            return self.root
+        current = "/"
+        entry = None
+        for part in parts:
+            entry = next((e for e in self.listdir(current) if e.name.lower() == part.lower()), None)
+            if entry is None:
+                return None
+            current = entry.path
+        return entry
+
+    def walk(self, path: str = "/") -> Iterator[UdfEntry]:
+        for entry in self.listdir(path):
+            yield entry
+            if entry.is_dir:
+                yield from self.walk(entry.path)
+
+    # ---------------------------------------------------------
+    def iter_file(self, entry: UdfEntry, chunk: int = 1024 * 1024) -> Iterator[bytes]:
+        if entry.data is not None:
+            yield entry.data
+            return
+        left = entry.size
+        for offset, length in entry.extents:
+            end = offset + min(length, left)
+            left -= end - offset
+            while offset < end:
+                n = min(chunk, end - offset)
+                yield self._read(offset, n)
+                offset += n
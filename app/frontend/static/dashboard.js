@@ -6,118 +6,122 @@ function safeUpdate(id, value) {
 function updateSystemInfo() {
   fetch("/api/system-info")
     .then(res => res.json())
-    .then(data => {
-      if (!data) return;
-
-      safeUpdate('os', data.os_info.os);
-      safeUpdate('os_version', data.os_info.os_version);
-      safeUpdate('kernel', data.os_info.kernel);
-      safeUpdate('uptime', data.os_info.uptime);
-
-      safeUpdate('ram_total', Math.round(data.memory_info.total / 1048576) + " MB");
-      safeUpdate('ram_used', Math.round(data.memory_info.used / 1048576) + " MB");
-      safeUpdate('ram_usage', data.memory_info.percent + "%");
-
-      safeUpdate('disk_total', (data.storage_info.total / 1073741824).toFixed(1) + " GB");
-      safeUpdate('disk_used', (data.storage_info.used / 1073741824).toFixed(1) + " GB");
-      safeUpdate('disk_usage', data.storage_info.percent + "%");
-
-      safeUpdate('cpu_model', data.cpu_info.model);
-      safeUpdate('cpu_cores_threads', `${data.cpu_info.cores}C / ${data.cpu_info.threads}T`);
-      safeUpdate('cpu_clock', data.cpu_info.frequency + " MHz");
-      safeUpdate('cpu_usage', data.cpu_info.usage + "%");
-      safeUpdate('cpu_temp', data.cpu_info.temperature + "°C");
-
-      const hwencoders = [
-        { id: 'amd_vce', vendor: 'vce' },
-        { id: 'intel_qsv', vendor: 'qsv' },
-        { id: 'nvidia_nvenc', vendor: 'nvenc' },
-      ];
-
-      hwencoders.forEach(enc => {
-        const vendorInfo = data.hwenc_info?.vendors?.[enc.vendor];
-        const el = document.getElementById(enc.id);
-        if (vendorInfo?.available) {
-          el.innerHTML = "✓<br>(" + vendorInfo.codecs.join(", ") + ")";
-        } else {
-          el.textContent = "✗";
-        }
-      });
-
-      const systemInfoRow = document.getElementById('system-info');
-      systemInfoRow.querySelectorAll('.gpu-tile').forEach(tile => tile.remove());
-
-      if (data.gpu_info.length > 0) {
-        data.gpu_info.forEach(gpu => {
-          const gpuTile = document.createElement('div');
-          gpuTile.classList.add('tile', 'gpu-tile');
-          gpuTile.innerHTML = `
-            <h3>GPU Info</h3>
-            <div class="entry"><strong>${gpu.model}</strong></div>
-            <div class="entry"><strong>Usage:</strong> ${gpu.usage}%</div>
-            <div class="entry"><strong>Temp:</strong> ${gpu.temperature}°C</div>
-            <div class="entry"><strong>VRAM:</strong> ${Math.round(gpu.used_memory/1048576)}MB / ${Math.round(gpu.total_memory/1048576)}MB (${gpu.percent_memory}%)</div>
-          `;
-          systemInfoRow.appendChild(gpuTile);
-        });
-      }
+    .then(renderSystemInfo);
+}
+
+function renderSystemInfo(data) {
+  if (!data) return;
+
+  safeUpdate('os', data.os_info.os);
+  safeUpdate('os_version', data.os_info.os_version);
+  safeUpdate('kernel', data.os_info.kernel);
+  safeUpdate('uptime', data.os_info.uptime);
+
+  safeUpdate('ram_total', Math.round(data.memory_info.total / 1048576) + " MB");
+  safeUpdate('ram_used', Math.round(data.memory_info.used / 1048576) + " MB");
+  safeUpdate('ram_usage', data.memory_info.percent + "%");
+
+  safeUpdate('disk_total', (data.storage_info.total / 1073741824).toFixed(1) + " GB");
+  safeUpdate('disk_used', (data.storage_info.used / 1073741824).toFixed(1) + " GB");
+  safeUpdate('disk_usage', data.storage_info.percent + "%");
+
+  safeUpdate('cpu_model', data.cpu_info.model);
+  safeUpdate('cpu_cores_threads', `${data.cpu_info.cores}C / ${data.cpu_info.threads}T`);
+  safeUpdate('cpu_clock', data.cpu_info.frequency + " MHz");
+  safeUpdate('cpu_usage', data.cpu_info.usage + "%");
+  safeUpdate('cpu_temp', data.cpu_info.temperature + "°C");
+
+  const hwencoders = [
+    { id: 'amd_vce', vendor: 'vce' },
+    { id: 'intel_qsv', vendor: 'qsv' },
+    { id: 'nvidia_nvenc', vendor: 'nvenc' },
+  ];
+
+  hwencoders.forEach(enc => {
+    const vendorInfo = data.hwenc_info?.vendors?.[enc.vendor];
+    const el = document.getElementById(enc.id);
+    if (vendorInfo?.available) {
+      el.innerHTML = "✓<br>(" + vendorInfo.codecs.join(", ") + ")";
+    } else {
+      el.textContent = "✗";
+    }
+  });
+
+  const systemInfoRow = document.getElementById('system-info');
+  systemInfoRow.querySelectorAll('.gpu-tile').forEach(tile => tile.remove());
+
+  if (data.gpu_info.length > 0) {
+    data.gpu_info.forEach(gpu => {
+      const gpuTile = document.createElement('div');
+      gpuTile.classList.add('tile', 'gpu-tile');
+      gpuTile.innerHTML = `
+        <h3>GPU Info</h3>
+        <div class="entry"><strong>${gpu.model}</strong></div>
+        <div class="entry"><strong>Usage:</strong> ${gpu.usage}%</div>
+        <div class="entry"><strong>Temp:</strong> ${gpu.temperature}°C</div>
+        <div class="entry"><strong>VRAM:</strong> ${Math.round(gpu.used_memory/1048576)}MB / ${Math.round(gpu.total_memory/1048576)}MB (${gpu.percent_memory}%)</div>
+      `;
+      systemInfoRow.appendChild(gpuTile);
     });
+  }
 }
 
 function updateDrives() {
   fetch("/api/drives")
     .then(res => res.json())
-    .then((drives) => {
-      const caps = { CD: { total: 0, available: 0 }, DVD: { total: 0, available: 0 }, BLURAY: { total: 0, available: 0 } };
-      const capInheritance = { CD: ["CD", "DVD", "BLURAY"], DVD: ["DVD", "BLURAY"], BLURAY: ["BLURAY"] };
-      const blacklistedDrives = [];
-
-      for (const drive of drives) {
-        if (drive.blacklisted) blacklistedDrives.push(drive);
-        for (const level of ["CD", "DVD", "BLURAY"]) {
-          if (drive.capability.some(cap => capInheritance[level].includes(cap))) {
-            caps[level].total += 1;
-            if (!drive.job_id && !drive.blacklisted) caps[level].available += 1;
-          }
-        }
-      }
+    .then(renderDrives);
+}
 
-      const container = document.getElementById("drives");
-      container.innerHTML = "";
-
-      const overview = document.createElement("div");
-      overview.className = "tile";
-      overview.innerHTML = `
-        <h3>Drive Overview</h3>
-        <div><strong>CD:</strong> <span style="color: ${caps.CD.available > 0 ? 'green' : 'red'};">${caps.CD.available}</span> / ${caps.CD.total}</div>
-        <div><strong>DVD:</strong> <span style="color: ${caps.DVD.available > 0 ? 'green' : 'red'};">${caps.DVD.available}</span> / ${caps.DVD.total}</div>
-        <div><strong>BD:</strong> <span style="color: ${caps.BLURAY.available > 0 ? 'green' : 'red'};">${caps.BLURAY.available}</span> / ${caps.BLURAY.total}</div>
-        ${blacklistedDrives.length > 0 ? `<div style="color: red;"><strong>Blacklisted Drives:</strong> ${blacklistedDrives.map(d => d.model).join(", ")}</div>` : ""}
-        <div style="margin-top: 10px;">
-          <button onclick="ejectForType('CD')" ${caps.CD.available === 0 ? "disabled" : ""}>Rip CD</button>
-          <button onclick="ejectForType('DVD')" ${caps.DVD.available === 0 ? "disabled" : ""}>Rip DVD</button>
-          <button onclick="ejectForType('BLURAY')" ${caps.BLURAY.available === 0 ? "disabled" : ""}>Rip BLURAY</button>
-        </div>
-      `;
-      container.appendChild(overview);
-
-      for (const d of drives) {
-        const tile = document.createElement("div");
-        tile.className = "tile";
-        tile.innerHTML = `
-          <h3>${d.model}</h3>
-          <div><strong>Path:</strong> <code>${d.path}</code></div>
-          <div><strong>Type:</strong> ${d.capability.join(", ")}</div>
-          <div><strong>Status:</strong> ${d.job_id ? "Ripping" : d.blacklisted ? "Blacklisted" : "Idle"}</div>
-          ${d.disc_label ? `<div><strong>Disc Label:</strong> ${d.disc_label}</div>` : ""}
-          ${d.job_id ? `<div><strong>Job ID:</strong> <a href="/jobs/${d.job_id}">${d.job_id}</a></div>` : ""}
-          <div style="margin-top: 10px;">
-            <button onclick="ejectDrive('${d.path}', ${!!d.job_id})">Eject</button>
-          </div>
-        `;
-        container.appendChild(tile);
+function renderDrives(drives) {
+  const caps = { CD: { total: 0, available: 0 }, DVD: { total: 0, available: 0 }, BLURAY: { total: 0, available: 0 } };
+  const capInheritance = { CD: ["CD", "DVD", "BLURAY"], DVD: ["DVD", "BLURAY"], BLURAY: ["BLURAY"] };
+  const blacklistedDrives = [];
+
+  for (const drive of drives) {
+    if (drive.blacklisted) blacklistedDrives.push(drive);
+    for (const level of ["CD", "DVD", "BLURAY"]) {
+      if (drive.capability.some(cap => capInheritance[level].includes(cap))) {
+        caps[level].total += 1;
+        if (!drive.job_id && !drive.blacklisted) caps[level].available += 1;
       }
-    });
+    }
+  }
+
+  const container = document.getElementById("drives");
+  container.innerHTML = "";
+
+  const overview = document.createElement("div");
+  overview.className = "tile";
+  overview.innerHTML = `
+    <h3>Drive Overview</h3>
+    <div><strong>CD:</strong> <span style="color: ${caps.CD.available > 0 ? 'green' : 'red'};">${caps.CD.available}</span> / ${caps.CD.total}</div>
+    <div><strong>DVD:</strong> <span style="color: ${caps.DVD.available > 0 ? 'green' : 'red'};">${caps.DVD.available}</span> / ${caps.DVD.total}</div>
+    <div><strong>BD:</strong> <span style="color: ${caps.BLURAY.available > 0 ? 'green' : 'red'};">${caps.BLURAY.available}</span> / ${caps.BLURAY.total}</div>
+    ${blacklistedDrives.length > 0 ? `<div style="color: red;"><strong>Blacklisted Drives:</strong> ${blacklistedDrives.map(d => d.model).join(", ")}</div>` : ""}
+    <div style="margin-top: 10px;">
+      <button onclick="ejectForType('CD')" ${caps.CD.available === 0 ? "disabled" : ""}>Rip CD</button>
+      <button onclick="ejectForType('DVD')" ${caps.DVD.available === 0 ? "disabled" : ""}>Rip DVD</button>
+      <button onclick="ejectForType('BLURAY')" ${caps.BLURAY.available === 0 ? "disabled" : ""}>Rip BLURAY</button>
+    </div>
+  `;
+  container.appendChild(overview);
+
+  for (const d of drives) {
+    const tile = document.createElement("div");
+    tile.className = "tile";
+    tile.innerHTML = `
+      <h3>${d.model}</h3>
+      <div><strong>Path:</strong> <code>${d.path}</code></div>
+      <div><strong>Type:</strong> ${d.capability.join(", ")}</div>
+      <div><strong>Status:</strong> ${d.job_id ? "Ripping" : d.blacklisted ? "Blacklisted" : "Idle"}</div>
+      ${d.disc_label ? `<div><strong>Disc Label:</strong> ${d.disc_label}</div>` : ""}
+      ${d.job_id ? `<div><strong>Job ID:</strong> <a href="/jobs/${d.job_id}">${d.job_id}</a></div>` : ""}
+      <div style="margin-top: 10px;">
+        <button onclick="ejectDrive('${d.path}', ${!!d.job_id})">Eject</button>
+      </div>
+    `;
+    container.appendChild(tile);
+  }
 }
 
 function ejectDrive(path, confirmCancel = false) {
@@ -134,8 +138,7 @@ function ejectDrive(path, confirmCancel = false) {
     })
     .then(() => {
     showToast("Drive ejected successfully.");
-    updateDrives();
-    updateJobs();
+    refreshIfPolling(updateDrives, updateJobs);
     })
     .catch(err => {
     console.error("Eject failed:", err);
@@ -174,8 +177,7 @@ function cancelJob(jobId) {
     .then(r => { if (!r.ok) throw new Error(); })
     .then(() => {
       showToast("Job cancelled");
-      updateJobs();
-      updateDrives();
+      refreshIfPolling(updateJobs, updateDrives);
     })
     .catch(() => showToast("Cancel failed!", "error"));
 }
@@ -183,41 +185,44 @@ function cancelJob(jobId) {
 function updateJobs() {
   fetch("/api/jobs")
     .then(res => res.json())
-    .then(jobs => {
-      const container = document.getElementById("jobs");
-      container.innerHTML = "";
-
-      if (!jobs.length) {
-        container.innerHTML = `
-          <div class="tile">
-            <h2>No jobs running</h2>
-            <small>Everything's idle.</small>
-          </div>`;
-        return;
-      }
+    .then(renderJobs);
+}
 
-      const row = document.createElement("div");
-      row.className = "tile-row";
-
-      jobs.forEach(job => {
-        const tile = document.createElement("div");
-        tile.className = `tile job-card ${job.status.toLowerCase()}`;
-        tile.innerHTML = `
-          <h2>${job.disc_label}</h2>
-          <strong>Status:</strong> ${job.status}<br>
-          <strong>Type:</strong> ${job.disc_type}<br>
-          <strong>Progress:</strong> ${job.progress}%<br>
-          <strong>Drive:</strong> ${job.drive}<br>
-          <a href="/jobs/${job.job_id}">🔍 View</a>
-          ${["Running", "Queued"].includes(job.status)
-              ? ` &nbsp;|&nbsp; <a href="#" onclick="cancelJob('${job.job_id}')" style="color:red;">⛔ Cancel</a>`
-              : ""}
-        `;
-        row.appendChild(tile);
-      });
-
-      container.appendChild(row);
-    });
+function renderJobs(jobs) {
+  const container = document.getElementById("jobs");
+  container.innerHTML = "";
+
+  if (!jobs.length) {
+    container.innerHTML = `
+      <div class="tile">
+        <h2>No jobs running</h2>
+        <small>Everything's idle.</small>
+      </div>`;
+    return;
+  }
+
+  const row = document.createElement("div");
+  row.className = "tile-row";
+
+  jobs.forEach(job => {
+    const status = job.status ?? job.job_status;
+    const tile = document.createElement("div");
+    tile.className = `tile job-card ${status.toLowerCase()}`;
+    tile.innerHTML = `
+      <h2>${job.disc_label}</h2>
+      <strong>Status:</strong> ${status}<br>
+      <strong>Type:</strong> ${job.disc_type}<br>
+      <strong>Progress:</strong> ${job.progress ?? job.job_progress}%<br>
+      <strong>Drive:</strong> ${job.drive}<br>
+      <a href="/jobs/${job.job_id}">🔍 View</a>
+      ${["Running", "Queued"].includes(status)
+          ? ` &nbsp;|&nbsp; <a href="#" onclick="cancelJob('${job.job_id}')" style="color:red;">⛔ Cancel</a>`
+          : ""}
+    `;
+    row.appendChild(tile);
+  });
+
+  container.appendChild(row);
 }
 
 function resumeJob(jobId){
@@ -225,8 +230,7 @@ function resumeJob(jobId){
     .then(r => { if(!r.ok) throw new Error(); })
     .then(()=> {
       showToast("Job resumed");
-      updateJobs();
-      updateResumables();
+      refreshIfPolling(updateJobs, updateResumables);
     })
     .catch(()=> showToast("Resume failed!", "error"));
 }
@@ -235,35 +239,37 @@ function resumeJob(jobId){
 function updateResumables(){
   fetch("/api/jobs/resumable")
     .then(r => r.json())
-    .then(jobs => {
-      const box = document.getElementById("resumables");
-      if (!box) return;
-
-      box.innerHTML = "";
-      if (!jobs.length){
-        box.innerHTML = `<div class="tile"><h3>No unfinished jobs</h3></div>`;
-        return;
-      }
+    .then(renderResumables);
+}
 
-      const row = document.createElement("div");
-      row.className = "tile-row";
-
-      jobs.forEach(job => {
-        const tile = document.createElement("div");
-        tile.className = "tile job-card queued";
-        tile.innerHTML = `
-          <h2>${job.disc_label}</h2>
-          <strong>Status:</strong> ${job.job_status}<br>
-          <strong>Type:</strong> ${job.disc_type}<br>
-          <strong>Progress:</strong> ${job.job_progress}%<br>
-          <a href="#" onclick="resumeJob('${job.job_id}')">▶️ Resume</a> |
-          <a href="#" onclick="deleteResume('${job.job_id}')" style="color:red;">🗑 Delete</a>
-        `;
-        row.appendChild(tile);
-      });
-
-      box.appendChild(row);
-    });
+function renderResumables(jobs){
+  const box = document.getElementById("resumables");
+  if (!box) return;
+
+  box.innerHTML = "";
+  if (!jobs.length){
+    box.innerHTML = `<div class="tile"><h3>No unfinished jobs</h3></div>`;
+    return;
+  }
+
+  const row = document.createElement("div");
+  row.className = "tile-row";
+
+  jobs.forEach(job => {
+    const tile = document.createElement("div");
+    tile.className = "tile job-card queued";
+    tile.innerHTML = `
+      <h2>${job.disc_label}</h2>
+      <strong>Status:</strong> ${job.job_status}<br>
+      <strong>Type:</strong> ${job.disc_type}<br>
+      <strong>Progress:</strong> ${job.job_progress}%<br>
+      <a href="#" onclick="resumeJob('${job.job_id}')">▶️ Resume</a> |
+      <a href="#" onclick="deleteResume('${job.job_id}')" style="color:red;">🗑 Delete</a>
+    `;
+    row.appendChild(tile);
+  });
+
+  box.appendChild(row);
 }
 
 function deleteResume(jobId){
@@ -272,7 +278,7 @@ function deleteResume(jobId){
     method:"POST",
     headers:{"Content-Type":"application/json"},
     body:JSON.stringify({job_id:jobId})
-  }).then(()=>{ showToast("Deleted"); updateResumables(); });
+  }).then(()=>{ showToast("Deleted"); refreshIfPolling(updateResumables); });
 }
 
 function getCookie(name) {
@@ -299,18 +305,101 @@ function applyTheme(mode) {
   setCookie('theme', mode);
 }
 
+/* ── Live updates ─────────────────────────────────────────
+   One WebSocket pushes a snapshot and then only what changed.  If it
+   can't be opened the page polls the REST endpoints as before and keeps
+   retrying the socket with backoff.  Hidden tabs close the socket. */
+const live = {
+  ws: null,
+  state: { drives: {}, jobs: {}, resumable: {}, system: null },
+  keys: { drives: "path", jobs: "job_id", resumable: "job_id" },
+  render: { drives: () => renderDrives(Object.values(live.state.drives)),
+            jobs: () => renderJobs(Object.values(live.state.jobs)),
+            resumable: () => renderResumables(Object.values(live.state.resumable)),
+            system: () => renderSystemInfo(live.state.system) },
+  timers: [],
+  retry: 1000,
+  retryTimer: null,
+};
+
+function startPolling() {
+  if (live.timers.length) return;
+  updateSystemInfo();
+  updateDrives();
+  updateJobs();
+  updateResumables();
+  live.timers = [
+    setInterval(updateSystemInfo, 5000),
+    setInterval(updateDrives,   5000),
+    setInterval(updateJobs,     5000),
+    setInterval(updateResumables, 10000),
+  ];
+}
+
+function stopPolling() {
+  live.timers.forEach(clearInterval);
+  live.timers = [];
+}
+
+// after a user action: the socket reports the change by itself
+function refreshIfPolling(...updates) {
+  if (!live.ws || live.ws.readyState !== WebSocket.OPEN) updates.forEach(f => f());
+}
+
+function applyLive(msg) {
+  if (msg.type === "snapshot") {
+    for (const [topic, value] of Object.entries(msg.data)) {
+      const key = live.keys[topic];
+      live.state[topic] = key ? Object.fromEntries(value.map(r => [r[key], r])) : value;
+      live.render[topic]();
+    }
+    return;
+  }
+  const topic = msg.topic;
+  if (topic === "system") {
+    live.state.system = msg.data;
+  } else {
+    const rows = live.state[topic];
+    (msg.remove || []).forEach(id => delete rows[id]);
+    (msg.upsert || []).forEach(r => { rows[r[live.keys[topic]]] = r; });
+  }
+  live.render[topic]();
+}
+
+function connectLive() {
+  if (document.hidden || live.ws) return;
+  clearTimeout(live.retryTimer);
+  const proto = location.protocol === "https:" ? "wss" : "ws";
+  const ws = new WebSocket(`${proto}://${location.host}/ws/dashboard`);
+  live.ws = ws;
+
+  ws.onopen = () => { live.retry = 1000; stopPolling(); };
+  ws.onmessage = ev => applyLive(JSON.parse(ev.data));
+  ws.onclose = () => {
+    if (live.ws === ws) live.ws = null;
+    if (document.hidden) return;
+    startPolling();
+    live.retryTimer = setTimeout(connectLive, live.retry);
+    live.retry = Math.min(live.retry * 2, 60000);
+  };
+}
+
+document.addEventListener('visibilitychange', () => {
+  if (document.hidden) {
+    stopPolling();
+    clearTimeout(live.retryTimer);
+    if (live.ws) live.ws.close();
+  } else {
+    connectLive();
+  }
+});
+
 document.addEventListener('DOMContentLoaded', () => {
   let mode = getCookie('theme');
   if (!mode) {
     mode = window.matchMedia('(prefers-color-scheme: dark)').matches ? 'dark' : 'light';
   }
   applyTheme(mode);
-  updateSystemInfo();
-  updateDrives();
-  updateJobs();
-  updateResumables();
-  setInterval(updateSystemInfo, 5000);
-  setInterval(updateDrives,   5000);
-  setInterval(updateJobs,     5000);
-  setInterval(updateResumables, 10000);
+  if ("WebSocket" in window) connectLive();
+  else startPolling();
 });
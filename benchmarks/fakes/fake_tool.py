@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Stand-ins for the external tools TKAutoRipper drives.
+
+One script, dispatched on the name it is called by (install() creates
+the symlinks): makemkvcon, HandBrakeCLI, flatpak, abcde, pv, zstd and
+eject.  Each prints what the real tool prints – robot PRGV lines,
+HandBrake "\\r" progress redraws, pv redraws, abcde track messages – and
+moves real bytes between the files it is given, paced by:
+
+    FAKE_RATE        bytes/s read from a "disc" (default 64 MiB/s, 0 = unthrottled)
+    FAKE_FPS         encode speed in frames/s (default 2000)
+    FAKE_FRAME_SIZE  input bytes per frame (default 64 KiB)
+    FAKE_REDRAW_HZ   progress lines per second (default 10, 0 = as fast as possible)
+    FAKE_UPDATES     progress steps per encode (default 1000)
+    FAKE_TITLES      titles MakeMKV splits a disc into (default 3)
+    FAKE_TRACKS      tracks abcde "rips" (default 10)
+    FAKE_RATIO       output/input size of encodes and compression (default 0.3)
+    FAKE_FAIL        exit 1 when an argument contains this string
+
+"Discs" are plain image files (see make_disc()); their path is used as
+the device, e.g. dev:/tmp/bench/dev/sr0.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+CHUNK = 1024 * 1024
+TOOLS = ("makemkvcon", "HandBrakeCLI", "flatpak", "abcde", "pv", "zstd", "eject")
+
+
+def _env(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class Pacer:
+    """Sleeps so that *amount* units take amount / rate seconds."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.started = time.monotonic()
+
+    def wait(self, done: float) -> None:
+        if self.rate <= 0:
+            return
+        ahead = done / self.rate - (time.monotonic() - self.started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+class Redraw:
+    """True at most FAKE_REDRAW_HZ times a second (always when 0)."""
+
+    def __init__(self) -> None:
+        hz = _env("FAKE_REDRAW_HZ", 10)
+        self.interval = 1.0 / hz if hz > 0 else 0.0
+        self.last = 0.0
+
+    def due(self) -> bool:
+        now = time.monotonic()
+        if now - self.last >= self.interval:
+            self.last = now
+            return True
+        return False
+
+
+def _mib(n: float) -> str:
+    return f"{n / 1024**2:.1f}MiB"
+
+
+def _hms(seconds: float) -> str:
+    seconds = int(max(0, seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _fail_check(argv) -> None:
+    marker = os.environ.get("FAKE_FAIL")
+    if marker and any(marker in arg for arg in argv):
+        sys.exit(1)
+
+
+# ============================================================
+def makemkvcon(argv) -> int:
+    """makemkvcon --robot mkv dev:DEVICE all OUTDIR … --progress=-same"""
+    device = next(a[4:] for a in argv if a.startswith("dev:"))
+    outdir = Path(argv[argv.index("all") + 1])
+    titles = max(1, int(_env("FAKE_TITLES", 3)))
+    size = os.path.getsize(device)
+    per_title = size // titles
+    out = sys.stdout
+
+    out.write(f'MSG:1005,0,1,"MakeMKV v1.17.7 linux(x64-release) started","%1 started","MakeMKV"\n')
+    out.write(f'DRV:0,2,999,1,"BD-RE FAKE","DISC","{device}"\n')
+    out.write(f'TCOUNT:{titles}\n')
+    out.write('PRGT:5018,0,"Saving to MKV file"\n')
+
+    pacer, redraw, done = Pacer(_env("FAKE_RATE", 64 * 1024**2)), Redraw(), 0
+    with open(device, "rb") as src:
+        for title in range(titles):
+            length = per_title if title < titles - 1 else size - done
+            out.write(f'PRGC:5017,{title},"Saving title {title}"\n')
+            with open(outdir / f"title_t{title:02d}.mkv", "wb") as dst:
+                left = length
+                while left > 0:
+                    chunk = src.read(min(CHUNK, left))
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    left -= len(chunk)
+                    done += len(chunk)
+                    pacer.wait(done)
+                    if redraw.due():
+                        current = 65536 * (length - left) // max(1, length)
+                        out.write(f"PRGV:{current},{65536 * done // max(1, size)},65536\n")
+                        out.flush()
+    out.write("PRGV:65536,65536,65536\n")
+    out.write(f'MSG:5036,256,1,"Copy complete. {titles} titles saved.","%1 titles saved.","{titles}"\n')
+    return 0
+
+
+def handbrake(argv) -> int:
+    """HandBrakeCLI … -i INPUT -o OUTPUT"""
+    _fail_check(argv)
+    src = argv[argv.index("-i") + 1]
+    dst = argv[argv.index("-o") + 1]
+    size = os.path.getsize(src)
+    frames = max(1, size // int(_env("FAKE_FRAME_SIZE", 64 * 1024)))
+    fps = _env("FAKE_FPS", 2000)
+    ratio = _env("FAKE_RATIO", 0.3)
+    out = sys.stdout
+
+    out.write("[00:00:00] Starting work for task 1 of 1\n")
+    pacer, redraw = Pacer(fps), Redraw()
+    step = max(1, frames // int(_env("FAKE_UPDATES", 1000)))
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        for frame in range(0, frames, step):
+            chunk = fin.read(int(step * size / frames))
+            fout.write(chunk[: int(len(chunk) * ratio)])
+            pacer.wait(frame + step)
+            if redraw.due():
+                rate = (frame + step) / max(pacer.elapsed, 1e-6)
+                eta = (frames - frame) / max(rate, 1e-6)
+                out.write(
+                    f"\rEncoding: task 1 of 1, {100.0 * frame / frames:.2f} % "
+                    f"({rate:.2f} fps, avg {rate:.2f} fps, ETA {int(eta) // 3600:02d}h"
+                    f"{int(eta) // 60 % 60:02d}m{int(eta) % 60:02d}s)"
+                )
+                out.flush()
+    out.write("\rEncoding: task 1 of 1, 100.00 %\n")
+    out.write("Encode done!\n")
+    return 0
+
+
+def flatpak(argv) -> int:
+    """flatpak run --command=TOOL APP ARGS…"""
+    i = next(i for i, a in enumerate(argv) if a.startswith("--command="))
+    command = argv[i].split("=", 1)[1]
+    return DISPATCH[command](argv[i + 2:])              # skip the app id
+
+
+def abcde(argv) -> int:
+    """abcde -d DEVICE -o FORMAT …: grabs FAKE_TRACKS tracks off the image."""
+    device = argv[argv.index("-d") + 1]
+    tracks = max(1, int(_env("FAKE_TRACKS", 10)))
+    size = os.path.getsize(device)
+    out = sys.stdout
+    pacer, done = Pacer(_env("FAKE_RATE", 64 * 1024**2)), 0
+
+    out.write(f"Grabbing entire CD - tracks: {' '.join(str(t) for t in range(1, tracks + 1))}\n")
+    with open(device, "rb") as src:
+        for track in range(1, tracks + 1):
+            out.write(f"Grabbing track {track:02d}: Track {track}...\n")
+            out.flush()
+            left = size // tracks
+            while left > 0:
+                chunk = src.read(min(CHUNK, left))
+                if not chunk:
+                    break
+                left -= len(chunk)
+                done += len(chunk)
+                pacer.wait(done)
+            out.write(f"Encoding track {track} of {tracks}: Track {track}...\n")
+    out.write("Finished.\n")
+    return 0
+
+
+def pv(argv) -> int:
+    """pv -pterb SOURCE  → SOURCE on stdout, redraws on stderr."""
+    src = next(a for a in argv if not a.startswith("-"))
+    size = os.path.getsize(src)
+    err = sys.stderr
+    pacer, redraw, done = Pacer(_env("FAKE_RATE", 64 * 1024**2)), Redraw(), 0
+    with open(src, "rb") as fin:
+        while True:
+            chunk = fin.read(CHUNK)
+            if not chunk:
+                break
+            sys.stdout.buffer.write(chunk)
+            done += len(chunk)
+            pacer.wait(done)
+            if redraw.due():
+                rate = done / max(pacer.elapsed, 1e-6)
+                pct = 100 * done // max(1, size)
+                bar = "=" * (pct // 5) + ">" + " " * (20 - pct // 5)
+                err.write(
+                    f"\r{_mib(done)} {_hms(pacer.elapsed)} [{_mib(rate)}/s] [{bar}] {pct}% "
+                    f"ETA {_hms((size - done) / max(rate, 1))}"
+                )
+                err.flush()
+    err.write("\n")
+    return 0
+
+
+def zstd(argv) -> int:
+    """zstd --progress IN -o OUT, or a stdin → stdout filter with -c."""
+    ratio = _env("FAKE_RATIO", 0.3)
+    if "-o" in argv:
+        target = argv.index("-o") + 1
+        source = next(a for i, a in enumerate(argv) if not a.startswith("-") and i != target)
+        src, dst = open(source, "rb"), open(argv[target], "wb")
+    else:
+        src, dst = sys.stdin.buffer, sys.stdout.buffer
+    redraw, done = Redraw(), 0
+    while True:
+        chunk = src.read(CHUNK)
+        if not chunk:
+            break
+        dst.write(chunk[: int(len(chunk) * ratio)])
+        done += len(chunk)
+        if "--progress" in argv and redraw.due():
+            sys.stderr.write(f"\rRead : {done // 1024**2} MiB ==> {ratio * 100:.2f}%")
+            sys.stderr.flush()
+    dst.flush()
+    return 0
+
+
+def eject(argv) -> int:
+    return 0
+
+
+DISPATCH = {
+    "makemkvcon": makemkvcon,
+    "HandBrakeCLI": handbrake,
+    "flatpak": flatpak,
+    "abcde": abcde,
+    "pv": pv,
+    "zstd": zstd,
+    "eject": eject,
+}
+
+
+# ── setup helpers (used by the harness) ─────────────────────
+def install(bindir: Path) -> Path:
+    """Symlink every fake tool into *bindir*; put it first on PATH."""
+    bindir.mkdir(parents=True, exist_ok=True)
+    script = Path(__file__).resolve()
+    script.chmod(script.stat().st_mode | 0o111)
+    for name in TOOLS:
+        link = bindir / name
+        if link.is_symlink() or link.exists():
+            link.unlink()
+        link.symlink_to(script)
+    return bindir
+
+
+def make_disc(path: Path, size: int, zero_fraction: float = 0.25) -> Path:
+    """An image file standing in for /dev/srN: random data with a zero-filled tail."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    random_part = int(size * (1 - zero_fraction)) // 2048 * 2048
+    with open(path, "wb") as fp:
+        left = random_part
+        while left > 0:
+            n = min(CHUNK, left)
+            fp.write(os.urandom(n))
+            left -= n
+        fp.truncate(size)
+    return path
+
+
+def main() -> int:
+    name = os.path.basename(sys.argv[0])
+    if name not in DISPATCH:
+        print(f"fake_tool: unknown tool {name!r}; call through a symlink", file=sys.stderr)
+        return 2
+    return DISPATCH[name](sys.argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
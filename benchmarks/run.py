@@ -0,0 +1,333 @@
+"""
+Benchmark harness for the job pipeline.
+
+Runs TKAutoRipper's real JobRunner, rippers, log pipeline and log hub
+against the fake tools in benchmarks/fakes (no drives, MakeMKV or
+HandBrake needed) inside a throw-away HOME with its own config, job
+database and output directories.
+
+    python -m benchmarks.run                     # everything
+    python -m benchmarks.run --only log_pipeline ws_fanout --quick
+
+Scenarios:
+  runner_overhead  cost per step of JobRunner around a trivial command
+  multi_drive      DVD jobs (MakeMKV → HandBrake) on 1 and N fake drives
+  log_pipeline     server CPU per line of a tool that redraws as fast as it can
+  ws_fanout        publish → subscriber latency of the log hub with many clients
+
+Results are appended to benchmarks/results/<host>.jsonl and compared
+with the previous run on the same host; changes beyond --threshold in
+the wrong direction are reported as regressions (exit status 1 with
+--fail-on-regression).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+MiB = 1024 * 1024
+
+# metric-name suffix → True if lower is better
+LOWER_IS_BETTER = {"_ms": True, "_s": True, "_us": True, "_mbps": False, "_per_s": False, "_efficiency": False}
+
+
+# ── sandbox ──────────────────────────────────────────────────
+def sandbox(tmp: Path) -> None:
+    """
+    Point HOME at *tmp* with a copy of the repo config whose directories
+    live under *tmp*, and put the fake tools first on PATH.  Must run
+    before anything from app/ is imported (the config loads at import).
+    """
+    from benchmarks.fakes.fake_tool import install
+
+    home = tmp / "home"
+    data = yaml.safe_load((ROOT / "config" / "TKAutoRipper.conf").read_text())
+    overrides = {
+        ("General", "tempdirectory"): tmp / "temp",
+        ("General", "outputdirectory"): tmp / "output",
+        ("General", "jobdatabase"): tmp / "jobs.db",
+        ("DVD", "outputdirectory"): tmp / "output" / "DVD",
+        ("BLURAY", "outputdirectory"): tmp / "output" / "BLURAY",
+        ("OTHER", "outputdirectory"): tmp / "output" / "ISO",
+        ("Logging", "logdirectory"): tmp / "log",
+    }
+    for (section, key), value in overrides.items():
+        if key in data.get(section, {}):
+            data[section][key]["value"] = str(value)
+
+    config_dir = home / "TKAutoRipper" / "config"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    (config_dir / "TKAutoRipper.conf").write_text(yaml.safe_dump(data, sort_keys=False))
+    (config_dir / "TKAR.json").write_text("{}")
+
+    os.environ["HOME"] = str(home)
+    bindir = install(tmp / "bin")
+    os.environ["PATH"] = f"{bindir}{os.pathsep}{os.environ.get('PATH', '')}"
+
+
+def _cpu() -> float:
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    return ru.ru_utime + ru.ru_stime
+
+
+def _job(tmp: Path, name: str, disc_type: str = "dvd_video", drive: Optional[str] = None):
+    from app.core.job.job import Job
+
+    job = Job(
+        job_id=name, disc_type=disc_type, disc_label=name,
+        temp_path=tmp / "temp" / name, output_path=tmp / "output" / name, drive=drive,
+    )
+    job.temp_path.mkdir(parents=True, exist_ok=True)
+    return job
+
+
+# ── scenarios ────────────────────────────────────────────────
+def runner_overhead(tmp: Path, quick: bool) -> Dict[str, float]:
+    from app.core.job import runner as runner_mod
+
+    n = 50 if quick else 200
+    started = time.perf_counter()
+    for _ in range(n):
+        subprocess.run(["true"], check=True)
+    bare = (time.perf_counter() - started) / n
+
+    steps = [(["true"], f"noop {i}", False, 1.0 / n) for i in range(n)]
+    original = runner_mod.get_job_steps
+    runner_mod.get_job_steps = lambda job: steps
+    try:
+        job = _job(tmp, "overhead", disc_type="cd_rom")
+        started = time.perf_counter()
+        runner_mod.JobRunner(job).run().result()
+        per_step = (time.perf_counter() - started) / n
+    finally:
+        runner_mod.get_job_steps = original
+    assert job.job_status == "Finished", job.job_status
+
+    return {
+        "step_ms": per_step * 1000,
+        "bare_spawn_ms": bare * 1000,
+        "overhead_ms": (per_step - bare) * 1000,
+    }
+
+
+def multi_drive(tmp: Path, quick: bool, drives: int = 4) -> Dict[str, float]:
+    from app.core.drive.manager import drive_tracker
+    from app.core.job.runner import JobRunner
+    from benchmarks.fakes.fake_tool import make_disc
+
+    size = (32 if quick else 256) * MiB
+    rate = 64 * MiB
+    os.environ.update(FAKE_RATE=str(rate), FAKE_FPS="4000", FAKE_TITLES="3", FAKE_REDRAW_HZ="10")
+
+    def run(count: int) -> float:
+        runners = []
+        for i in range(count):
+            disc = make_disc(tmp / "dev" / f"sr{i}", size)
+            drive_tracker.register_drive(str(disc), model="Fake", capability=["DVD"])
+            runners.append(JobRunner(_job(tmp, f"drive{count}-{i}", drive=str(disc))))
+        started = time.perf_counter()
+        for future in [r.run() for r in runners]:
+            future.result()
+        wall = time.perf_counter() - started
+        failed = [r.job.job_id for r in runners if r.job.job_status != "Finished"]
+        assert not failed, f"jobs failed: {failed}"
+        for r in runners:
+            drive_tracker.unregister_drive(r.job.drive)
+        return wall
+
+    single = run(1)
+    multi = run(drives)
+    return {
+        "single_s": single,
+        f"drives{drives}_s": multi,
+        "read_mbps": drives * size / MiB / multi,
+        "scaling_efficiency": single / multi,
+    }
+
+
+def log_pipeline(tmp: Path, quick: bool) -> Dict[str, float]:
+    from app.core.job.runner import JobRunner
+
+    updates = 50_000 if quick else 200_000
+    source = tmp / "chatty.mkv"
+    source.write_bytes(bytes(updates * 32))
+    os.environ.update(FAKE_FPS="0", FAKE_REDRAW_HZ="0", FAKE_FRAME_SIZE="32", FAKE_UPDATES=str(updates))
+
+    runner = JobRunner(_job(tmp, "chatty"))
+    cpu, started = _cpu(), time.perf_counter()
+    ok = runner.run_command(["HandBrakeCLI", "-i", str(source), "-o", str(tmp / "chatty.out")])
+    wall, cpu = time.perf_counter() - started, _cpu() - cpu
+    runner.log.close()
+    assert ok
+    return {
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "cpu_per_line_us": cpu / updates * 1e6,
+        "lines_per_s": updates / wall,
+    }
+
+
+def ws_fanout(tmp: Path, quick: bool, subscribers: int = 50) -> Dict[str, float]:
+    from app.core.logstream import log_hub
+
+    job = _job(tmp, "fanout")
+    lines, rate = (500, 500) if quick else (2000, 1000)
+    latencies: List[float] = []
+    dropped = [0]
+
+    async def client(sub) -> None:
+        received = 0
+        while received < lines:
+            batch, lost = await sub.next(1.0)
+            now = time.perf_counter()
+            if not batch and not lost:
+                break                               # publisher stalled
+            dropped[0] += lost
+            received += len(batch) + lost
+            latencies.extend(now - float(line) for line in batch)
+
+    def publish() -> None:
+        for _ in range(lines):
+            log_hub.publish(job.job_id, repr(time.perf_counter()))
+            time.sleep(1.0 / rate)
+
+    async def main() -> None:
+        loop = asyncio.get_running_loop()
+        subs = [log_hub.subscribe(job, loop) for _ in range(subscribers)]
+        tasks = [asyncio.create_task(client(s)) for s in subs]
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+        await asyncio.gather(*tasks)
+        publisher.join()
+        for s in subs:
+            log_hub.unsubscribe(s)
+
+    asyncio.run(main())
+    log_hub.finish(job.job_id)
+    latencies.sort()
+    return {
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "dropped_lines": dropped[0],
+    }
+
+
+SCENARIOS: Dict[str, Callable[[Path, bool], Dict[str, float]]] = {
+    "runner_overhead": runner_overhead,
+    "multi_drive": multi_drive,
+    "log_pipeline": log_pipeline,
+    "ws_fanout": ws_fanout,
+}
+
+
+# ── results ──────────────────────────────────────────────────
+def _lower_is_better(metric: str) -> Optional[bool]:
+    for suffix, lower in LOWER_IS_BETTER.items():
+        if metric.endswith(suffix):
+            return lower
+    return None
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(
+            ["git", "-C", str(ROOT), "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print current vs previous; returns the regressed metrics."""
+    regressions = []
+    for scenario, metrics in current.items():
+        print(f"\n{scenario}")
+        before = previous.get(scenario, {})
+        for metric, value in metrics.items():
+            line = f"  {metric:<22} {value:12.3f}"
+            old = before.get(metric)
+            lower = _lower_is_better(metric)
+            if old:
+                change = (value - old) / old
+                line += f"   {change:+7.1%} vs {old:.3f}"
+                if lower is not None and (change > threshold if lower else change < -threshold):
+                    line += "   ⚠️ regression"
+                    regressions.append(f"{scenario}.{metric}")
+            print(line)
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    ap.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="scenarios to run")
+    ap.add_argument("--quick", action="store_true", help="smaller inputs (smoke run)")
+    ap.add_argument("--threshold", type=float, default=0.2, help="relative change counted as a regression")
+    ap.add_argument("--results", type=Path, default=RESULTS_DIR)
+    ap.add_argument("--no-save", action="store_true")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args(argv)
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="tkar-bench-") as tmp_name:
+        tmp = Path(tmp_name)
+        sandbox(tmp)
+        for name in args.only or SCENARIOS:
+            print(f"▶ {name} …", flush=True)
+            results[name] = {k: round(v, 4) for k, v in SCENARIOS[name](tmp, args.quick).items()}
+
+        from app.core.job.store import job_store
+        job_store.flush()
+
+    host = socket.gethostname()
+    history = args.results / f"{host}.jsonl"
+    previous: Dict[str, Any] = {}
+    if history.exists():
+        for line in history.read_text().splitlines():
+            entry = json.loads(line)
+            if entry["meta"].get("quick") == args.quick:
+                previous.update(entry["results"])     # latest run of each scenario
+
+    regressions = compare(previous, results, args.threshold)
+
+    if not args.no_save:
+        entry = {
+            "meta": {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "git": _git_rev(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "quick": args.quick,
+            },
+            "results": results,
+        }
+        args.results.mkdir(parents=True, exist_ok=True)
+        with open(history, "a", encoding="utf-8") as fp:
+            fp.write(json.dumps(entry) + "\n")
+        print(f"\nSaved to {history}")
+
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import logging
 import ssl
 from pathlib import Path
 import subprocess
@@ -7,26 +8,88 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 import uvicorn
 
+from app.api import archives
 from app.api import auth
+from app.api import dashboard
 from app.core import discdetection
 import app.core.drive
+from app.core.drive.detector import drive_discovery
 from app.api import drives
 from app.api import jobs
+from app.api import metrics
 from app.core import settings as cfg
 from app.api import settings as settings_api
 from app.api import systeminfo
 from app.api import ui
 from app.api import ws_log
+from app.core.events import event_bus
+from app.core.job.queue import job_queue
+from app.core.job.store import job_store
+from app.core.systeminfo import system_sampler
 
 app = FastAPI(title="TKAutoRipper")
+app.include_router(archives.router)
 app.include_router(auth.router)
+app.include_router(dashboard.router)
 app.include_router(drives.router)
 app.include_router(jobs.router)
+app.include_router(metrics.router)
 app.include_router(settings_api.router)
 app.include_router(systeminfo.router)
 app.include_router(ui.router)
 app.include_router(ws_log.router)
 
+@app.on_event("startup")
+def _recover_jobs():
+    job_store.recover()
+    job_queue.restore()
+
+
+@app.on_event("startup")
+def _start_sampler():
+    system_sampler.start()
+
+
+@app.on_event("startup")
+def _start_drive_discovery():
+    if drive_discovery:
+        drive_discovery.start()
+
+
+@app.on_event("startup")
+async def _start_event_socket():
+    try:
+        await event_bus.serve()
+    except OSError as exc:
+        logging.warning(f"⚠️ Event socket unavailable ({exc}); only in-process detection can reach the API")
+
+
+@app.on_event("startup")
+def _start_disc_detection():
+    discdetection.monitor_cdrom()
+
+
+@app.on_event("shutdown")
+def _flush_jobs():
+    job_store.flush()
+
+
+@app.on_event("shutdown")
+async def _close_event_socket():
+    await event_bus.close()
+
+
+@app.on_event("shutdown")
+def _stop_sampler():
+    system_sampler.stop()
+
+
+@app.on_event("shutdown")
+def _stop_drive_discovery():
+    if drive_discovery:
+        drive_discovery.stop()
+
+
 app.add_middleware(HTTPSRedirectMiddleware)
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +98,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
 
 def _ensure_cert():
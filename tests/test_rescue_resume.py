@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from app.core.integration.dd.rescue import FINISHED, RescueImager, RescueMap
+from app.core.job.store import is_resumable
+
+MiB = 1024 * 1024
+
+
+def _interrupt_after(limit):
+    def on_progress(done, total, bad):
+        if done >= limit:
+            raise InterruptedError("cancelled")
+    return on_progress
+
+
+def test_resumes_from_half_written_map(tmp_path):
+    disc = tmp_path / "disc.img"
+    disc.write_bytes(os.urandom(8 * MiB))
+    image = tmp_path / "scratch" / "DISC.iso"
+    image.parent.mkdir()
+    mapfile = image.with_name(image.name + ".map")
+
+    first = RescueImager(str(disc), image, mapfile, block_size=MiB, on_progress=_interrupt_after(3 * MiB))
+    with pytest.raises(InterruptedError):
+        first.run()
+    saved = RescueMap.load(mapfile, 8 * MiB)
+    assert saved is not None and 3 * MiB <= saved.total(FINISHED) < 8 * MiB
+
+    # what a job that failed partway through the dump looks like in the store
+    data = {
+        "job_status": "Failed",
+        "temp_path": str(tmp_path / "temp"),
+        "scratch": {"drive": str(image.parent)},
+        "steps": [{"index": 1, "completed": False}, {"index": 2, "completed": False}],
+    }
+    assert is_resumable(data)
+
+    second = RescueImager(str(disc), image, mapfile, block_size=MiB)
+    stats = second.run()
+    assert second.resumed
+    assert stats.bytes_read == 8 * MiB - saved.total(FINISHED)
+    assert image.read_bytes() == disc.read_bytes()
+
+
+def test_not_resumable_without_progress(tmp_path):
+    data = {
+        "job_status": "Failed",
+        "temp_path": str(tmp_path),
+        "steps": [{"index": 1, "completed": False}],
+    }
+    assert not is_resumable(data)
+    data["steps"][0]["completed"] = True
+    assert is_resumable(data)
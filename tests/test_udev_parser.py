@@ -0,0 +1,35 @@
+import socket
+import struct
+
+from app.core.drive.detector.linux import UDEV_MAGIC, parse_udev_message
+
+
+def _message(props: bytes) -> bytes:
+    """A monitor message laid out like systemd's udev_monitor_netlink_header."""
+    header_size = 40
+    header = (
+        b"libudev\0"
+        + struct.pack(">I", UDEV_MAGIC)                     # network order
+        + struct.pack("=III", header_size, header_size, len(props))   # host order
+        + struct.pack("=II", socket.htonl(0x1234), 0)       # subsystem / devtype hashes
+        + struct.pack("=II", 0, 0)                          # tag bloom
+    )
+    assert len(header) == header_size
+    return header + props
+
+
+def test_parses_properties():
+    props = b"ACTION=change\0DEVNAME=/dev/sr0\0SUBSYSTEM=block\0ID_CDROM_MEDIA=1\0"
+    assert parse_udev_message(_message(props)) == {
+        "ACTION": "change",
+        "DEVNAME": "/dev/sr0",
+        "SUBSYSTEM": "block",
+        "ID_CDROM_MEDIA": "1",
+    }
+
+
+def test_rejects_other_messages():
+    assert parse_udev_message(b"add@/devices/foo\0ACTION=add\0") is None
+    bad_magic = bytearray(_message(b"ACTION=add\0"))
+    bad_magic[8:12] = b"\0\0\0\0"
+    assert parse_udev_message(bytes(bad_magic)) is None